@@ -7,65 +7,177 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 
+import numpy as np
+
 from subsystems.propulsion import Constraints
 from subsystems.propulsion import Propulsion
 from subsystems.power import Power
 from subsystems.stab_n_con import StabCon
 from subsystems.aerodynamics import Aerodynamics
 from subsystems.structures import Structures
+from subsystems.cg_envelope import CGEnvelope
 #from subsystems.thermal import Thermal
 
 
+def float_keys(outputs: dict) -> list[str]:
+    '''
+    Keys of all real-valued, non-integer entries of a design dictionary. These are the entries checked for
+    convergence and accelerated by the fixed-point driver, counts and strings are left alone.
+    '''
+    return [key for key, value in outputs.items() if isinstance(value, (float, np.floating)) and np.isfinite(value)]
+
+
+def max_relative_change(old: dict, new: dict, key_tolerances: dict[str, float] | None = None, rel_tol: float = 1e-6) -> tuple[float, str | None]:
+    '''
+    Largest change between two design dictionaries, relative to the tolerance of each key (so a value <= 1 means
+    converged). Returns the scaled change and the key it belongs to.
+    '''
+    key_tolerances = key_tolerances or {}
+    worst, worst_key = 0., None
+    for key in float_keys(new):
+        if key not in old:
+            continue
+        tol = key_tolerances.get(key, rel_tol)
+        change = abs(new[key] - old[key]) / (tol * max(abs(new[key]), 1e-12))
+        if change > worst:
+            worst, worst_key = change, key
+    return worst, worst_key
+
+
 class UAV:
 
-    def __init__(self, inputs: dict[str, float], hardware: dict[str, float], iterations: int, history: bool = False, verbose : bool = False) -> None:
+    def __init__(self, inputs: dict[str, float], hardware: dict[str, float], iterations: int, history: bool = False, verbose : bool = False,
+                 rel_tol: float = 1e-6, key_tolerances: dict[str, float] | None = None, acceleration: str | None = 'anderson', anderson_depth: int = 3) -> None:
+        '''
+        iterations:         Maximum number of sizing passes, the sizing stops as soon as it has converged
+        history:            Also store a copy of the outputs of every pass in history_data
+        rel_tol:            Relative tolerance on every float output
+        key_tolerances:     Relative tolerances for specific keys, overriding rel_tol
+        acceleration:       None (plain fixed-point iteration), 'aitken' or 'anderson'
+        anderson_depth:     Number of previous passes used by Anderson acceleration, 'aitken' uses a single one
+        '''
         self.inputs = inputs
         self.outputs = self.inputs.copy()
         self.hardware = hardware
         self.iterations = iterations
         self.verbose = verbose
-    
+
+        self.rel_tol = rel_tol
+        self.key_tolerances = key_tolerances or {}
+        if acceleration not in (None, 'aitken', 'anderson'):
+            raise ValueError(f"Unknown acceleration: {acceleration}")
+        self.acceleration = acceleration
+        self.anderson_depth = 1 if acceleration == 'aitken' else anderson_depth
 
         self.history = history
-        if self.history:
-            self.history_data = self.outputs.copy()
+        self.history_data = []
+        self.convergence_history = []
+        self.converged = False
+        self.n_iterations = 0
     
     # ~~~ Intermediate Functions ~~~
 
-    def size(self):
+    def sizing_pass(self, outputs: dict[str, float]) -> dict[str, float]:
+        '''
+        A single pass through the UAV subsystems
+        '''
+        constraints = Constraints(outputs, self.hardware)
+        outputs = constraints.get_all()
+        
+        propulsion = Propulsion(outputs, self.hardware)
+        outputs = propulsion.get_all()
+
+        power = Power(outputs, self.hardware)
+        outputs = power.get_all()
 
-        for _ in range(self.iterations):
-            
-            outputs = self.inputs.copy()
+        #stab_n_con = StabnCon()
+        
+        # aerodynamics = Aerodynamics(outputs, self.hardware)
+        # outputs = aerodynamics.get_all()
 
-            constraints = Constraints(outputs, self.hardware)
-            outputs = constraints.get_all()
-            
-            propulsion = Propulsion(outputs, self.hardware)
-            outputs = propulsion.get_all()
+        structures = Structures(outputs, self.hardware)
+        outputs = structures.get_all()
 
-            power = Power(outputs, self.hardware)
-            outputs = power.get_all()
+        cg_envelope = CGEnvelope(outputs, self.hardware)
+        outputs = cg_envelope.get_all()
 
-            #stab_n_con = StabnCon()
-            
-            # aerodynamics = Aerodynamics(outputs, self.hardware)
-            # outputs = aerodynamics.get_all()
+        #thermal = Thermal(outputs)
+        #outputs = thermal.get_all()
 
-            # structures = Structures(outputs, self.hardware)
-            # outputs = structures.get_all()
+        return outputs
+
+    def accelerate(self, x: np.ndarray, g: np.ndarray, dx: list[np.ndarray], dg: list[np.ndarray]) -> np.ndarray:
+        '''
+        Anderson mixing of the last passes, x are the inputs and g the outputs of the current pass, dx and dg hold the
+        differences between consecutive passes. With a depth of one this is the vector form of Aitken's method.
+        '''
+        f = g - x
+        if not dx:
+            return g
+        dF = np.column_stack([dgi - dxi for dxi, dgi in zip(dx, dg)])
+        dG = np.column_stack(dg)
+        scale = np.maximum(np.abs(g), 1e-12) # Work in relative terms, the keys differ by orders of magnitude
+        gamma, *_ = np.linalg.lstsq(dF / scale[:, None], f / scale, rcond=None)
+        x_new = g - dG @ gamma
+        return x_new if np.all(np.isfinite(x_new)) else g
 
-            #thermal = Thermal(outputs)
-            #outputs = thermal.get_all()
+    def size(self):
+        '''
+        Fixed-point iteration of the sizing passes. Every pass starts from the outputs of the previous one, the
+        float outputs are checked against their relative tolerance and optionally accelerated. The residual of every
+        pass is stored in convergence_history.
+        '''
+        outputs = self.inputs.copy()
+        dx, dg = [], []
+        x_prev = g_prev = None
+        self.convergence_history = []
+        self.history_data = []
+        self.converged = False
+
+        for iteration in range(self.iterations):
+
+            new_outputs = self.sizing_pass(outputs.copy())
+
+            worst, worst_key = max_relative_change(outputs, new_outputs, self.key_tolerances, self.rel_tol)
+            keys = [key for key in float_keys(new_outputs) if key in outputs]
+            residual = np.array([new_outputs[key] - outputs[key] for key in keys], dtype=float)
+            self.convergence_history.append({
+                'iteration': iteration + 1,
+                'residual_norm': float(np.linalg.norm(residual)),
+                'max_scaled_residual': worst,
+                'worst_key': worst_key,
+            })
 
             if self.history:
-                self.history_data.update(outputs)  
+                self.history_data.append(new_outputs.copy())
+
+            self.n_iterations = iteration + 1
+            if worst <= 1.:
+                self.converged = True
+                outputs = new_outputs
+                break
+
+            if self.acceleration is not None and keys:
+                x = np.array([float(outputs[key]) for key in keys])
+                g = np.array([float(new_outputs[key]) for key in keys])
+                if x_prev is not None and len(x_prev) == len(x):
+                    dx.append(x - x_prev)
+                    dg.append(g - g_prev)
+                    dx, dg = dx[-self.anderson_depth:], dg[-self.anderson_depth:]
+                else:
+                    dx, dg = [], []
+                x_prev, g_prev = x, g
+                for key, value in zip(keys, self.accelerate(x, g, dx, dg)):
+                    new_outputs[key] = value
+
+            outputs = new_outputs
 
         # performance = Performance(outputs) # - potentially add the final performance metrics here
         # outputs = structures.get_all()
 
         if self.verbose:
-            print("UAV sizing completed after", self.iterations, "iterations.")
+            status = "converged" if self.converged else "did not converge"
+            print(f"UAV sizing {status} after {self.n_iterations} iterations.")
 
         return outputs
 
@@ -80,9 +192,10 @@ class UAV:
 if __name__ == '__main__':
     # Perform sanity checks here
     from inputs import initial_inputs
+    from hardware_inputs import components
     inputs = initial_inputs.copy()
 
-    uav = UAV(inputs, iterations=10)
+    uav = UAV(inputs, components, iterations=10, verbose=True)
     outputs = uav.size()
 
     for key, value in outputs.items():
@@ -1,18 +1,22 @@
+import os
+
 from inputs import initial_inputs
 from hardware_inputs import components
+from design_state import DesignState
 
 from deployment import Deployment
 from hardware import Hardware
 from mission import Mission
-from uav import UAV
+from uav import UAV, max_relative_change
 from nest import Nest
 from performance import Performance
+from result_cache import ResultCache
 
 '''
 This is the file where the code actually gets executed.
 '''
 
-inputs = initial_inputs.copy()
+inputs = DesignState(initial_inputs)  # Copy-on-write design dictionary, keeps the copies in every class cheap
 
 print("Initial inputs: ")
 for key, value in inputs.items():
@@ -22,8 +26,10 @@ for key, value in inputs.items():
 inputs['mission_type'] = 'wildfire'
 # initial_inputs['mission_type'] = 'oil_spill'
 
-total_iterations = 3  # Define the total number of iterations
+total_iterations = 3  # Define the maximum number of iterations of the full chain
 history = False
+rel_tol = 1e-6  # Relative tolerance on the outputs of the full chain
+use_cache = True  # Reuse the outputs of an earlier run with the same inputs, hardware and code
 
 
 
@@ -36,7 +42,16 @@ component = hardware.get_all()
 print("\nHardware outputs:")
 print(component)
 
-for _ in range(total_iterations):
+cache = ResultCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'results.sqlite')) if use_cache else None
+settings = {'total_iterations': total_iterations, 'rel_tol': rel_tol}
+cached_outputs = cache.get('chain', inputs, {'components': components, 'settings': settings}) if cache else None
+if cached_outputs is not None:
+    print("\nUsing cached outputs of an earlier run.")
+    outputs = cached_outputs
+
+for _ in range(total_iterations if cached_outputs is None else 0):
+
+    previous_outputs = outputs
 
     deployment = Deployment(outputs, strategy='perimeter', amt=outputs['mission_perimeter'])
     outputs = deployment.get_all()
@@ -47,17 +62,28 @@ for _ in range(total_iterations):
     mission = Mission(outputs, verbose=False)
     outputs = mission.get_all()
 
-    uav = UAV(outputs, component, iterations=10, history=False, verbose=False)
+    uav = UAV(outputs, component, iterations=10, history=history, rel_tol=rel_tol, verbose=False)
     outputs = uav.get_all()
 
     nest = Nest(outputs, components, adjust_n_uavs=False, verbose=False)
     outputs = nest.get_all()
 
 
-    print(f"Iteration percentage: {(_ + 1) / total_iterations * 100:.2f}%")
+    print(f"Iteration percentage: {(_ + 1) / total_iterations * 100:.2f}%, UAV sizing passes: {uav.n_iterations}")
 
     if history:
-        print("History is enabled, but not implemented in this run.")
+        for entry in uav.convergence_history:
+            print(entry)
+
+    change, key = max_relative_change(previous_outputs, outputs, rel_tol=rel_tol)
+    if change <= 1.:
+        print(f"Sizing converged after {_ + 1} iterations.")
+        break
+
+if cache is not None:
+    if cached_outputs is None:
+        cache.put('chain', inputs, {'components': components, 'settings': settings}, outputs)
+    print(f"Result cache: {cache.get_statistics()}")
 
 #performance = Performance(outputs, components)
 #outputs = performance.get_all()
@@ -4,37 +4,121 @@ This is the file for the deployment subsystem. It contains a single class. Perim
 import numpy as np
 import sys
 import os
+from functools import lru_cache
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-def compute_outer_diameter(length: float, thickness:float, internal_diameter:float) -> float:
+def spiral_arc_length(radius: float | np.ndarray, b: float | np.ndarray) -> float | np.ndarray:
+    '''
+    Arc length of the Archimedes spiral r = a + b*theta measured from r = 0 up to the given radius.
+    Follows from integrating sqrt(r^2 + b^2) dr / b analytically.
+    '''
+    root = np.sqrt(radius**2 + b**2)
+    return (radius * root + b**2 * np.arcsinh(radius / b)) / (2 * b)
+
+def compute_outer_diameter(length: float | np.ndarray, thickness: float | np.ndarray, internal_diameter: float | np.ndarray,
+                           tol: float = 1e-12, max_iter: int = 50) -> float | np.ndarray:
     '''
     Archimedes spiral
+
+    Outer diameter of a sheet of given length and thickness rolled around a core of the given internal diameter.
+    The arc length of the spiral is known in closed form, it is inverted for the outer radius with Newton's method.
+    The starting point (the radius at which the annulus area equals length*thickness) always lies above the solution and
+    the arc length is convex in the radius, so the iteration converges monotonically, usually in 3-4 steps.
+    All inputs can be NumPy arrays, they are broadcast against each other and all roll diameters are solved at once.
     '''
+    length, thickness, internal_diameter = np.broadcast_arrays(np.asarray(length, dtype=float),
+                                                               np.asarray(thickness, dtype=float),
+                                                               np.asarray(internal_diameter, dtype=float))
 
     a = internal_diameter / 2
     b = thickness / (2 * np.pi)
-    def arc_length(theta):
-        r = a + b * theta
-        return np.sqrt(r**2 + b**2)
-    
-    s = 0
-    theta = 0
-    dtheta = 0.01
+    target = spiral_arc_length(a, b) + np.maximum(length, 0.)
+
+    r = np.sqrt(a**2 + 2 * b * np.maximum(length, 0.))  # Area-based estimate, upper bound of the true radius
+    for _ in range(max_iter):
+        step = (spiral_arc_length(r, b) - target) * b / np.sqrt(r**2 + b**2)
+        r = r - step
+        if np.all(np.abs(step) <= tol * np.maximum(r, 1.)):
+            break
+
+    outer_diameter = 2 * r
+    if outer_diameter.ndim == 0:
+        return float(outer_diameter)
+    return outer_diameter
 
-    while s < length:
-        s += arc_length(theta) * dtheta
-        theta += dtheta
+def perimeter_layout(aerogel_length, aerogel_width, firebreak_width, deployment_accuracy) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Chooses the most efficient deployment direction (see Deployment.perimeter_creation for the definitions).
+    All inputs can be arrays and are broadcast against each other.
 
-    r_final = a + b * theta
-    outer_diameter = 2 * r_final
-    return outer_diameter
+    Outputs:
+    lengthwise: True where the aerogel is deployed lengthwise, False where it is deployed widthwise
+    n_layers: the number of aerogel layers needed to cover the firebreak width
+    eff_length: effective added perimeter length of one column of aerogels
+    '''
+    # Lengthwise
+    n_layers_l = np.ceil(((firebreak_width - aerogel_width) / (aerogel_width - deployment_accuracy)) + 1) # Number of layers needed to cover the firebreak width (rounded up) 
+    eff_length_l = (aerogel_length - deployment_accuracy) # Effective added perimeter length by adding one column of aerogels in the direction of the perimeter
+
+    # Widthwise
+    n_layers_w = np.ceil(((firebreak_width - aerogel_length) / (aerogel_length - deployment_accuracy)) + 1) # Number of layers needed to cover the firebreak width (rounded up)
+    eff_length_w = (aerogel_width - deployment_accuracy) # Effective added perimeter length by adding one column of aerogels in the direction of the perimeter
+
+    lengthwise = np.asarray(eff_length_l / n_layers_l > eff_length_w / n_layers_w)
+    n_layers = np.where(lengthwise, n_layers_l, n_layers_w)
+    eff_length = np.where(lengthwise, eff_length_l, eff_length_w)
+    return lengthwise, n_layers, eff_length
+
+def perimeter_from_aerogels(nr_aerogels, n_layers, eff_length, deployment_accuracy) -> np.ndarray:
+    '''
+    Perimeter length created by a given amount of aerogels, only complete layers act as an effective firebreak
+    '''
+    amt = nr_aerogels - (nr_aerogels % n_layers) # Round down to the nearest multiple of n_layers
+    return np.asarray(((eff_length)*(amt) / n_layers) + deployment_accuracy)
+
+def aerogels_for_perimeter(perimeter, n_layers, eff_length, deployment_accuracy) -> np.ndarray:
+    '''
+    Number of aerogels needed to cover the required perimeter length, rounded up to the nearest whole number
+    '''
+    return np.asarray(np.ceil(((perimeter - deployment_accuracy) / eff_length)* n_layers))
+
+AEROGEL_CACHE_SIZE = 4096 # Number of distinct aerogel geometries kept in memory by aerogel_sizing
+
+@lru_cache(maxsize=AEROGEL_CACHE_SIZE)
+def aerogel_sizing(payload_mass: float, n_ferro_magnets: int, ferro_magnet_mass: float, deployment_added_mass: float,
+                   aerogel_width: float, aerogel_thickness: float, aerogel_density: float, epm_diameter: float) -> tuple[float, float, float]:
+    '''
+    Aerogel mass, length and rolled up diameter for a given payload mass and aerogel geometry.
+
+    The result only depends on the arguments, so it is memoized with a bounded LRU cache that is shared by every
+    Deployment instance (and thereby Mission and Performance). Use aerogel_sizing.cache_info() for the hit/miss
+    counters and aerogel_sizing.cache_clear() to reset it.
+    '''
+    aerogel_mass = payload_mass - ferro_magnet_mass*n_ferro_magnets - deployment_added_mass
+    aerogel_length = aerogel_mass / (aerogel_width*aerogel_thickness*aerogel_density)
+    aerogel_diameter = compute_outer_diameter(aerogel_length, aerogel_thickness, epm_diameter)
+
+    return aerogel_mass, round(aerogel_length, 2), aerogel_diameter
 
 class Deployment:
     '''
     The deployment class contains the aerogel sizing and the deployment subsystem sizing. 
     '''
 
+    input_keys = (
+        'mission_perimeter', 'payload_mass', 'aerogel_width', 'aerogel_thickness', 'aerogel_density',
+        'n_ferro_magnets', 'ferro_magnet_mass', 'deployment_added_mass', 'wire_length', 'wire_density',
+        'n_wire', 'spring_mass', 'winch_mass', 'n_pulleys', 'pulley_mass', 'n_epms', 'epm_diameter',
+        'epm_mass', 'deployment_system_volume', 'deployment_speed', 'deployment_time_margin',
+        'power_required_epm', 'epm_duration', 'power_required_winch', 'deployment_accuracy',
+        'firebreak_width', 'fuselage_size'
+    )
+    output_keys = (
+        'aerogel_mass', 'aerogel_length', 'aerogel_diameter', 'power_deploy', 'total_deployment_energy',
+        'wire_mass', 'deployment_system_mass', 'time_deploy', 'nr_aerogels', 'per_length'
+    )
+
     def __init__(self, inputs: dict[str, float], strategy, amt) -> None:
         self.inputs = inputs
 
@@ -80,13 +164,10 @@ class Deployment:
 
     def aerogel_size(self) -> float:
         '''
-        Aerogel dimensions and mass based on available payload mass
+        Aerogel dimensions and mass based on available payload mass, looked up in the shared aerogel_sizing cache
         '''
-        aerogel_mass = self.payload_mass - self.ferro_magnet_mass*self.n_ferro_magnets - self.deployment_added_mass
-        aerogel_length = aerogel_mass / (self.aerogel_width*self.aerogel_thickness*self.aerogel_density)
-        aerogel_diameter = compute_outer_diameter(aerogel_length, self.aerogel_thickness, self.epm_diameter)
-
-        return aerogel_mass, round(aerogel_length, 2), aerogel_diameter
+        return aerogel_sizing(self.payload_mass, self.n_ferro_magnets, self.ferro_magnet_mass, self.deployment_added_mass,
+                              self.aerogel_width, self.aerogel_thickness, self.aerogel_density, self.epm_diameter)
     
     def wire_mass(self) -> float:
         '''
@@ -145,44 +226,81 @@ class Deployment:
         _, aerogel_length, _ = self.aerogel_size()
 
         # Decide whether the aerogels will be deployed length or widthwise.
+        lengthwise, n_layers, eff_length = perimeter_layout(aerogel_length, self.aerogel_width, self.firebreak_width, self.deployment_accuracy)
+        n_layers, eff_length = n_layers.item(), eff_length.item()
 
-        # Lengthwise
-        n_layers_l = np.ceil(((self.firebreak_width - self.aerogel_width) / (self.aerogel_width - self.deployment_accuracy)) + 1) # Number of layers needed to cover the firebreak width (rounded up) 
-        eff_length_l = (aerogel_length - self.deployment_accuracy) # Effective added perimeter length by adding one column of aerogels in the direction of the perimeter
-
-        # Widthwise
-        n_layers_w = np.ceil(((self.firebreak_width - aerogel_length) / (aerogel_length - self.deployment_accuracy)) + 1) # Number of layers needed to cover the firebreak width (rounded up)
-        eff_length_w = (self.aerogel_width - self.deployment_accuracy) # Effective added perimeter length by adding one column of aerogels in the direction of the perimeter
-
-        if eff_length_l / n_layers_l > eff_length_w / n_layers_w: # This chooses the most efficient deployment direction
-            eff_length = eff_length_l
+        if lengthwise:
             method = 'l'
-            n_layers = n_layers_l
             if verbose:
-                print('The aerogel is deployed lengthwise, number of layers is: ', n_layers_l,
+                print('The aerogel is deployed lengthwise, number of layers is: ', n_layers,
                       '\n effective length:', eff_length)
         else:
-            eff_length = eff_length_w
-            n_layers = n_layers_w
             if verbose:
-                print('The aerogel is deployed widthwise, number of layers is: ', n_layers_w, 
+                print('The aerogel is deployed widthwise, number of layers is: ', n_layers, 
                       '\n effective length:', eff_length)
             method = 'w'
 
         if self.strategy == 'nr_aerogels':
-            amt = self.amt - (self.amt % n_layers) # Round down to the nearest multiple of n_layers as only a complete layer acts as an effective firebreak
-            per_length = ((eff_length)*(amt) / n_layers) + self.deployment_accuracy # Perimeter length based on the number of complete layers 
+            per_length = perimeter_from_aerogels(self.amt, n_layers, eff_length, self.deployment_accuracy).item()
             if test:
                 return method, per_length
             return per_length
     
         elif self.strategy == 'perimeter':
-            nr_aerogels = np.ceil(((self.amt - self.deployment_accuracy) / eff_length)* n_layers) # Number of aerogels needed to cover the required perimeter length, rounded up to the nearest whole number
+            nr_aerogels = aerogels_for_perimeter(self.amt, n_layers, eff_length, self.deployment_accuracy).item()
             if test:
                 return method, nr_aerogels
             return nr_aerogels
         else:
             print('Not a valid strategy option')
+
+    def perimeter_creation_batch(self, amt=None, firebreak_width=None, aerogel_width=None, deployment_accuracy=None,
+                                 payload_mass=None, strategy: str | None = None) -> dict[str, np.ndarray]:
+        '''
+        Batched version of perimeter_creation, all scenarios are evaluated in a single NumPy pass.
+
+        Inputs:
+        amt, firebreak_width, aerogel_width, deployment_accuracy, payload_mass: scalars or arrays, they are broadcast
+            against each other (e.g. perimeters[:, None] against aerogel widths[None, :]). Inputs left as None take
+            the value of this Deployment instance.
+        strategy: either 'nr_aerogels' OR 'perimeter', defaults to the strategy of this instance
+
+        Outputs (dictionary of arrays with the broadcast shape):
+        nr_aerogels or per_length: depending on the strategy, as in perimeter_creation
+        n_layers: the number of aerogel layers needed to cover the required firebreak width
+        lengthwise: True where the aerogel is deployed lengthwise, False where it is deployed widthwise
+        method: 'l' or 'w', the chosen orientation in the notation of perimeter_creation
+        aerogel_length: the length of the aerogel sheet belonging to each payload mass
+        '''
+        strategy = self.strategy if strategy is None else strategy
+        if strategy not in ('nr_aerogels', 'perimeter'):
+            raise ValueError(f"Not a valid strategy option: {strategy}")
+
+        amt = np.asarray(self.amt if amt is None else amt, dtype=float)
+        firebreak_width = np.asarray(self.firebreak_width if firebreak_width is None else firebreak_width, dtype=float)
+        aerogel_width = np.asarray(self.aerogel_width if aerogel_width is None else aerogel_width, dtype=float)
+        deployment_accuracy = np.asarray(self.deployment_accuracy if deployment_accuracy is None else deployment_accuracy, dtype=float)
+        payload_mass = np.asarray(self.payload_mass if payload_mass is None else payload_mass, dtype=float)
+
+        aerogel_mass = payload_mass - self.ferro_magnet_mass*self.n_ferro_magnets - self.deployment_added_mass
+        aerogel_length = np.round(aerogel_mass / (aerogel_width*self.aerogel_thickness*self.aerogel_density), 2)
+
+        lengthwise, n_layers, eff_length = perimeter_layout(aerogel_length, aerogel_width, firebreak_width, deployment_accuracy)
+
+        if strategy == 'nr_aerogels':
+            result = perimeter_from_aerogels(amt, n_layers, eff_length, deployment_accuracy)
+        else:
+            result = aerogels_for_perimeter(amt, n_layers, eff_length, deployment_accuracy)
+
+        shape = np.broadcast_shapes(result.shape, lengthwise.shape)
+        lengthwise = np.broadcast_to(lengthwise, shape)
+        return {
+            'nr_aerogels' if strategy == 'perimeter' else 'per_length': np.broadcast_to(result, shape),
+            'n_layers': np.broadcast_to(n_layers, shape),
+            'lengthwise': lengthwise,
+            'method': np.where(lengthwise, 'l', 'w'),
+            'aerogel_length': np.broadcast_to(aerogel_length, shape),
+        }
             
 
     # ~~~ Output functions ~~~ 
@@ -0,0 +1,151 @@
+'''
+This is the file for the design state container. It contains a single class.
+'''
+
+from collections.abc import MutableMapping
+
+_DELETED = object() # Marks a key that was removed from the shared base
+
+
+class DesignState(MutableMapping):
+    '''
+    Dictionary-like container for the design dictionary with cheap copies.
+
+    Every class in the sizing chain copies its inputs into self.outputs and most get_... functions copy them again.
+    With a plain dictionary of 400+ keys every copy allocates a new hash table. A DesignState stores the entries in
+    a shared, never modified base dictionary plus a small dictionary of changes. copy() only shares both (O(1)); the
+    changes are copied on the first write to either copy. When the changes grow large compared to the base they are
+    merged into a new base, so lookups stay at most two dictionary lookups.
+
+    It supports all dictionary-style access (indexing, get, in, len, iteration, keys/items/values, update, copy),
+    so it can be passed to every class in place of the inputs dictionary.
+    '''
+
+    __slots__ = ('_base', '_changes', '_shared', '_length')
+
+    merge_fraction = 0.25 # Merge the changes into a new base once they exceed this fraction of the base
+
+    def __init__(self, data=(), **kwargs) -> None:
+        self._base = dict(data, **kwargs)
+        self._changes = {}
+        self._shared = False
+        self._length = len(self._base)
+
+    # ~~~ Intermediate Functions ~~~
+
+    def _own_changes(self) -> None:
+        '''
+        Copy-on-write: give this state its own change dictionary before modifying it
+        '''
+        if self._shared:
+            self._changes = self._changes.copy()
+            self._shared = False
+
+    def _merge(self) -> None:
+        '''
+        Folds the changes into a new base dictionary
+        '''
+        base = self._base.copy()
+        for key, value in self._changes.items():
+            if value is _DELETED:
+                del base[key]
+            else:
+                base[key] = value
+        self._base = base
+        self._changes = {}
+        self._shared = False
+
+    def __getitem__(self, key):
+        changes = self._changes
+        if key in changes:
+            value = changes[key]
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        return self._base[key]
+
+    def __setitem__(self, key, value) -> None:
+        self._own_changes()
+        if not self.__contains__(key):
+            self._length += 1
+        self._changes[key] = value
+
+    def __delitem__(self, key) -> None:
+        if not self.__contains__(key):
+            raise KeyError(key)
+        self._own_changes()
+        if key in self._base:
+            self._changes[key] = _DELETED
+        else:
+            del self._changes[key]
+        self._length -= 1
+
+    def __contains__(self, key) -> bool:
+        changes = self._changes
+        if key in changes:
+            return changes[key] is not _DELETED
+        return key in self._base
+
+    def __iter__(self):
+        changes = self._changes
+        for key in self._base:
+            if changes.get(key) is not _DELETED:
+                yield key
+        for key, value in changes.items():
+            if key not in self._base and value is not _DELETED:
+                yield key
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return f"DesignState({dict(self.items())!r})"
+
+    def __reduce__(self):
+        return (DesignState, (dict(self.items()),))
+
+    def get(self, key, default=None):
+        changes = self._changes
+        if key in changes:
+            value = changes[key]
+            return default if value is _DELETED else value
+        return self._base.get(key, default)
+
+    # ~~~ Output functions ~~~
+
+    def copy(self) -> 'DesignState':
+        '''
+        Copy-on-write copy, the entries are shared until one of the two states is modified
+        '''
+        if len(self._changes) > self.merge_fraction * len(self._base):
+            self._merge()
+        new = DesignState.__new__(DesignState)
+        new._base = self._base
+        new._changes = self._changes
+        new._length = self._length
+        new._shared = self._shared = True
+        return new
+
+    def to_dict(self) -> dict:
+        '''
+        Plain dictionary with the same entries
+        '''
+        return dict(self.items())
+
+
+if __name__ == '__main__':
+    # Perform sanity checks here
+    import sys
+    import tracemalloc
+    from inputs import initial_inputs
+
+    tracemalloc.start()
+    states = [initial_inputs.copy() for _ in range(1000)]
+    print(f"1000 dict copies: {tracemalloc.get_traced_memory()[0] / 1e6:.2f} MB")
+    del states
+    tracemalloc.reset_peak()
+
+    state = DesignState(initial_inputs)
+    start = tracemalloc.get_traced_memory()[0]
+    states = [state.copy() for _ in range(1000)]
+    print(f"1000 DesignState copies: {(tracemalloc.get_traced_memory()[0] - start) / 1e6:.2f} MB")
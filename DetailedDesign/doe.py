@@ -0,0 +1,211 @@
+'''
+This is the file for the design of experiments runner. It contains a single class.
+'''
+
+import contextlib
+import io
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from deployment import Deployment
+from design_state import DesignState
+from hardware import Hardware
+from mission import Mission
+from nest import Nest
+from UAV import UAV, max_relative_change
+
+# Outputs stored for every design next to the varied parameters
+DEFAULT_OUTPUT_KEYS = [
+    'aerogel_mass', 'aerogel_length', 'nr_aerogels', 'trips_for_mission',
+    'time_uav_max', 'time_preparation', 'time_operation', 'total_mission_time',
+    'power_required_cruise', 'power_required_VTOL', 'required_capacity_wh',
+    'number_of_containers', 'nest_trips_capacity', 'fuel_refills_for_mission',
+    'total_nest_mass_gen', 'total_nest_mass_nogennest',
+]
+
+# Worker process state, set once per process by _init_worker
+_worker = {}
+
+
+def _init_worker(inputs: dict, components: dict, output_keys: list[str], iterations: int, rel_tol: float) -> None:
+    '''
+    Runs once in every worker process, the hardware outputs are the same for every design
+    '''
+    with contextlib.redirect_stdout(io.StringIO()):
+        hardware = Hardware(inputs, components).get_all()
+    _worker.update(inputs=inputs, components=components, hardware=hardware, output_keys=output_keys,
+                   iterations=iterations, rel_tol=rel_tol)
+
+
+def evaluate_design(point: dict) -> dict:
+    '''
+    Runs the Deployment -> Mission -> UAV -> Nest chain for one design point (a dictionary of changed inputs)
+    and returns the point together with the selected outputs. Designs that cannot be sized get an error message.
+    '''
+    outputs = DesignState(_worker['inputs'])
+    outputs.update(point)
+    row = dict(point)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for iteration in range(_worker['iterations']):
+                previous_outputs = outputs
+                outputs = Deployment(outputs, strategy='perimeter', amt=outputs['mission_perimeter']).get_all()
+                outputs = Mission(outputs).get_all()
+                outputs = UAV(outputs, _worker['hardware'], iterations=10, rel_tol=_worker['rel_tol']).get_all()
+                outputs = Nest(outputs, _worker['components']).get_all()
+                if max_relative_change(previous_outputs, outputs, rel_tol=_worker['rel_tol'])[0] <= 1.:
+                    break
+        row.update({key: outputs.get(key, np.nan) for key in _worker['output_keys']})
+        row['chain_iterations'] = iteration + 1
+        row['error'] = ''
+    except (ValueError, KeyError, ZeroDivisionError) as error:
+        row.update({key: np.nan for key in _worker['output_keys']})
+        row['chain_iterations'] = 0
+        row['error'] = f"{type(error).__name__}: {error}"
+    return row
+
+
+def evaluate_chunk(chunk: list[tuple[int, dict]]) -> list[dict]:
+    '''
+    Evaluates a chunk of (design_id, point) pairs in a worker process
+    '''
+    return [dict(design_id=design_id, **evaluate_design(point)) for design_id, point in chunk]
+
+
+class DesignOfExperiments:
+    '''
+    Runs the full sizing chain for many designs in parallel.
+
+    The designs are given as a list of dictionaries with the inputs to change, e.g. from full_factorial or
+    latin_hypercube. They are sent to a ProcessPoolExecutor in chunks, at most a few chunks per worker are in
+    flight at once, and the results are written to disk in design order as soon as a chunk is done. Files ending
+    in .parquet need pyarrow, any other file is written as CSV.
+    '''
+
+    def __init__(self, inputs: dict[str, float], components: dict, n_workers: int | None = None, chunk_size: int = 16,
+                 output_keys: list[str] | None = None, iterations: int = 3, rel_tol: float = 1e-6, verbose: bool = False) -> None:
+        if iterations < 1:
+            raise ValueError(f"iterations must be at least 1, got {iterations}")
+
+        self.inputs = dict(inputs)
+        self.components = components
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.output_keys = list(output_keys or DEFAULT_OUTPUT_KEYS)
+        self.iterations = iterations
+        self.rel_tol = rel_tol
+        self.verbose = verbose
+
+        self.n_evaluated = 0
+        self.n_failed = 0
+
+    # ~~~ Intermediate Functions ~~~
+
+    @staticmethod
+    def full_factorial(**parameters: list) -> list[dict]:
+        '''
+        All combinations of the given parameter values, e.g. full_factorial(R_max=[1e4, 2e4], number_of_UAVs=[10, 20])
+        '''
+        names = list(parameters)
+        return [dict(zip(names, values)) for values in itertools.product(*parameters.values())]
+
+    @staticmethod
+    def latin_hypercube(n_samples: int, bounds: dict[str, tuple[float, float]], integer_keys: tuple[str, ...] = (),
+                        fixed: dict | None = None, seed: int | None = None) -> list[dict]:
+        '''
+        Latin hypercube sample of n_samples designs within the given (lower, upper) bounds. Keys in integer_keys are
+        rounded to whole numbers, fixed values (e.g. the mission type) are added to every design.
+        '''
+        rng = np.random.default_rng(seed)
+        columns = {}
+        for key, (lower, upper) in bounds.items():
+            strata = (rng.permutation(n_samples) + rng.random(n_samples)) / n_samples
+            values = lower + strata * (upper - lower)
+            columns[key] = np.round(values).astype(int) if key in integer_keys else values
+        return [dict(fixed or {}, **{key: values[i].item() for key, values in columns.items()}) for i in range(n_samples)]
+
+    def chunks(self, points: list[dict]):
+        '''
+        Splits the numbered design points into chunks
+        '''
+        iterator = iter(enumerate(points))
+        while chunk := list(itertools.islice(iterator, self.chunk_size)):
+            yield chunk
+
+    def write(self, rows: list[dict], path: str, writer):
+        '''
+        Appends a chunk of results to the output file, returns the (parquet) writer to use for the next chunk
+        '''
+        table = pd.DataFrame(rows)
+        if path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, arrow_table.schema)
+            writer.write_table(arrow_table.cast(writer.schema))
+            return writer
+        table.to_csv(path, mode='a' if writer else 'w', header=not writer, index=False)
+        return True
+
+    def run(self, points: list[dict], path: str) -> str:
+        '''
+        Evaluates all design points and streams the results to path
+        '''
+        self.n_evaluated = 0
+        self.n_failed = 0
+        writer = None
+        max_in_flight = 2 * self.n_workers
+
+        with ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker,
+                                 initargs=(self.inputs, self.components, self.output_keys, self.iterations, self.rel_tol)) as executor:
+            pending = deque()
+            chunks = self.chunks(points)
+            for chunk in itertools.islice(chunks, max_in_flight):
+                pending.append(executor.submit(evaluate_chunk, chunk))
+
+            while pending:
+                rows = pending.popleft().result()
+                for chunk in itertools.islice(chunks, 1):
+                    pending.append(executor.submit(evaluate_chunk, chunk))
+
+                writer = self.write(rows, path, writer)
+                self.n_evaluated += len(rows)
+                self.n_failed += sum(1 for row in rows if row['error'])
+                if self.verbose:
+                    print(f"DOE: {self.n_evaluated}/{len(points)} designs evaluated")
+
+        if path.endswith('.parquet') and writer is not None:
+            writer.close()
+
+        return path
+
+    # ~~~ Output functions ~~~
+
+    def get_all(self, points: list[dict], path: str) -> pd.DataFrame:
+        '''
+        Runs the design of experiments and reads the results back in
+        '''
+        self.run(points, path)
+        return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+
+
+if __name__ == '__main__':
+    # Perform sanity checks here
+    import time
+    from inputs import initial_inputs
+    from hardware_inputs import components
+
+    points = DesignOfExperiments.full_factorial(mission_type=['wildfire', 'oil_spill'], R_max=[10000, 20000],
+                                                number_of_UAVs=[10, 20, 40], number_of_workers=[2, 6])
+    doe = DesignOfExperiments(initial_inputs, components, verbose=True)
+
+    start = time.perf_counter()
+    results = doe.get_all(points, 'DetailedDesign/doe_results.csv')
+    print(f"{len(results)} designs in {time.perf_counter() - start:.1f} s, {doe.n_failed} failed")
+    print(results[['mission_type', 'R_max', 'number_of_UAVs', 'number_of_workers', 'total_mission_time']])
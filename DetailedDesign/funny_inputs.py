@@ -190,7 +190,7 @@ funny_inputs.update(stab_n_con_funny_inputs)
 
 structures_funny_inputs = {
     "wing_span": 3.0,  # m, guesstimate
-    "mass_battery": 4.691 , # kg
+    "battery_mass": 4.691 , # kg
     "battery_length": 0.1393, # m 
     "mass_wing": 3, #kg
     "taper_ratio": 0.83, #-
@@ -217,8 +217,10 @@ structures_funny_inputs = {
     "tensile_strength_reduction_temp": 0.9, #- https://firesciencereviews.springeropen.com/articles/10.1186/s40038-015-0007-5#:~:text=This%20concern%20is%20exacerbated%20for,(Langhelle%20and%20Amdahl%202001).
     "E_foam": 0.123*10**9, #Pa
     "E_alu": 70.3 * 10**9, #Pa
+    "poisson_alu": 0.33, #-
     "density_alu": 2.68 * 1000, #kg/m3
     "boom_inner_diameter": 0.015, #m
+    "mass_margin": 0.05, # 5% mass margin for structures
 
     "root_chord": 0.458, #m
     "first_spar_position": 0.14, #ratio
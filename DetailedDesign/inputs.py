@@ -189,6 +189,16 @@ structures_inputs = {
     "tensile_strength_reduction_temp": 0.9,  # - https://firesciencereviews.springeropen.com/articles/10.1186/s40038-015-0007-5#:~:text=This%20concern%20is%20exacerbated%20for,(Langhelle%20and%20Amdahl%202001).
     "mass_margin": 0.05,  # 5% mass margin for structures
     "mass_structure": 5.0,  # kg, initial mass of the structure, to be updated later
+    "battery_length": 0.1393,  # m, spanwise length of the batteries
+    "mass_wing": 3,  # kg
+    "E_foam": 0.123 * 10**9,  # Pa
+    "E_alu": 70.3 * 10**9,  # Pa
+    "poisson_alu": 0.33,  # -
+    "density_alu": 2.68 * 1000,  # kg/m3
+    "boom_inner_diameter": 0.015,  # m
+    "root_chord": 0.458,  # m
+    "first_spar_position": 0.14,  # ratio of the root chord
+    "second_spar_position": 0.5,  # ratio of the root chord
 }
 inputs.update(structures_inputs)
 
@@ -376,6 +386,16 @@ stab_n_con_inputs = {
     "delta_e_max_up": np.deg2rad(20),  # max elevator deflection [rad]
     "delta_e_max_down": np.deg2rad(25),  # max elevator deflection [rad]
     "alpha_h": np.deg2rad(5),  # [rad] angle of attack at cruise
+    "Cl_beta": -0.05,  # [1/rad] dihedral effect (estimate)
+    # The fuselage ahead of the CG is directionally destabilising (body term Cn_beta_B, Roskam Airplane Design
+    # Part VI), it is lumped into a 20 % reduction of the fin contribution to Cn_beta (estimate)
+    "Cn_beta_fin_factor": 0.8,  # [-] share of the fin Cn_beta left for the aircraft
+    # ───────────────────────────────────────────────────────────────────────
+    # Inertia (nondimensional radii of gyration, Roskam single-engine prop)
+    # ───────────────────────────────────────────────────────────────────────
+    "Rx_bar": 0.25,  # [-] roll, w.r.t. the wing span
+    "Ry_bar": 0.38,  # [-] pitch, w.r.t. the fuselage length
+    "Rz_bar": 0.39,  # [-] yaw, w.r.t. the average of span and fuselage length
     # ───────────────────────────────────────────────────────────────────────
     # Environmental & propulsion limits
     # ───────────────────────────────────────────────────────────────────────
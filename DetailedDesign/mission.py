@@ -9,8 +9,62 @@ from deployment import Deployment
 This is the file for the mission. It contains a single class.
 '''
 
+def launch_time(number_of_UAVs, number_of_workers, number_of_containers, cap_gen, cap_nogen,
+                time_uav_setup: float, time_min_launch, time_walk_between_containers: float) -> np.ndarray:
+    """
+    Closed-form version of the launch procedure in Mission.calc_time_preparation.
+
+    The generator nest is emptied first, then as many full regular nests as needed, then one partially emptied
+    nest. Within a nest, the pairs of workers launch full batches of UAVs, each costing one setup time plus the
+    spacing between the UAVs of the batch, and a leftover partial batch costs one more setup time. The workers walk
+    to the next container whenever UAVs are still left to launch.
+    All inputs can be arrays and are broadcast against each other, e.g. over (workers, UAVs, containers).
+    Returns
+    -------
+    np.ndarray
+        The time needed to launch all UAVs [s], excluding the nest setup.
+    """
+    number_of_UAVs = np.maximum(np.asarray(number_of_UAVs), 0)
+    pairs = np.asarray(number_of_workers) // 2
+    cap_gen = np.asarray(cap_gen)
+    cap_nogen = np.asarray(cap_nogen)
+
+    def nest_time(uavs_this_nest):
+        # full batches launched in parallel plus the leftover (partial) batch
+        full_batches = uavs_this_nest // pairs
+        partial = uavs_this_nest % pairs
+        return full_batches * (time_uav_setup + (pairs - 1) * time_min_launch) + (partial > 0) * time_uav_setup
+
+    n_nogen_nests = np.maximum(np.asarray(number_of_containers) - 1, 0)
+    safe_cap_nogen = np.maximum(cap_nogen, 1)
+
+    uavs_gen = np.minimum(cap_gen, number_of_UAVs)
+    remaining = number_of_UAVs - uavs_gen
+    nogen_nests_needed = np.where(cap_nogen > 0, -(-remaining // safe_cap_nogen), np.where(remaining > 0, n_nogen_nests + 1, 0))
+
+    full_nests = np.minimum(np.where(cap_nogen > 0, remaining // safe_cap_nogen, 0), n_nogen_nests)
+    uavs_last_nest = np.where(nogen_nests_needed <= n_nogen_nests, remaining - full_nests * cap_nogen, 0)
+
+    # Walk after every nest except the last one, or after every nest if the UAVs do not fit in the containers
+    walks = np.where(nogen_nests_needed <= n_nogen_nests, nogen_nests_needed, n_nogen_nests + 1)
+
+    return (nest_time(uavs_gen) + full_nests * nest_time(cap_nogen) + nest_time(uavs_last_nest)
+            + walks * time_walk_between_containers)
+
+
 class Mission:
 
+    input_keys = (
+        'number_of_UAVs', 'number_of_containers', 'capacity_gen', 'capacity_nogen', 'number_of_workers',
+        'margin', 'h_cruise', 'ROC_VTOL', 'ROD_VTOL', 'V_cruise', 'wind_speed', 'time_transition',
+        'time_deploy', 'time_scan', 'mission_type', 'mission_perimeter', 'oil_mass', 'R_max', 'R_min'
+    ) + Deployment.input_keys
+    output_keys = (
+        'trips_for_mission', 'time_uav_max', 'time_uav_min', 'time_cruise_max', 'time_cruise_min',
+        'time_ascent', 'time_descent', 'time_turnaround', 'time_preparation', 'time_operation',
+        'time_wrapup', 'total_mission_time'
+    )
+
     def __init__(self, inputs: dict[str, float], verbose: bool = False) -> None:
         
         self.inputs = inputs
@@ -135,57 +189,18 @@ class Mission:
             print(f"Number of Workers: {self.number_of_workers}")
 
         pairs = self.number_of_workers // 2
-        
-        uavs_launched = 0
-        total_time = 0.0
-
-
-        #print(f"\n\n\nDEBUG\n\n\n {type(self.cap_gen)} : {type(self.cap_nogen)} : {type(self.number_of_containers)}\n\n\n")
-        # list of nest capacities: first nest is the generator nest with 6 UAVs
-        nest_capacities = [self.cap_gen] + [self.cap_nogen] * (self.number_of_containers - 1)
-        # (you’d set number_of_containers_minus_one appropriately elsewhere)
-
 
         if self.verbose:
-            print(f"Nest Capacities: {nest_capacities}")
+            print(f"Nest Capacities: {[self.cap_gen] + [self.cap_nogen] * (self.number_of_containers - 1)}")
             print(f"Number of Pairs: {pairs}")
             print(f"Number of UAVs: {self.number_of_UAV}")
             print(f"Time Nest Setup: {time_nest_setup} seconds")
             print(f"Time UAV Setup: {time_uav_setup} seconds")
 
-        for cap in nest_capacities:
-            if uavs_launched >= self.number_of_UAV:
-                break
-
-            # time to set up this nest
-            #total_time += self.time_open_container
-
-            # how many UAVs we will actually take from this nest
-            remaining = self.number_of_UAV - uavs_launched
-            uavs_this_nest = min(cap, remaining)
-
-            # full batches we can launch in parallel
-            full_batches = uavs_this_nest // pairs
-            # and the leftover (partial) batch size
-            partial = uavs_this_nest % pairs
-
-            # for each full batch:
-            for _ in range(full_batches):
-                # setup time (all pairs work in parallel on one UAV each, so
-                # total time is just one setup time per batch)
-                total_time += time_uav_setup
-                # need spacing delays between UAVs in the batch
-                total_time += (pairs - 1) * self.time_min_launch
-                uavs_launched += pairs
-
-            # if there’s a leftover partial batch, we only add one more setup time
-            if partial > 0:
-                total_time += time_uav_setup
-                uavs_launched += partial
-
-            # if we still need more, walk to next container
-            if uavs_launched < self.number_of_UAV:
-                total_time += self.time_walk_between_containers
+        # first nest is the generator nest, the others are regular nests, see launch_time for the procedure
+        total_time = float(launch_time(self.number_of_UAV, self.number_of_workers, self.number_of_containers,
+                                       self.cap_gen, self.cap_nogen, time_uav_setup, self.time_min_launch,
+                                       self.time_walk_between_containers))
 
         self.time_launch = total_time
         self.time_preparation = total_time + time_nest_setup
@@ -369,6 +384,125 @@ class Mission:
     
 
 
+class MissionBatch:
+    """
+    Vectorized mission timing for sweeps. Instead of constructing a Mission per grid point, the varying mission
+    parameters are given as arrays (broadcast against each other) and all mission times are computed in one
+    NumPy pass. Everything that is not given is taken from the inputs dictionary, the timing constants come from Mission.
+    """
+
+    def __init__(self, inputs: dict[str, float], R_max=None, wind_speed=None, oil_mass=None, mission_perimeter=None,
+                 number_of_UAVs=None, number_of_workers=None, number_of_containers=None, mission_type: str | None = None) -> None:
+
+        self.inputs = inputs
+        self.outputs = self.inputs.copy()
+
+        self.mission = Mission(inputs)
+        self.mission_type = inputs['mission_type'] if mission_type is None else mission_type
+
+        def as_array(value, key):
+            return np.asarray(inputs[key] if value is None else value)
+
+        self.R_max = as_array(R_max, "R_max").astype(float)
+        self.wind_speed = as_array(wind_speed, "wind_speed").astype(float)
+        self.oil_mass = as_array(oil_mass, "oil_mass").astype(float)
+        self.mission_perimeter = as_array(mission_perimeter, "mission_perimeter").astype(float)
+        self.number_of_UAV = as_array(number_of_UAVs, "number_of_UAVs").astype(int)
+        self.number_of_workers = as_array(number_of_workers, "number_of_workers").astype(int)
+        self.number_of_containers = as_array(number_of_containers, "number_of_containers").astype(int)
+
+    # ~~~ Intermediate Functions ~~~
+
+    def calc_time_turn_around(self) -> None:
+        """
+        Time between launches for every scenario, see Mission.calc_time_turn_around.
+        """
+        m = self.mission
+        time_turnaround_min = m.time_turnaround_check + m.time_reload_aerogel + m.time_replace_battery
+        self.time_min_launch = time_turnaround_min / (self.number_of_workers // 2)
+
+    def calc_time_preparation(self) -> None:
+        """
+        Launch and preparation time for every scenario, see Mission.calc_time_preparation.
+        """
+        if np.any(self.number_of_workers < 2):
+            raise ValueError("Number of workers must be at least 2 for preparation time calculation.")
+
+        self.calc_time_turn_around()
+        m = self.mission
+
+        time_nest_setup = m.time_open_container + m.time_startup_nest
+        time_uav_setup = m.time_unload_uav + m.time_assemble_uav + m.time_position_uav + m.time_startup_uav
+
+        self.time_launch = launch_time(self.number_of_UAV, self.number_of_workers, self.number_of_containers,
+                                       m.cap_gen, m.cap_nogen, time_uav_setup, self.time_min_launch,
+                                       m.time_walk_between_containers)
+        self.time_preparation = self.time_launch + time_nest_setup
+
+    def uav_mission_time(self) -> None:
+        """
+        Duration of a single UAV sortie for every scenario, see Mission.uav_mission_time.
+        """
+        self.calc_time_turn_around()   # calculate time for turnaround
+        m = self.mission
+        time_ascent = m.h_cruise / m.V_climb_v
+        time_descent = m.h_cruise / m.V_descent
+        time_cruise = self.R_max / (m.V_cruise - self.wind_speed) # Slowest-case scenario, wind against the UAV
+
+        self.time_uav = (2 * time_ascent + 4 * m.time_transition + 2 * time_cruise + m.time_scan
+                         + 2 * time_descent + m.time_deploy + self.time_min_launch)
+
+    def calc_UAV_runs(self) -> None:
+        """
+        Number of trips needed for every scenario, see Mission.calc_UAV_runs.
+        """
+        if self.mission_type == "wildfire":
+            self.num_trips = self.mission.deployment.perimeter_creation_batch(amt=self.mission_perimeter, strategy='perimeter')['nr_aerogels']
+
+        elif self.mission_type == "oil_spill":
+            aerogel_mass, _, _ = self.mission.deployment.aerogel_size()
+            self.num_trips = np.ceil((self.oil_mass / self.mission.aerogel_absorption_factor) / aerogel_mass)
+
+        else:
+            raise ValueError(f"Unsupported mission type: {self.mission_type}")
+
+    def calc_time_operation(self) -> None:
+        """
+        Operation time for every scenario, see Mission.calc_time_operation.
+        """
+        self.uav_mission_time()
+        self.calc_UAV_runs()
+
+        self.num_cycles = self.num_trips / self.number_of_UAV
+        self.time_operation = self.num_cycles * self.time_uav
+
+    def calc_total_mission_time(self) -> None:
+        """
+        Total mission time for every scenario, see Mission.calc_total_mission_time.
+        """
+        self.calc_time_preparation()
+        self.calc_time_operation()
+
+        self.total_mission_time = self.time_preparation + self.time_operation
+
+    # ~~~ Output functions ~~~
+
+    def get_all(self) -> dict[str, np.ndarray]:
+
+        self.calc_total_mission_time()
+        shape = np.broadcast_shapes(np.shape(self.time_preparation), np.shape(self.time_operation))
+
+        self.outputs["trips_for_mission"] = np.broadcast_to(self.num_trips, shape)
+        self.outputs["time_uav_max"] = np.broadcast_to(self.time_uav, shape)
+        self.outputs["time_turnaround"] = np.broadcast_to(self.time_min_launch, shape)
+        self.outputs["time_launch"] = np.broadcast_to(self.time_launch, shape)
+        self.outputs["time_preparation"] = np.broadcast_to(self.time_preparation, shape)
+        self.outputs["time_operation"] = np.broadcast_to(self.time_operation, shape)
+        self.outputs["total_mission_time"] = np.broadcast_to(self.total_mission_time, shape)
+
+        return self.outputs
+
+
 # ==========================================================
 
 if __name__ == '__main__':
@@ -6,6 +6,17 @@ This is the file for the nest. It contains a single class.
 
 class Nest:
 
+    input_keys = (
+        'number_of_UAVs', 'trips_for_mission', 'required_capacity_wh', 'time_preparation', 'time_wrapup',
+        'time_uav_max', 'total_mission_time', 'wing_span', 'wing_area', 'mac', 'thickness_to_chord_ratio',
+        'M_to', 'biodiesel_energy_density', 'biodiesel_density'
+    )
+    output_keys = (
+        'number_of_containers', 'capacity_gen', 'capacity_nogen', 'number_of_UAVs', 'nest_trips_capacity',
+        'nest_cycles_capacity', 'fuel_refills_for_mission', 'total_nest_power_required',
+        'total_nest_mass_gen', 'total_nest_mass_nogennest'
+    )
+
     def __init__(self, inputs: dict[str, float], components, adjust_n_uavs=False, verbose: bool = False) -> None:
 
         self.verbose = verbose
@@ -3,7 +3,7 @@ import math
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from mission import Mission
+from mission import Mission, MissionBatch
 
 from deployment import Deployment
 
@@ -71,31 +71,16 @@ class Performance:
         
         if plot:
 
-            range_range = range(10000, 25000, 1000)
-            oil_range = range(1000, 9001, 1000)
-            perimeter_range = range(100, 601, 100)
-            
-            time_range = []
-            grid = []
-            for r in range_range:
-                for m in oil_range:
-                    mis = Mission(self.inputs)
-                    mis.oil_mass = m
-                    mis.mission_type = 'oil_spill'
-                    mis.R_max = r
-                    mis.calc_total_mission_time()
-                    res = mis.total_mission_time / (60)
-                    time_range.append(res)
-                    grid.append((r, m))
-                    if r == 20000 and m == 7000:
-                        print(res)
-
-
-            range_vals = sorted(set([pt[0] for pt in grid]))
-            oil_vals = sorted(set([pt[1] for pt in grid]))
-
-            Z = np.array(time_range).reshape(len(range_vals), len(oil_vals)).T
-            X, Y = np.meshgrid(range_vals, oil_vals)  # X: range, Y: AR
+            # All grid points are evaluated at once with MissionBatch instead of a Mission per point
+            range_vals = np.arange(10000, 25000, 1000)
+            oil_vals = np.arange(1000, 9001, 1000)
+            perimeter_vals = np.arange(100, 601, 100)
+
+            Z = MissionBatch(self.inputs, R_max=range_vals[None, :], oil_mass=oil_vals[:, None],
+                             mission_type='oil_spill').get_all()['total_mission_time'] / 60
+            print(Z[oil_vals == 7000, range_vals == 20000])
+
+            X, Y = np.meshgrid(range_vals, oil_vals)  # X: range, Y: oil mass
 
             plt.figure(figsize=(8, 6))
             cp = plt.contourf(X, Y, Z, cmap='plasma')
@@ -105,28 +90,11 @@ class Performance:
             plt.savefig('DetailedDesign\plots\oil_range.png')
             plt.show()
 
-            time_range = []
-            grid = []
-            for r in range_range:
-                for p in perimeter_range:
-                    mis = Mission(self.inputs)
-                    mis.mission_perimeter = p
-                    mis.mission_type = 'wildfire'
-                    mis.R_max = r
-                    mis.calc_total_mission_time()
-                    res = mis.total_mission_time / (60)
-                    print(res)
-                    time_range.append(res)
-                    if r == 20000 and p == 500:
-                        print(res)
-                    grid.append((r, p))
-
-
-            range_vals = sorted(set([pt[0] for pt in grid]))
-            perimeter_vals = sorted(set([pt[1] for pt in grid]))
-
-            Z = np.array(time_range).reshape(len(range_vals), len(perimeter_vals)).T
-            X, Y = np.meshgrid(range_vals, perimeter_vals)  # X: range, Y: AR
+            Z = MissionBatch(self.inputs, R_max=range_vals[None, :], mission_perimeter=perimeter_vals[:, None],
+                             mission_type='wildfire').get_all()['total_mission_time'] / 60
+            print(Z[perimeter_vals == 500, range_vals == 20000])
+
+            X, Y = np.meshgrid(range_vals, perimeter_vals)  # X: range, Y: perimeter
 
             plt.figure(figsize=(8, 6))
             cp = plt.contourf(X, Y, Z, cmap='plasma')
@@ -139,39 +107,27 @@ class Performance:
 
             
             #Deployment range based on nr_nests and nr_workers
-            uavs_range = range(10, 51)
-            workers_range = range(2, 13)
+            uavs_range = np.arange(10, 51)
+            workers_range = np.arange(2, 13)
+            nests_range = 1 + np.maximum(0, np.ceil((uavs_range - self.generator_nest_cap) / self.reg_nest_cap)).astype(int)
 
-            uav_worker_table = pd.DataFrame(index=workers_range, columns=uavs_range, dtype=float)
-
-
-            
             for strat in ['oil_spill', 'wildfire']:
-                uav_worker_table = pd.DataFrame(index=workers_range, columns=uavs_range, dtype=float)
-                for workers in workers_range:
-                    for uavs in uavs_range:
-                        nests = 1 + max(0, math.ceil((uavs - self.generator_nest_cap) / self.reg_nest_cap))
-                        mis = Mission(self.inputs)
-                        mis.mission_type = strat
-                        mis.number_of_UAV = uavs
-                        mis.number_of_workers = workers
-                        mis.number_of_containers = nests
-                        mis.calc_total_mission_time()
-
-                        dep_time = mis.total_mission_time / (60*60)
-                        if strat == 'oil_spill':
-                            unit = '[kg/h]'
-                            uav_worker_table.loc[workers, uavs] = round(self.oil_mass / dep_time)
-                            if uavs == 20 and workers == 6:
-                                print('oil', round(self.oil_mass / dep_time))
-                        else:
-                            unit = '[m/h]'
-                            if uavs == 20 and workers == 6:
-                                print('fire', round(self.mission_perimeter / dep_time))
-                            if nests <= workers <= 2 * nests:
-                                uav_worker_table.loc[workers, uavs] = round(self.mission_perimeter / dep_time)
-                            else:
-                                uav_worker_table.loc[workers, uavs] = np.nan
+                mis = MissionBatch(self.inputs, number_of_UAVs=uavs_range[None, :], number_of_workers=workers_range[:, None],
+                                   number_of_containers=nests_range[None, :], mission_type=strat)
+                dep_time = mis.get_all()['total_mission_time'] / (60*60)
+
+                if strat == 'oil_spill':
+                    unit = '[kg/h]'
+                    rates = np.round(self.oil_mass / dep_time)
+                    print('oil', rates[workers_range == 6, uavs_range == 20])
+                else:
+                    unit = '[m/h]'
+                    rates = np.round(self.mission_perimeter / dep_time)
+                    print('fire', rates[workers_range == 6, uavs_range == 20])
+                    valid = (nests_range[None, :] <= workers_range[:, None]) & (workers_range[:, None] <= 2 * nests_range[None, :])
+                    rates = np.where(valid, rates, np.nan)
+
+                uav_worker_table = pd.DataFrame(rates, index=workers_range, columns=uavs_range, dtype=float)
 
                 plt.figure(figsize=(8, 6))
                 sns.heatmap(uav_worker_table, annot=False, fmt=".2f", cmap="RdYlGn", cbar_kws={'label': f'Deployment Rate {unit}'}, annot_kws={"size": 6})
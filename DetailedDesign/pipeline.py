@@ -0,0 +1,188 @@
+'''
+This is the file for the incremental sizing pipeline. It contains a single class.
+'''
+
+from typing import Callable
+
+import numpy as np
+
+
+def same_value(a, b) -> bool:
+    '''
+    Whether two entries of a design dictionary are equal, also for arrays, nested dictionaries and NaN
+    '''
+    if a is b:
+        return True
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        try:
+            return np.array_equal(a, b, equal_nan=True)
+        except TypeError:
+            return np.array_equal(a, b)
+    try:
+        if a == b:
+            return True
+        return a != a and b != b  # both NaN
+    except (TypeError, ValueError):
+        return False
+
+
+def changed_keys(old: dict | None, new: dict) -> set[str]:
+    '''
+    Keys that were added, removed or changed value between two design dictionaries
+    '''
+    if old is None:
+        return set(new)
+    changed = {key for key in new if key not in old or not same_value(old[key], new[key])}
+    changed.update(key for key in old if key not in new)
+    return changed
+
+
+class Pipeline:
+    '''
+    Runs a chain of subsystems (e.g. Deployment -> Mission -> Constraints -> Propulsion -> Power -> Nest) and only
+    re-runs the subsystems whose inputs changed since the previous run.
+
+    Every stage is given as (name, class, make), where make(inputs) builds the subsystem object and the class declares
+    the keys it reads (input_keys) and writes (output_keys). The dependency graph follows from these keys. On a run,
+    the pipeline inputs are diffed against the previous run. A stage runs if one of its input keys is in that diff,
+    or if an upstream stage produced a changed output. Otherwise its cached outputs are reused. A class without
+    input_keys is always re-run.
+
+    Optionally a ResultCache is used to reuse stage outputs across runs and sessions. A stage is then looked up by
+    the values of its input keys and the hardware given as context, before it is run.
+    '''
+
+    def __init__(self, stages: list[tuple[str, type, Callable[[dict], object]]], verbose: bool = False,
+                 cache=None, context: dict | None = None) -> None:
+        self.stages = stages
+        self.verbose = verbose
+        self.cache = cache
+        self.context = context
+
+        self.last_inputs = None
+        self.stage_updates = {}
+        self.n_runs = {name: 0 for name, _, _ in stages}
+        self.n_skips = {name: 0 for name, _, _ in stages}
+        self.last_ran = []
+
+    # ~~~ Intermediate Functions ~~~
+
+    def dependencies(self) -> dict[str, set[str]]:
+        '''
+        Upstream stages of every stage: the earlier stages that write one of its input keys
+        '''
+        graph = {}
+        for i, (name, cls, _) in enumerate(self.stages):
+            input_keys = set(getattr(cls, 'input_keys', None) or ())
+            graph[name] = {upstream for upstream, upstream_cls, _ in self.stages[:i]
+                           if input_keys & set(getattr(upstream_cls, 'output_keys', ()))}
+        return graph
+
+    def downstream(self, name: str) -> set[str]:
+        '''
+        All stages that (indirectly) depend on the given stage
+        '''
+        graph = self.dependencies()
+        result = set()
+        for stage, _, _ in self.stages:
+            if name in graph[stage] or graph[stage] & result:
+                result.add(stage)
+        return result
+
+    def invalidate(self, name: str | None = None) -> None:
+        '''
+        Forces a stage (or all stages) to run on the next call, e.g. after changing the hardware dictionary
+        '''
+        if name is None:
+            self.last_inputs = None
+            self.stage_updates = {}
+        else:
+            self.stage_updates.pop(name, None)
+
+    def run(self, inputs: dict[str, float]) -> dict[str, float]:
+        '''
+        Runs the chain on the given inputs, skipping every stage whose inputs are unchanged
+        '''
+        dirty = changed_keys(self.last_inputs, inputs)
+        state = inputs.copy()
+        self.last_ran = []
+
+        for name, cls, make in self.stages:
+            input_keys = getattr(cls, 'input_keys', None)
+            cached = self.stage_updates.get(name)
+
+            if cached is None or input_keys is None or dirty.intersection(input_keys):
+                stage_inputs = state if input_keys is None else {key: state[key] for key in input_keys if key in state}
+                updates = self.cache.get(name, stage_inputs, self.context) if self.cache is not None else None
+                if updates is None:
+                    outputs = make(state)
+                    outputs = outputs.get_all()
+                    # Declared outputs are always written, anything else only if the stage changed it
+                    updates = {key: outputs[key] for key in getattr(cls, 'output_keys', ()) if key in outputs}
+                    updates.update({key: value for key, value in outputs.items()
+                                    if key not in updates and (key not in state or not same_value(state[key], value))})
+                    if self.cache is not None:
+                        self.cache.put(name, stage_inputs, self.context, updates)
+
+                dirty |= changed_keys(cached, updates)
+                self.stage_updates[name] = updates
+                self.n_runs[name] += 1
+                self.last_ran.append(name)
+            else:
+                updates = cached
+                self.n_skips[name] += 1
+
+            state.update(updates)
+
+        self.last_inputs = inputs.copy()
+
+        if self.verbose:
+            print(f"Pipeline ran: {self.last_ran}")
+
+        return state
+
+    # ~~~ Output functions ~~~
+
+    def get_statistics(self) -> dict[str, dict[str, int]]:
+        '''
+        Number of times every stage was run and skipped
+        '''
+        return {'runs': self.n_runs.copy(), 'skips': self.n_skips.copy(), 'last_ran': list(self.last_ran)}
+
+
+def sizing_pipeline(hardware: dict, components: dict, verbose: bool = False, cache=None) -> Pipeline:
+    '''
+    The standard sizing chain Deployment -> Mission -> Constraints -> Propulsion -> Power -> Nest.
+    hardware is the output of Hardware.get_all(), components the dictionary from hardware_inputs.
+    cache is an optional ResultCache for the outputs of every subsystem.
+    '''
+    from deployment import Deployment
+    from mission import Mission
+    from nest import Nest
+    from subsystems.constraints import Constraints
+    from subsystems.propulsion import Propulsion
+    from subsystems.power import Power
+
+    return Pipeline([
+        ('deployment', Deployment, lambda inputs: Deployment(inputs, 'perimeter', inputs['mission_perimeter'])),
+        ('mission', Mission, lambda inputs: Mission(inputs)),
+        ('constraints', Constraints, lambda inputs: Constraints(inputs, hardware)),
+        ('propulsion', Propulsion, lambda inputs: Propulsion(inputs, hardware)),
+        ('power', Power, lambda inputs: Power(inputs, hardware)),
+        ('nest', Nest, lambda inputs: Nest(inputs, components)),
+    ], verbose=verbose, cache=cache, context={'hardware': hardware, 'components': components})
+
+
+if __name__ == '__main__':
+    # Perform sanity checks here
+    from inputs import initial_inputs
+    from hardware_inputs import components
+    from hardware import Hardware
+
+    inputs = initial_inputs.copy()
+    pipeline = sizing_pipeline(Hardware(inputs, components).get_all(), components, verbose=True)
+
+    outputs = pipeline.run(inputs)
+    outputs = pipeline.run(inputs)
+    outputs = pipeline.run(dict(inputs, CD_0=0.045))
+    print(pipeline.get_statistics())
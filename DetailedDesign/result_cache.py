@@ -0,0 +1,190 @@
+'''
+This is the file for the persistent result cache. It contains a single class.
+'''
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+from functools import lru_cache
+
+import numpy as np
+
+CODE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def canonical(value):
+    '''
+    Converts a design dictionary (or any nested value in it) into plain JSON types with a fixed ordering, so equal
+    designs always give the same hash regardless of key order or NumPy scalar types
+    '''
+    if isinstance(value, dict) or hasattr(value, 'items'):
+        return {str(key): canonical(item) for key, item in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [canonical(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return {'__array__': canonical(value.tolist()), 'dtype': str(value.dtype)}
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return float(value).hex()  # exact and independent of the float formatting
+    if value is None or isinstance(value, str):
+        return value
+    return repr(value)
+
+
+def design_hash(*parts) -> str:
+    '''
+    Stable SHA-256 hash of the canonicalised parts
+    '''
+    text = json.dumps([canonical(part) for part in parts], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    '''
+    Hash of the sizing code (all Python files in DetailedDesign except the tests), so results are recomputed
+    whenever the code changes
+    '''
+    digest = hashlib.sha256()
+    for root, directories, files in os.walk(CODE_DIRECTORY):
+        directories[:] = sorted(d for d in directories if d not in ('test', '__pycache__'))
+        for name in sorted(files):
+            if name.endswith('.py'):
+                digest.update(os.path.relpath(os.path.join(root, name), CODE_DIRECTORY).encode())
+                with open(os.path.join(root, name), 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    '''
+    Content-addressed on-disk cache for sizing results, stored in a single SQLite file.
+
+    Entries are keyed by a namespace (e.g. 'chain' or a subsystem name) and a stable hash of the canonicalised
+    inputs, the hardware dictionary and the code version. The total size of the stored results is bounded, the
+    least recently used entries are evicted first. Recency is an access counter that is increased on every get and
+    put, the timestamps are only informative (coarse clocks give equal stamps for accesses close together).
+    '''
+
+    # Value of the access counter for the next get or put, shared by all connections to the file
+    NEXT_ACCESS = '(SELECT COALESCE(MAX(access), 0) + 1 FROM results)'
+
+    def __init__(self, path: str, max_bytes: int = 256 * 2**20, version: str | None = None) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = code_version() if version is None else version
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL,
+                access INTEGER NOT NULL DEFAULT 0,
+                hits INTEGER NOT NULL DEFAULT 0,
+                value BLOB NOT NULL
+            )''')
+        # Cache files written before the access counter existed
+        columns = [row[1] for row in self.connection.execute('PRAGMA table_info(results)')]
+        if 'access' not in columns:
+            self.connection.execute('ALTER TABLE results ADD COLUMN access INTEGER NOT NULL DEFAULT 0')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS results_order ON results (access)')
+        self.connection.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ~~~ Intermediate Functions ~~~
+
+    def key(self, namespace: str, inputs: dict, hardware: dict | None = None) -> str:
+        '''
+        Cache key of a result
+        '''
+        return design_hash(namespace, inputs, hardware, self.version)
+
+    def get(self, namespace: str, inputs: dict, hardware: dict | None = None):
+        '''
+        Stored result, or None if it is not in the cache
+        '''
+        key = self.key(namespace, inputs, hardware)
+        row = self.connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.connection.execute(f'UPDATE results SET last_access = ?, access = {self.NEXT_ACCESS}, hits = hits + 1 WHERE key = ?',
+                                (time.time(), key))
+        self.connection.commit()
+        return pickle.loads(row[0])
+
+    def put(self, namespace: str, inputs: dict, hardware: dict | None, value) -> None:
+        '''
+        Stores a result and evicts the least recently used results if the cache is too large
+        '''
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        self.connection.execute('INSERT OR REPLACE INTO results (key, namespace, size, created, last_access, access, value) '
+                                f'VALUES (?, ?, ?, ?, ?, {self.NEXT_ACCESS}, ?)',
+                                (self.key(namespace, inputs, hardware), namespace, len(blob), now, now, sqlite3.Binary(blob)))
+        self.evict()
+        self.connection.commit()
+
+    def cached(self, namespace: str, inputs: dict, hardware: dict | None, compute):
+        '''
+        Stored result if available, otherwise compute() is called and its result stored
+        '''
+        value = self.get(namespace, inputs, hardware)
+        if value is None:
+            value = compute()
+            self.put(namespace, inputs, hardware, value)
+        return value
+
+    def evict(self) -> None:
+        '''
+        Removes the least recently used results until the cache fits in max_bytes
+        '''
+        total = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        while total > self.max_bytes:
+            key, size = self.connection.execute('SELECT key, size FROM results ORDER BY access, rowid LIMIT 1').fetchone()
+            self.connection.execute('DELETE FROM results WHERE key = ?', (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        '''
+        Removes all results
+        '''
+        self.connection.execute('DELETE FROM results')
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    # ~~~ Output functions ~~~
+
+    def get_statistics(self) -> dict[str, float]:
+        '''
+        Hits, misses and evictions of this session and the number and size of the stored results
+        '''
+        entries, size = self.connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,277 @@
+'''
+This is the file for the discrete-event simulation of the nest operations. It contains a single class.
+'''
+
+import heapq
+from collections import deque
+
+import numpy as np
+
+from mission import Mission
+
+# Event types
+SETUP_DONE = 0          # a worker pair has unloaded, assembled and started a UAV, which then launches
+SERVICE_DONE = 1        # a worker pair has checked a returned UAV and reloaded its aerogel, the battery is next
+SWAP_DONE = 2           # the battery is replaced and the UAV launches again
+UAV_RETURN = 3          # a UAV lands back at its container
+BATTERY_CHARGED = 4     # a depleted battery is charged again
+
+
+class MissionSimulation:
+    '''
+    Heap-based discrete-event simulation of the mission, as a more detailed alternative to the algebraic
+    timing in Mission. It uses the timing constants of Mission and simulates:
+
+        -> Worker pairs: the servers of the nest. They set up UAVs from the containers, walk between containers
+           and handle the turnaround of returning UAVs. Setting up unlaunched UAVs has priority over turnarounds.
+        -> UAVs: each sortie delivers one aerogel. A UAV that returns while aerogels remain queues for a worker pair.
+        -> Turnarounds: a check and an aerogel reload, followed by a battery swap which needs a charged spare battery.
+        -> Batteries: optionally a limited pool of spare batteries which are recharged after every swap.
+        -> Containers: the generator container and the regular containers hold the UAVs, workers walk between them.
+
+    The simulation gives the mission makespan, the utilisation of workers and UAVs and queue statistics.
+    '''
+
+    def __init__(self, inputs: dict[str, float], spare_batteries: int | None = None, time_battery_charge: float = 0.,
+                 staggered_returns: bool = False, seed: int | None = None, verbose: bool = False) -> None:
+
+        self.inputs = inputs
+        self.outputs = self.inputs.copy()
+        self.verbose = verbose
+
+        self.mission = Mission(inputs)
+        mission = self.mission
+
+        self.number_of_UAV = int(mission.number_of_UAV)
+        self.number_of_workers = int(mission.number_of_workers)
+        self.number_of_containers = max(int(mission.number_of_containers), 1)
+        self.cap_gen = int(mission.cap_gen)
+        self.cap_nogen = int(mission.cap_nogen)
+
+        if self.number_of_workers < 2:
+            raise ValueError("Number of workers must be at least 2 for the simulation.")
+        self.number_of_pairs = self.number_of_workers // 2
+
+        # Timing constants from Mission
+        self.time_nest_setup = mission.time_open_container + mission.time_startup_nest
+        self.time_uav_setup = mission.time_unload_uav + mission.time_assemble_uav + mission.time_position_uav + mission.time_startup_uav
+        self.time_walk = mission.time_walk_between_containers
+        self.time_service = mission.time_turnaround_check + mission.time_reload_aerogel
+        self.time_replace_battery = mission.time_replace_battery
+
+        # Sortie duration, Mission adds the launch spacing to time_uav which is simulated explicitly here
+        mission.uav_mission_time()
+        mission.calc_UAV_runs()
+        self.num_trips = int(mission.num_trips)
+        self.time_sortie_max = mission.time_uav - mission.time_min_launch
+        self.time_sortie_min = mission.time_uav_min - mission.time_min_launch
+
+        self.spare_batteries = spare_batteries              # None means a charged battery is always available
+        self.time_battery_charge = time_battery_charge      # Time to recharge a depleted battery [s]
+        self.staggered_returns = staggered_returns          # Draw the sortie time between the fastest and slowest case
+        self.seed = seed
+
+    # ~~~ Intermediate Functions ~~~
+
+    def uav_containers(self) -> list[int]:
+        '''
+        Container index of every UAV, the generator container is filled first
+        '''
+        containers = []
+        for container in range(self.number_of_containers):
+            cap = self.cap_gen if container == 0 else self.cap_nogen
+            containers += [container] * cap
+        if len(containers) < self.number_of_UAV:
+            raise ValueError(f"{self.number_of_UAV} UAVs do not fit in {self.number_of_containers} containers.")
+        return containers[:self.number_of_UAV]
+
+    def sortie_times(self) -> np.ndarray:
+        '''
+        Duration of every sortie, either all worst case or drawn uniformly between the fastest and slowest case
+        '''
+        if self.staggered_returns:
+            rng = np.random.default_rng(self.seed)
+            return rng.uniform(self.time_sortie_min, self.time_sortie_max, self.num_trips)
+        return np.full(self.num_trips, self.time_sortie_max)
+
+    def simulate(self) -> dict[str, float]:
+        '''
+        Runs the event loop until every aerogel is deployed and every UAV has landed.
+        Returns the statistics of the run.
+        '''
+        heap = []
+        push = heapq.heappush
+        pop = heapq.heappop
+        seq = 0
+
+        home = self.uav_containers()
+        sorties = self.sortie_times().tolist()
+        sortie_index = 0
+
+        time_uav_setup = self.time_uav_setup
+        time_walk = self.time_walk
+        time_service = self.time_service
+        time_replace_battery = self.time_replace_battery
+        time_battery_charge = self.time_battery_charge
+        limited_batteries = self.spare_batteries is not None
+        charged_batteries = self.spare_batteries if limited_batteries else 0
+
+        trips_left = self.num_trips
+        n_launch = min(self.number_of_UAV, trips_left)
+        trips_left -= n_launch
+
+        setup_queue = deque(range(n_launch))
+        turnaround_queue = deque()      # (uav, time of arrival in the queue)
+        battery_queue = deque()         # (pair, uav, time of arrival in the queue)
+        idle_pairs = list(range(self.number_of_pairs - 1, -1, -1))
+        pair_location = [0] * self.number_of_pairs
+
+        t = self.time_nest_setup
+        worker_busy = self.time_nest_setup * self.number_of_pairs
+        flight_time = 0.
+        time_launch = t
+        makespan = t
+        n_events = 0
+        n_sorties = 0
+
+        turnaround_waits = []
+        battery_waits = []
+        queue_area = 0.         # time integral of the turnaround queue length
+        queue_max = 0
+        queue_changed = t
+
+        while True:
+            # Hand out work to every idle worker pair
+            while idle_pairs and (setup_queue or turnaround_queue):
+                pair = idle_pairs.pop()
+                if setup_queue:
+                    uav = setup_queue.popleft()
+                    duration = time_uav_setup
+                    kind = SETUP_DONE
+                else:
+                    queue_area += len(turnaround_queue) * (t - queue_changed)
+                    queue_changed = t
+                    uav, arrival = turnaround_queue.popleft()
+                    turnaround_waits.append(t - arrival)
+                    duration = time_service
+                    kind = SERVICE_DONE
+                if pair_location[pair] != home[uav]:
+                    duration += time_walk
+                    pair_location[pair] = home[uav]
+                worker_busy += duration
+                seq += 1
+                push(heap, (t + duration, seq, kind, pair, uav))
+
+            if not heap:
+                break
+
+            t, _, kind, pair, uav = pop(heap)
+            n_events += 1
+
+            if kind == UAV_RETURN:
+                makespan = t
+                if trips_left > 0:
+                    trips_left -= 1
+                    queue_area += len(turnaround_queue) * (t - queue_changed)
+                    queue_changed = t
+                    turnaround_queue.append((uav, t))
+                    if len(turnaround_queue) > queue_max:
+                        queue_max = len(turnaround_queue)
+                continue
+
+            if kind == SERVICE_DONE:
+                if limited_batteries:
+                    if charged_batteries == 0:
+                        battery_queue.append((pair, uav, t))
+                        continue
+                    charged_batteries -= 1
+                    seq += 1
+                    push(heap, (t + time_replace_battery + time_battery_charge, seq, BATTERY_CHARGED, -1, -1))
+                worker_busy += time_replace_battery
+                seq += 1
+                push(heap, (t + time_replace_battery, seq, SWAP_DONE, pair, uav))
+                continue
+
+            if kind == BATTERY_CHARGED:
+                charged_batteries += 1
+                if battery_queue:
+                    pair, uav, arrival = battery_queue.popleft()
+                    battery_waits.append(t - arrival)
+                    charged_batteries -= 1
+                    worker_busy += time_replace_battery
+                    seq += 1
+                    push(heap, (t + time_replace_battery, seq, SWAP_DONE, pair, uav))
+                    seq += 1
+                    push(heap, (t + time_replace_battery + time_battery_charge, seq, BATTERY_CHARGED, -1, -1))
+                continue
+
+            # SETUP_DONE or SWAP_DONE: the UAV launches and the worker pair is free again
+            if kind == SETUP_DONE:
+                time_launch = t
+            sortie = sorties[sortie_index]
+            sortie_index += 1
+            n_sorties += 1
+            flight_time += sortie
+            seq += 1
+            push(heap, (t + sortie, seq, UAV_RETURN, -1, uav))
+            idle_pairs.append(pair)
+
+        if makespan > queue_changed:
+            queue_area += len(turnaround_queue) * (makespan - queue_changed)
+
+        self.statistics = {
+            'sim_makespan': makespan,
+            'sim_time_launch': time_launch,
+            'sim_sorties': n_sorties,
+            'sim_events': n_events,
+            'sim_worker_utilisation': worker_busy / (self.number_of_pairs * makespan) if makespan > 0 else 0.,
+            'sim_uav_utilisation': flight_time / (self.number_of_UAV * makespan) if makespan > 0 else 0.,
+            'sim_turnaround_wait_mean': float(np.mean(turnaround_waits)) if turnaround_waits else 0.,
+            'sim_turnaround_wait_max': max(turnaround_waits, default=0.),
+            'sim_turnaround_queue_mean': queue_area / makespan if makespan > 0 else 0.,
+            'sim_turnaround_queue_max': queue_max,
+            'sim_battery_wait_mean': float(np.mean(battery_waits)) if battery_waits else 0.,
+            'sim_battery_wait_max': max(battery_waits, default=0.),
+        }
+
+        if self.verbose:
+            for key, value in self.statistics.items():
+                print(f"{key}: {value}")
+
+        return self.statistics
+
+    # ~~~ Output functions ~~~
+
+    def get_all(self) -> dict[str, float]:
+        '''
+        Outputs:
+
+        sim makespan:                   Time from the start of the nest setup until the last UAV has landed [s]
+        sim time launch:                Time at which the last UAV is launched for the first time [s]
+        sim sorties / events:           Number of sorties flown and events processed
+        sim worker utilisation:         Fraction of the makespan the worker pairs are busy
+        sim uav utilisation:            Fraction of the makespan the UAVs are flying
+        sim turnaround wait/queue:      Waiting time [s] and queue length of UAVs waiting for a worker pair
+        sim battery wait:               Waiting time [s] of worker pairs waiting for a charged battery
+        '''
+        self.outputs.update(self.simulate())
+        return self.outputs
+
+
+if __name__ == '__main__':
+    # Perform sanity checks here
+    import time
+    from inputs import initial_inputs
+
+    inputs = initial_inputs.copy()
+    inputs['number_of_workers'] = 6
+
+    mission = Mission(inputs)
+    mission.calc_total_mission_time()
+    print(f"Mission total time: {mission.total_mission_time/3600:.2f} h")
+
+    start = time.perf_counter()
+    sim = MissionSimulation(inputs, spare_batteries=10, time_battery_charge=40*60, staggered_returns=True, seed=0, verbose=True)
+    stats = sim.simulate()
+    elapsed = time.perf_counter() - start
+    print(f"Simulated makespan: {stats['sim_makespan']/3600:.2f} h, {stats['sim_events']/elapsed:.0f} events/s")
@@ -0,0 +1,349 @@
+"""
+CG envelope and scissor-plot engine.
+
+Array-based counterpart of the loading diagram and scissor plot in
+:mod:`stab_n_con`. The UAV is described by a component matrix (mass, x
+position and whether the component belongs to the wing group) and a
+configuration mask matrix (which components are on board in which mission
+configuration). CG tracks, stability/controllability lines and the feasible
+wing position are then evaluated for all configurations and LEMAC positions in
+one pass, without any plotting.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+
+CONFIGURATIONS = ("wildfire", "oil_spill", "no_payload_wildfire", "no_payload_oil_spill")
+
+
+def component_table(inputs: dict[str, float]) -> dict[str, np.ndarray | tuple]:
+    """
+    Build the component and configuration matrices from the design inputs.
+
+    The components and configurations are the ones of
+    ``StabCon.calculate_uav_cg_chat``. Wing-group positions are measured from
+    the wing leading edge, fuselage-group positions from the nose.
+
+    Returns
+    -------
+    dict
+        {
+        "names"         : tuple[str],    # component names, n
+        "mass"          : np.ndarray,    # [kg], shape (n,)
+        "x"             : np.ndarray,    # [m], shape (n,)
+        "wing_group"    : np.ndarray,    # bool, shape (n,)
+        "configurations": tuple[str],    # configuration names, k
+        "mask"          : np.ndarray,    # bool, shape (k, n)
+        }
+    """
+    lift_motor_mass = (
+        inputs["motor_mass_VTOL"] + inputs["propeller_mass_VTOL"] + inputs["motor_esc_VTOL_mass"]
+    )
+
+    # name: (mass, x, wing group, configurations it is on board in)
+    everywhere = CONFIGURATIONS
+    components = {
+        "gymbal_connection": (inputs["gymbal_connection_mass"], inputs["gymbal_connection_x"], False, everywhere),
+        "flight_controller": (inputs["flight_controller_mass"], inputs["flight_controller_x"], False, everywhere),
+        "OBC": (inputs["OBC_mass"], inputs["OBC_x"], False, everywhere),
+        "GPS": (inputs["GPS_mass"], inputs["GPS_x"], False, everywhere),
+        "Mesh_network_module": (inputs["Mesh_network_module_mass"], inputs["Mesh_network_module_x"], False, everywhere),
+        "SATCOM_module": (inputs["SATCOM_module_mass"], inputs["SATCOM_module_x"], False, everywhere),
+        "Winch_motor": (inputs["Winch_motor_mass"], inputs["Winch_motor_x"], False, everywhere),
+        "motor_cruise": (inputs["motor_mass_cruise"] + inputs["propeller_mass_cruise"], inputs["motor_cruise_x"], False, everywhere),
+        "CUAV_airlink": (inputs["CUAV_airlink_mass"], inputs["CUAV_airlink_x"], False, everywhere),
+        "fuselage_structure": (inputs["fuselage_structural_mass"], inputs["fuselage_structural_x_cg"], False, everywhere),
+        "tailplane_structure": (inputs["tailplane_structural_mass"], inputs["tailplane_structural_x_cg"], False, everywhere),
+        "motor_esc_cruise": (inputs["motor_esc_cruise_mass"], inputs["motor_esc_cruise_x"], False, everywhere),
+        "wildfire_sensor": (inputs["wildfire_sensor_mass"], inputs["wildfire_sensor_x"], False, ("wildfire", "no_payload_wildfire")),
+        "oil_spill_sensor": (inputs["oil_spill_sensor_mass"], inputs["oil_spill_sensor_x"], False, ("oil_spill", "no_payload_oil_spill")),
+        "payload": (inputs["payload_mass"], inputs["payload_x"], False, ("wildfire", "oil_spill")),
+        "buoy": (inputs["buoy_mass"], inputs["buoy_x"], False, ("oil_spill", "no_payload_oil_spill")),
+        "VTOL_motors_front": (2 * lift_motor_mass, inputs["motor_front_VTOL_x"], True, everywhere),
+        "VTOL_motors_rear": (2 * lift_motor_mass, inputs["motor_rear_VTOL_x"], True, everywhere),
+        "battery": (inputs["battery_mass"], inputs["battery_x"], True, everywhere),
+        "PDB": (inputs["PDB_mass"], inputs["PDB_x"], True, everywhere),
+        "wing_structure": (inputs["wing_structural_mass"], inputs["wing_structural_x_cg"], True, everywhere),
+        "thermal_control": (inputs["thermal_control_mass"], inputs["thermal_control_x"], True, everywhere),
+    }
+
+    names = tuple(components)
+    mass, x, wing_group, on_board = zip(*components.values())
+    mask = np.array([[configuration in configurations for configurations in on_board] for configuration in CONFIGURATIONS])
+
+    return {
+        "names": names,
+        "mass": np.array(mass, dtype=float),
+        "x": np.array(x, dtype=float),
+        "wing_group": np.array(wing_group, dtype=bool),
+        "configurations": CONFIGURATIONS,
+        "mask": mask,
+    }
+
+
+def cg_tracks(mass, x, wing_group, mask, x_lemac, mac: float) -> dict[str, np.ndarray]:
+    """
+    CG of every configuration at every LEMAC position.
+
+    Parameters
+    ----------
+    mass, x, wing_group : array_like, shape (n,)
+        Component masses [kg], positions [m] and wing-group flags. Wing-group
+        components move with the wing, their x is measured from the LEMAC.
+    mask : array_like, shape (k, n)
+        Which components are on board in each of the k configurations.
+    x_lemac : array_like, shape (m,)
+        LEMAC positions along the fuselage [m].
+    mac : float
+        Mean aerodynamic chord [m].
+
+    Returns
+    -------
+    dict
+        Group masses and CGs, shape (k,), and the aircraft CG "x_cg" [m] and
+        "x_cg_bar" (fraction of MAC aft of the LEMAC), shape (k, m).
+    """
+    mass = np.asarray(mass, dtype=float)
+    x = np.asarray(x, dtype=float)
+    wing_group = np.asarray(wing_group, dtype=bool)
+    mask = np.asarray(mask, dtype=float)
+    x_lemac = np.asarray(x_lemac, dtype=float)
+
+    fuselage_mass = mask @ np.where(wing_group, 0.0, mass)
+    fuselage_moment = mask @ np.where(wing_group, 0.0, mass * x)
+    wing_mass = mask @ np.where(wing_group, mass, 0.0)
+    wing_moment = mask @ np.where(wing_group, mass * x, 0.0)
+    total_mass = fuselage_mass + wing_mass
+
+    x_cg = (
+        fuselage_moment[:, None] + wing_moment[:, None] + wing_mass[:, None] * x_lemac
+    ) / total_mass[:, None]
+
+    return {
+        "fuselage_mass": fuselage_mass,
+        "fuselage_x_cg": fuselage_moment / fuselage_mass,
+        "wing_mass": wing_mass,
+        "wing_x_cg": wing_moment / wing_mass,
+        "mass": total_mass,
+        "x_lemac": x_lemac,
+        "x_cg": x_cg,
+        "x_cg_bar": (x_cg - x_lemac) / mac,
+    }
+
+
+def scissor_coefficients(
+    CL_alpha_h, CL_alpha_Ah, d_epsilon_d_alpha, lh, mac, Vh_V, AR_h, CL_A_h, Cm_ac_wing, x_ac_bar_wing
+) -> dict[str, np.ndarray]:
+    """
+    Coefficients of the stability and control lines of the scissor plot.
+
+    All parameters may be arrays (e.g. several flight conditions or tail
+    configurations) and are broadcast against each other. The lines are
+
+        stability: S_h/S = (x_cg_bar - x_ac_bar + SM) / stab_den
+        control:   S_h/S = (x_cg_bar + control_offset - SM) / ctrl_den
+
+    with the tail lift coefficient in a pull-up approximated as
+    -0.35 AR_h^(1/3), so ctrl_den < 0.
+    """
+    CL_h = -0.35 * np.asarray(AR_h, dtype=float) ** (1.0 / 3.0)
+    stab_den = (
+        (np.asarray(CL_alpha_h, dtype=float) / CL_alpha_Ah)
+        * (1.0 - np.asarray(d_epsilon_d_alpha, dtype=float))
+        * (np.asarray(lh, dtype=float) / mac)
+        * Vh_V  # already the squared velocity ratio
+    )
+    ctrl_den = (CL_h / CL_A_h) * (np.asarray(lh, dtype=float) / mac) * Vh_V
+    return {
+        "stab_den": stab_den,
+        "ctrl_den": ctrl_den,
+        "x_ac_bar": np.asarray(x_ac_bar_wing, dtype=float),
+        "control_offset": np.asarray(Cm_ac_wing, dtype=float) / CL_A_h - x_ac_bar_wing,
+    }
+
+
+def scissor_lines(x_cg_bar, coefficients: dict[str, np.ndarray], static_margin=0.1) -> dict[str, np.ndarray]:
+    """
+    Stability and control lines at the CG positions x_cg_bar (last axis),
+    broadcast against the coefficients from :func:`scissor_coefficients`.
+    """
+    x_cg_bar = np.asarray(x_cg_bar, dtype=float)
+    stab_den, ctrl_den, x_ac_bar, control_offset, static_margin = (
+        np.asarray(value, dtype=float)[..., None]
+        for value in (
+            coefficients["stab_den"], coefficients["ctrl_den"], coefficients["x_ac_bar"],
+            coefficients["control_offset"], static_margin,
+        )
+    )
+    return {
+        "x_cg_bar": x_cg_bar,
+        "sh_s_stability": (x_cg_bar - x_ac_bar + static_margin) / stab_den,
+        "sh_s_stability_no_margin": (x_cg_bar - x_ac_bar) / stab_den,
+        "sh_s_control": (x_cg_bar + control_offset) / ctrl_den,
+        "sh_s_control_with_margin": (x_cg_bar + control_offset - static_margin) / ctrl_den,
+    }
+
+
+def wing_position_window(x_cg_bar, x_lemac, coefficients: dict[str, np.ndarray], Sh_S, static_margin=0.1) -> dict[str, np.ndarray]:
+    """
+    Required tail size and feasible wing positions from the CG tracks.
+
+    At every LEMAC position the most forward CG (over all configurations) has
+    to be controllable and the most aft CG stable with the static margin, as in
+    the ADSEE scissor plot.
+    The required S_h/S is the larger of the two lines there, a LEMAC position
+    is feasible if it does not exceed the actual Sh_S.
+
+    Parameters
+    ----------
+    x_cg_bar : array_like, shape (k, m)
+        CG tracks of k configurations at m LEMAC positions (see :func:`cg_tracks`).
+    x_lemac : array_like, shape (m,)
+        LEMAC positions [m].
+    coefficients : dict
+        From :func:`scissor_coefficients`, may hold arrays of shape P.
+    Sh_S : float or array_like
+        Actual tail-to-wing area ratio, broadcast against P.
+
+    Returns
+    -------
+    dict
+        "cg_bar_fwd", "cg_bar_aft" (m,), "Sh_S_required" and "feasible"
+        (*P, m), and "x_lemac_min", "x_lemac_max" (NaN without a feasible
+        position), "x_lemac_opt" and "Sh_S_min" of shape P.
+    """
+    x_cg_bar = np.asarray(x_cg_bar, dtype=float)
+    x_lemac = np.asarray(x_lemac, dtype=float)
+    cg_bar_fwd = x_cg_bar.min(axis=0)
+    cg_bar_aft = x_cg_bar.max(axis=0)
+
+    control = scissor_lines(cg_bar_fwd, coefficients, static_margin)["sh_s_control"]
+    stability = scissor_lines(cg_bar_aft, coefficients, static_margin)["sh_s_stability"]
+    Sh_S_required = np.maximum(control, stability)
+    feasible = Sh_S_required <= np.asarray(Sh_S, dtype=float)[..., None]
+
+    any_feasible = feasible.any(axis=-1)
+    x_lemac_min = np.where(any_feasible, np.where(feasible, x_lemac, np.inf).min(axis=-1), np.nan)
+    x_lemac_max = np.where(any_feasible, np.where(feasible, x_lemac, -np.inf).max(axis=-1), np.nan)
+    optimum = np.argmin(Sh_S_required, axis=-1)
+
+    return {
+        "cg_bar_fwd": cg_bar_fwd,
+        "cg_bar_aft": cg_bar_aft,
+        "Sh_S_required": Sh_S_required,
+        "feasible": feasible,
+        "x_lemac_min": x_lemac_min,
+        "x_lemac_max": x_lemac_max,
+        "x_lemac_opt": x_lemac[optimum],
+        "Sh_S_min": np.min(Sh_S_required, axis=-1),
+    }
+
+
+class CGEnvelope:
+    """CG envelope and wing positioning of the UAV for all mission configurations.
+
+    Parameters
+    ----------
+    inputs
+        Design dictionary with the component masses/positions and the
+        longitudinal stability parameters (see ``stab_n_con_inputs``).
+    n_lemac
+        Number of LEMAC positions between 0.5 m and l_fus - 0.5 m.
+    static_margin
+        Static margin applied to the stability line.
+    """
+
+    input_keys = (
+        "gymbal_connection_mass", "gymbal_connection_x", "flight_controller_mass", "flight_controller_x",
+        "OBC_mass", "OBC_x", "GPS_mass", "GPS_x", "Mesh_network_module_mass", "Mesh_network_module_x",
+        "SATCOM_module_mass", "SATCOM_module_x", "Winch_motor_mass", "Winch_motor_x", "motor_mass_cruise",
+        "propeller_mass_cruise", "motor_cruise_x", "CUAV_airlink_mass", "CUAV_airlink_x",
+        "fuselage_structural_mass", "fuselage_structural_x_cg", "tailplane_structural_mass",
+        "tailplane_structural_x_cg", "motor_esc_cruise_mass", "motor_esc_cruise_x", "wildfire_sensor_mass",
+        "wildfire_sensor_x", "oil_spill_sensor_mass", "oil_spill_sensor_x", "payload_mass", "payload_x",
+        "buoy_mass", "buoy_x", "motor_mass_VTOL", "propeller_mass_VTOL", "motor_esc_VTOL_mass",
+        "motor_front_VTOL_x", "motor_rear_VTOL_x", "battery_mass", "battery_x", "PDB_mass", "PDB_x",
+        "wing_structural_mass", "wing_structural_x_cg", "thermal_control_mass", "thermal_control_x",
+        "l_fus", "mac", "lh", "CL_alpha_h", "CL_alpha_Ah", "d_epsilon_d_alpha", "Vh_V", "AR_h", "CL_A_h",
+        "Cm_ac_wing", "x_ac_bar_wing", "Sh_S",
+    )
+    output_keys = ("x_lemac_min", "x_lemac_max", "x_lemac_opt", "Sh_S_min", "cg_bar_fwd", "cg_bar_aft")
+
+    def __init__(self, inputs: dict[str, float], hardware=None, n_lemac: int = 1000, static_margin: float = 0.1) -> None:
+        self.inputs = inputs
+        self.hardware = hardware
+        self.outputs = inputs.copy()
+
+        self.n_lemac = n_lemac
+        self.static_margin = static_margin
+
+    # ~~~ Intermediate Functions ~~~
+
+    def tracks(self) -> dict[str, np.ndarray]:
+        """CG tracks of all configurations over the LEMAC sweep."""
+        table = component_table(self.inputs)
+        x_lemac = np.linspace(0.5, self.inputs["l_fus"] - 0.5, self.n_lemac)
+        return cg_tracks(table["mass"], table["x"], table["wing_group"], table["mask"], x_lemac, self.inputs["mac"])
+
+    def coefficients(self) -> dict[str, np.ndarray]:
+        """Scissor-plot coefficients of the current design."""
+        return scissor_coefficients(
+            *(self.inputs[key] for key in (
+                "CL_alpha_h", "CL_alpha_Ah", "d_epsilon_d_alpha", "lh", "mac", "Vh_V", "AR_h", "CL_A_h",
+                "Cm_ac_wing", "x_ac_bar_wing",
+            ))
+        )
+
+    def window(self) -> dict[str, np.ndarray]:
+        """Feasible wing positions for the current tail size."""
+        tracks = self.tracks()
+        return wing_position_window(
+            tracks["x_cg_bar"], tracks["x_lemac"], self.coefficients(), self.inputs["Sh_S"], self.static_margin
+        )
+
+    # ~~~ Output functions ~~~
+
+    def get_all(self) -> dict[str, float]:
+        window = self.window()
+
+        self.outputs["x_lemac_min"] = float(window["x_lemac_min"])  # [m] most forward feasible LEMAC
+        self.outputs["x_lemac_max"] = float(window["x_lemac_max"])  # [m] most aft feasible LEMAC
+        self.outputs["x_lemac_opt"] = float(window["x_lemac_opt"])  # [m] LEMAC with the smallest tail
+        self.outputs["Sh_S_min"] = float(window["Sh_S_min"])  # [-] smallest tail that can be positioned
+        optimum = np.argmin(window["Sh_S_required"])
+        self.outputs["cg_bar_fwd"] = float(window["cg_bar_fwd"][optimum])  # [-] CG range at that LEMAC
+        self.outputs["cg_bar_aft"] = float(window["cg_bar_aft"][optimum])
+
+        return self.outputs
+
+
+# ---------------------------------------------------------------------------#
+# Basic sanity check                                                         #
+# ---------------------------------------------------------------------------#
+if __name__ == "__main__":  # pragma: no cover
+    from DetailedDesign.inputs import initial_inputs
+
+    envelope = CGEnvelope(initial_inputs)
+    outputs = envelope.get_all()
+    for key in CGEnvelope.output_keys:
+        print(f"{key}: {outputs[key]:.4f}")
+
+    # Tail sizing map: required S_h/S at every LEMAC for a range of tail arms
+    tracks = envelope.tracks()
+    lh = np.linspace(0.6, 1.2, 7)
+    coefficients = scissor_coefficients(
+        initial_inputs["CL_alpha_h"], initial_inputs["CL_alpha_Ah"], initial_inputs["d_epsilon_d_alpha"], lh,
+        initial_inputs["mac"], initial_inputs["Vh_V"], initial_inputs["AR_h"], initial_inputs["CL_A_h"],
+        initial_inputs["Cm_ac_wing"], initial_inputs["x_ac_bar_wing"],
+    )
+    window = wing_position_window(tracks["x_cg_bar"], tracks["x_lemac"], coefficients, initial_inputs["Sh_S"])
+    for lh_i, Sh_S_min, x_opt in zip(lh, window["Sh_S_min"], window["x_lemac_opt"]):
+        print(f"lh = {lh_i:.2f} m: Sh/S min = {Sh_S_min:.3f} at x_lemac = {x_opt:.3f} m")
@@ -16,12 +16,86 @@ def powerLoading(T_W, V, n_p):
     return P_W
 
 
+def thrust_loading_cruise(W_S, q, CD_0, k):
+    T_W_cruise = q * CD_0 * 1 / (W_S) + k * 1 / q * W_S
+    return T_W_cruise
+
+
+def climb_speed(W_S, rho, CD_0, k):
+    '''
+    Speed for the best rate of climb
+    '''
+    Vroc = np.sqrt(2 / rho * W_S * np.sqrt(k / (3 * CD_0)))
+    return Vroc
+
+
+def thrust_loading_climb(Vroc, W_S, R_C, q, CD_0, k):
+    T_W_climb = R_C / Vroc + q / W_S * CD_0 + k / q * W_S
+    return T_W_climb
+
+
+def constraint_variants(W_S, V_stall, V_cruise, e, AR, CL_max, CD_0, eff_prop, rho, ROC_cruise, ROC_service) -> dict[str, np.ndarray]:
+    '''
+    Constraint diagrams for many design variants at once. Every parameter may be a scalar or an array, the
+    parameters are broadcast against each other to give the variants, e.g. AR[:, None] and CD_0[None, :] for all
+    combinations. The wing loading grid W_S is broadcast along a new last axis, so the power loadings have the
+    shape (*variants, len(W_S)).
+
+    The design point of every variant lies on its stall speed constraint, where the power loadings are evaluated
+    exactly. design_P_W_max is the largest of the three there, i.e. the power loading the design has to meet.
+    '''
+    V_stall, V_cruise, e, AR, CL_max, CD_0, eff_prop, rho, ROC_cruise, ROC_service = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (V_stall, V_cruise, e, AR, CL_max, CD_0, eff_prop, rho, ROC_cruise, ROC_service)))
+
+    k = 1 / (np.pi * e * AR)
+    q = 0.5 * rho * V_cruise**2
+    W_S_stall = 0.5 * V_stall**2 * rho * CL_max
+
+    def power_loadings(W_S, p=(...,)):
+        # p selects how the variant parameters line up with W_S: (...,) for W_S of the variants shape,
+        # (..., None) for a grid along a new last axis
+        with np.errstate(divide='ignore', invalid='ignore'):  # W_S = 0 gives an infinite power loading
+            V_roc = climb_speed(W_S, rho[p], CD_0[p], k[p])
+            q_climb = 0.5 * rho[p] * V_roc**2
+            P_W_cruise = powerLoading(thrust_loading_cruise(W_S, q[p], CD_0[p], k[p]), V_cruise[p], eff_prop[p])
+            P_W_climb = powerLoading(thrust_loading_climb(V_roc, W_S, ROC_cruise[p], q_climb, CD_0[p], k[p]), V_roc, eff_prop[p])
+            P_W_service = powerLoading(thrust_loading_climb(V_roc, W_S, ROC_service[p], q_climb, CD_0[p], k[p]), V_roc, eff_prop[p])
+        return P_W_cruise, P_W_climb, P_W_service
+
+    W_S = np.asarray(W_S, dtype=float)
+    P_W_cruise, P_W_climb, P_W_service = power_loadings(W_S, (..., None))
+    design_P_W_cruise, design_P_W_climb, design_P_W_service = power_loadings(W_S_stall)
+
+    return {
+        'W_S': W_S,
+        'P_W_cruise': P_W_cruise,
+        'P_W_climb': P_W_climb,
+        'P_W_service': P_W_service,
+        'W_S_stall': W_S_stall,
+        'design_P_W_cruise': design_P_W_cruise,
+        'design_P_W_climb': design_P_W_climb,
+        'design_P_W_service': design_P_W_service,
+        'design_P_W_max': np.maximum(np.maximum(design_P_W_cruise, design_P_W_climb), design_P_W_service),
+    }
+
+
 class Constraints:
-    def __init__(self, inputs: dict[str, float], hardware=None)-> None:
+    input_keys = (
+        'V_stall', 'V_cruise', 'e', 'AR', 'CL_max', 'CD_0', 'eff_prop', 'ROC_service', 'MTOW', 'rho_0',
+        'rho_service', 'ROC_cruise'
+    )
+    output_keys = (
+        'wing_loading', 'P_W_cruise', 'P_W_climb', 'P_W_service', 'power_required_cruise'
+    )
+
+    def __init__(self, inputs: dict[str, float], hardware=None, W_S_max: float = 600., W_S_step: float = 1.)-> None:
 
         self.inputs = inputs.copy()
         self.hardware = hardware
 
+        self.W_S_max = W_S_max      # Largest wing loading in the constraints diagram [N/m^2]
+        self.W_S_step = W_S_step    # Resolution of the constraints diagram [N/m^2]
+
         self.V_stall = inputs['V_stall']
         self.V_max = inputs['V_cruise'] 
         self.e = inputs ['e']
@@ -48,81 +122,91 @@ class Constraints:
         return 0.5 * self.rho_service * self.V_max**2
 
     def thrustLoadingCruise(self, W_S):
-        T_W_cruise = self.q * self.CD_0 * 1 / (W_S) + self.k * 1 / self.q * W_S
-        return T_W_cruise
+        return thrust_loading_cruise(W_S, self.q, self.CD_0, self.k)
 
     def Vroc(self, W_S):
-        Vroc = np.sqrt(2 / self.rho_service * W_S * np.sqrt(self.k / (3 * self.CD_0)))
-        return Vroc
+        return climb_speed(W_S, self.rho_service, self.CD_0, self.k)
 
     def q_climb(self, Vroc):
         q_climb = 0.5 * self.rho_service * Vroc**2
         return q_climb
 
     def thrustLoadingClimb(self, Vroc, W_S, R_C, q):
-        T_W_climb = R_C / Vroc + q / W_S * self.CD_0 + self.k / q * W_S
-        return T_W_climb
+        return thrust_loading_climb(Vroc, W_S, R_C, q, self.CD_0, self.k)
 
     def WingLoading_Vstall(self):
         W_S_stall = 0.5 * self.V_stall**2 * self.rho_service * self.CL_max
         return W_S_stall
 
-    def form_variable_lists(self) -> tuple[list | float]:
-
-        W_S = np.arange(0, 600, 1)  # [N/m^2] variable
-
-        T_W_cruise = []
-        T_W_climb = []
-        P_W_cruise = []
-        P_W_climb = []
-        P_W_service = []
-        W_S_stall = []
-        T_W_service = []
-
-        for i in W_S:
-            # calculating thrust to weight ratios
-            T_W_cruise.append(self.thrustLoadingCruise(i))
-            T_W_climb.append(
-                self.thrustLoadingClimb(
-                    self.Vroc(i), i, self.r_c, self.q_climb(self.Vroc(i))
-                )
-            )
-            T_W_service.append(
-                self.thrustLoadingClimb(
-                    self.Vroc(i), i, self.R_C_service, self.q_climb(self.Vroc(i))
-                )
-            )
-            # calculating wing loading stall
-            W_S_stall_value = self.WingLoading_Vstall()
-            W_S_stall.append(W_S_stall_value)
+    def wing_loading_grid(self) -> np.ndarray:
+        '''
+        Wing loadings at which the constraint curves are evaluated [N/m^2]
+        '''
+        return np.arange(0, self.W_S_max, self.W_S_step)
+
+    def power_loadings(self, W_S):
+        '''
+        Cruise, climb and service ceiling power loadings at the given wing loading(s), broadcast over arrays.
+        This design is the single variant of constraint_variants.
+        '''
+        W_S = np.asarray(W_S, dtype=float)
+        results = self.variants(W_S)
+        return tuple(results[key].reshape(W_S.shape) for key in ('P_W_cruise', 'P_W_climb', 'P_W_service'))
+
+    def design_point(self) -> tuple[float, float, float, float]:
+        '''
+        The design point lies on the stall speed constraint, the highest allowed wing loading.
+        The power loadings are evaluated exactly there, so they do not depend on the grid spacing.
+        '''
+        results = self.variants(W_S=[])
+        return (float(results['W_S_stall']), float(results['design_P_W_cruise']), float(results['design_P_W_climb']),
+                float(results['design_P_W_service']))
+
+    def variants(self, W_S=None, grid: bool = False, **parameters) -> dict[str, np.ndarray]:
+        '''
+        Constraint diagrams of variants of this design, e.g. variants(AR=[8, 10, 12], CD_0=[0.03, 0.04, 0.05]).
+        Any of V_stall, V_cruise, e, AR, CL_max, CD_0 and eff_prop can be given as arrays, the others are taken from
+        this design. With grid=True every combination of the given arrays is evaluated (one axis per parameter in
+        the given order), otherwise they are broadcast against each other. See constraint_variants for the outputs.
+        '''
+        values = dict(V_stall=self.V_stall, V_cruise=self.V_max, e=self.e, AR=self.AR, CL_max=self.CL_max,
+                      CD_0=self.CD_0, eff_prop=self.eff_prop)
+        unknown = set(parameters) - set(values)
+        if unknown:
+            raise ValueError(f"Cannot vary {sorted(unknown)}, only {list(values)}.")
+        if grid:
+            parameters = dict(zip(parameters, np.meshgrid(*parameters.values(), indexing='ij')))
+        values.update(parameters)
+        return constraint_variants(self.wing_loading_grid() if W_S is None else W_S, rho=self.rho_service,
+                                   ROC_cruise=self.r_c, ROC_service=self.R_C_service, **values)
+
+    def form_variable_lists(self) -> tuple[np.ndarray | float]:
+
+        W_S = self.wing_loading_grid()  # [N/m^2] variable
 
         # Calculating Power loading
-        for i in range(len(W_S)):
-            P_W_cruise.append(powerLoading(T_W_cruise[i], self.V_max, self.eff_prop))
-            P_W_climb.append(
-                powerLoading(T_W_climb[i], self.Vroc(W_S[i]), self.eff_prop)
-            )  # self.Vroc(self.W_S[i])
-            P_W_service.append(
-                powerLoading(T_W_service[i], self.Vroc(W_S[i]), self.eff_prop)
-            )
-        
-        opt_P_W = P_W_climb[int(self.WingLoading_Vstall())] 
-         
+        P_W_cruise, P_W_climb, P_W_service = self.power_loadings(W_S)
+
+        # calculating wing loading stall
+        W_S_stall = np.full_like(W_S, self.WingLoading_Vstall(), dtype=float)
+
+        opt_P_W = self.design_point()[2]
+
         optimal_cruise_power = opt_P_W * self.mtow
 
         return W_S, P_W_cruise, P_W_climb, P_W_service, W_S_stall, optimal_cruise_power
 
-        
+
     def get_all(self) -> dict[str, float]:
             outputs = self.inputs.copy()
-            W_S, P_W_cruise, P_W_climb, P_W_service, W_S_stall, optimal_cruise_power = self.form_variable_lists()
-            
-            outputs["wing_loading"] = W_S_stall[0]
-            outputs["P_W_cruise"] = P_W_cruise[int(self.WingLoading_Vstall())]
-            outputs["P_W_climb"] = P_W_climb[int(self.WingLoading_Vstall())]
-            outputs["P_W_service"] = P_W_service[int(self.WingLoading_Vstall())]
-
-            outputs["power_required_cruise"] = optimal_cruise_power
+            W_S_stall, P_W_cruise, P_W_climb, P_W_service = self.design_point()
+
+            outputs["wing_loading"] = W_S_stall
+            outputs["P_W_cruise"] = P_W_cruise
+            outputs["P_W_climb"] = P_W_climb
+            outputs["P_W_service"] = P_W_service
+
+            outputs["power_required_cruise"] = P_W_climb * self.mtow
 
             return outputs
 
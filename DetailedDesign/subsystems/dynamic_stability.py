@@ -0,0 +1,377 @@
+"""
+Linearised dynamic stability of the UAV.
+
+Builds the small-perturbation state-space matrices (Nelson, *Flight Stability
+and Automatic Control*, ch. 4-5) for many flight conditions at once and
+extracts the short period, phugoid, Dutch roll, roll and spiral modes from
+batched eigenvalues. The lateral derivatives that :class:`StabCon` already
+sizes (Cl_p, Cl_delta_a, Cn_beta, Cn_delta_r) are used as they are, the
+remaining derivatives are estimated from the tail volumes and the trim lift
+coefficient.
+
+All matrices are stacked along the leading axes, one per flight condition,
+the eigenvalues of all of them follow from a single ``np.linalg.eigvals``.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from DetailedDesign.subsystems.stab_n_con import StabCon
+
+
+# Plausible roll damping of a straight wing [1/rad], strip theory gives -cl_alpha / 6 (about -1) for a
+# rectangular wing and less for a tapered one
+CL_P_RANGE = (-1.5, -0.1)
+
+# MIL-F-8785C, Class I (small light aircraft), flight phase category B, Level 1
+LEVEL_1_LIMITS = {
+    "short_period_damping_min": 0.30,  # [-]
+    "short_period_damping_max": 2.00,  # [-]
+    "phugoid_damping_min": 0.04,  # [-]
+    "dutch_roll_damping_min": 0.08,  # [-]
+    "dutch_roll_frequency_min": 0.4,  # [rad/s]
+    "dutch_roll_zeta_omega_min": 0.15,  # [rad/s]
+    "roll_time_constant_max": 1.4,  # [s]
+    "spiral_time_to_double_min": 20.0,  # [s]
+}
+
+
+def isa_density(altitude) -> np.ndarray:
+    """ISA troposphere density [kg/m^3] at the geometric altitude [m]."""
+    temperature = 288.15 - 0.0065 * np.asarray(altitude, dtype=float)
+    return 1.225 * (temperature / 288.15) ** (9.80665 / (287.05 * 0.0065) - 1)
+
+
+def longitudinal_matrix(
+    V, rho, mass, x_cg_bar, wing_area, mac, AR, e, CD_0, CL_alpha, x_ac_bar, CL_alpha_h,
+    d_epsilon_d_alpha, Sh_S, lh, Vh_V, Iyy, g=9.81,
+) -> np.ndarray:
+    """
+    Longitudinal state matrix for the states (Δu, Δw, q, Δθ) in level flight.
+
+    The trim lift coefficient follows from the weight, Cm_alpha from the CG
+    position relative to the stick-fixed neutral point and the pitch damping
+    from the horizontal tail volume. Every parameter may be an array, they are
+    broadcast against each other to give A of shape (*conditions, 4, 4).
+    """
+    V, rho, mass, x_cg_bar, Iyy = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (V, rho, mass, x_cg_bar, Iyy))
+    )
+    Q = 0.5 * rho * V**2
+
+    # Estimated nondimensional derivatives [1/rad]
+    CL = mass * g / (Q * wing_area)
+    CD = CD_0 + CL**2 / (np.pi * AR * e)
+    CD_alpha = 2 * CL * CL_alpha / (np.pi * AR * e)
+    tail_volume = Sh_S * lh / mac
+    x_np_bar = x_ac_bar + (CL_alpha_h / CL_alpha) * (1 - d_epsilon_d_alpha) * tail_volume * Vh_V
+    Cm_alpha = CL_alpha * (x_cg_bar - x_np_bar)
+    Cm_q = -2 * Vh_V * CL_alpha_h * tail_volume * lh / mac
+    Cm_alpha_dot = Cm_q * d_epsilon_d_alpha
+
+    # Dimensional derivatives
+    X_u = -2 * CD * Q * wing_area / (mass * V)
+    X_w = -(CD_alpha - CL) * Q * wing_area / (mass * V)
+    Z_u = -2 * CL * Q * wing_area / (mass * V)
+    Z_w = -(CL_alpha + CD) * Q * wing_area / (mass * V)
+    M_w = Cm_alpha * Q * wing_area * mac / (Iyy * V)
+    M_w_dot = Cm_alpha_dot * Q * wing_area * mac**2 / (2 * Iyy * V**2)
+    M_q = Cm_q * Q * wing_area * mac**2 / (2 * Iyy * V)
+
+    zero = np.zeros_like(V)
+    return np.stack([
+        np.stack([X_u, X_w, zero, np.full_like(V, -g)], axis=-1),
+        np.stack([Z_u, Z_w, V, zero], axis=-1),
+        np.stack([M_w_dot * Z_u, M_w + M_w_dot * Z_w, M_q + M_w_dot * V, zero], axis=-1),
+        np.stack([zero, zero, np.ones_like(V), zero], axis=-1),
+    ], axis=-2)
+
+
+def lateral_matrices(
+    V, rho, mass, wing_area, wing_span, CY_beta, CY_r, Cl_beta, Cl_p, Cl_r, Cn_beta, Cn_p, Cn_r,
+    Cl_delta_a, Cn_delta_r, Ixx, Izz, g=9.81,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Lateral state and control matrices for the states (Δβ, p, r, Δφ) and the
+    controls (δa, δr) in level flight, with the product of inertia neglected.
+
+    Body-axis sign convention: Cn_beta > 0 is weathercock stable and a
+    positive rudder deflection gives a negative yawing moment. Returns A of
+    shape (*conditions, 4, 4) and B of shape (*conditions, 4, 2).
+    """
+    V, rho, mass, Ixx, Izz = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (V, rho, mass, Ixx, Izz))
+    )
+    Q = 0.5 * rho * V**2
+    QSb = Q * wing_area * wing_span
+
+    Y_beta = Q * wing_area * CY_beta / mass
+    Y_r = QSb * CY_r / (2 * mass * V)
+    L_beta = QSb * Cl_beta / Ixx
+    L_p = QSb * wing_span * Cl_p / (2 * Ixx * V)
+    L_r = QSb * wing_span * Cl_r / (2 * Ixx * V)
+    N_beta = QSb * Cn_beta / Izz
+    N_p = QSb * wing_span * Cn_p / (2 * Izz * V)
+    N_r = QSb * wing_span * Cn_r / (2 * Izz * V)
+    L_delta_a = QSb * Cl_delta_a / Ixx
+    N_delta_r = -QSb * Cn_delta_r / Izz
+
+    zero = np.zeros_like(V)
+    A = np.stack([
+        np.stack([Y_beta / V, zero, -(1 - Y_r / V), g / V], axis=-1),
+        np.stack([L_beta, L_p, L_r, zero], axis=-1),
+        np.stack([N_beta, N_p, N_r, zero], axis=-1),
+        np.stack([zero, np.ones_like(V), zero, zero], axis=-1),
+    ], axis=-2)
+    B = np.stack([
+        np.stack([zero, zero], axis=-1),
+        np.stack([L_delta_a, zero], axis=-1),
+        np.stack([zero, N_delta_r], axis=-1),
+        np.stack([zero, zero], axis=-1),
+    ], axis=-2)
+    return A, B
+
+
+def _pair(eigenvalues: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Natural frequency and damping ratio of a pair of eigenvalues (last axis)."""
+    product = np.real(eigenvalues[..., 0] * eigenvalues[..., 1])
+    total = np.real(eigenvalues[..., 0] + eigenvalues[..., 1])
+    omega_n = np.sqrt(np.abs(product))
+    return omega_n, -total / (2 * omega_n)
+
+
+def longitudinal_modes(A_long: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Short period (the two fastest eigenvalues) and phugoid (the two slowest)
+    of stacked longitudinal matrices. Overdamped pairs give damping ratios > 1.
+    """
+    eigenvalues = np.linalg.eigvals(A_long)
+    eigenvalues = np.take_along_axis(eigenvalues, np.argsort(-np.abs(eigenvalues), axis=-1), axis=-1)
+    omega_sp, zeta_sp = _pair(eigenvalues[..., :2])
+    omega_ph, zeta_ph = _pair(eigenvalues[..., 2:])
+    return {
+        "eigenvalues_long": eigenvalues,
+        "short_period_frequency": omega_sp,
+        "short_period_damping": zeta_sp,
+        "phugoid_frequency": omega_ph,
+        "phugoid_damping": zeta_ph,
+    }
+
+
+def lateral_modes(A_lat: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Dutch roll, roll and spiral modes of stacked lateral matrices.
+
+    The roll and spiral roots are the real roots with the largest and the
+    smallest magnitude. The Dutch roll is the conjugate pair when there is
+    one; when all four roots are real it is overdamped, and the two middle
+    roots form the pair (damping ratio > 1).
+    """
+    eigenvalues = np.linalg.eigvals(A_lat)
+
+    # All real: roll, Dutch roll, Dutch roll, spiral in order of decreasing magnitude
+    by_magnitude = np.argsort(-np.abs(eigenvalues), axis=-1)
+    order_real = by_magnitude[..., [1, 2, 0, 3]]
+    # Oscillatory: the pair with the largest |imaginary part|, then the remaining roots by magnitude
+    by_imaginary = np.argsort(-np.abs(np.imag(eigenvalues)), axis=-1)
+    rest = np.take_along_axis(eigenvalues, by_imaginary[..., 2:], axis=-1)
+    rest_order = np.take_along_axis(by_imaginary[..., 2:], np.argsort(-np.abs(rest), axis=-1), axis=-1)
+    order_complex = np.concatenate([by_imaginary[..., :2], rest_order], axis=-1)
+
+    oscillatory = np.any(np.abs(np.imag(eigenvalues)) > 1e-12 * np.abs(eigenvalues), axis=-1)
+    order = np.where(oscillatory[..., None], order_complex, order_real)
+    eigenvalues = np.take_along_axis(eigenvalues, order, axis=-1)
+    omega_dr, zeta_dr = _pair(eigenvalues[..., :2])
+    roll, spiral = np.real(eigenvalues[..., 2]), np.real(eigenvalues[..., 3])
+
+    with np.errstate(divide="ignore"):
+        spiral_time_to_double = np.where(spiral > 0, np.log(2) / spiral, np.inf)
+    return {
+        "eigenvalues_lat": eigenvalues,
+        "dutch_roll_frequency": omega_dr,
+        "dutch_roll_damping": zeta_dr,
+        "roll_time_constant": -1 / roll,
+        "spiral_root": spiral,
+        "spiral_time_to_double": spiral_time_to_double,
+    }
+
+
+def handling_quality_margins(modes: dict[str, np.ndarray], limits: dict[str, float] = LEVEL_1_LIMITS) -> dict[str, np.ndarray]:
+    """
+    Margin of every mode to its Level 1 limit as a fraction of that limit,
+    positive where the limit is met, e.g. 0.5 for a damping ratio 50 % above
+    its minimum. Being relative, the margins of damping ratios, frequencies
+    and times can be compared, handling_quality_margin is the smallest one.
+    An unstable roll mode gets a margin of -inf.
+    """
+    def above(value, key):
+        return (value - limits[key]) / limits[key]
+
+    def below(value, key):
+        return (limits[key] - value) / limits[key]
+
+    zeta_omega_dr = modes["dutch_roll_damping"] * modes["dutch_roll_frequency"]
+    tau_roll = modes["roll_time_constant"]
+    margins = {
+        "short_period_damping_margin": np.minimum(
+            above(modes["short_period_damping"], "short_period_damping_min"),
+            below(modes["short_period_damping"], "short_period_damping_max"),
+        ),
+        "phugoid_damping_margin": above(modes["phugoid_damping"], "phugoid_damping_min"),
+        "dutch_roll_damping_margin": np.minimum.reduce([
+            above(modes["dutch_roll_damping"], "dutch_roll_damping_min"),
+            above(modes["dutch_roll_frequency"], "dutch_roll_frequency_min"),
+            above(zeta_omega_dr, "dutch_roll_zeta_omega_min"),
+        ]),
+        "roll_time_constant_margin": np.where(tau_roll > 0, below(tau_roll, "roll_time_constant_max"), -np.inf),
+        "spiral_margin": above(modes["spiral_time_to_double"], "spiral_time_to_double_min"),
+    }
+    margins["handling_quality_margin"] = np.minimum.reduce(list(margins.values()))
+    margins["level_1"] = margins["handling_quality_margin"] >= 0
+    return margins
+
+
+class DynamicStability:
+    """Dynamic stability and handling qualities of the UAV over its flight envelope.
+
+    Parameters
+    ----------
+    inputs
+        Design dictionary, see ``stab_n_con_inputs``. The CG range is taken
+        from the CGEnvelope outputs (cg_bar_fwd, cg_bar_aft) when available.
+    n_speeds
+        Number of speeds between 1.2 V_stall and V_cruise in the envelope.
+    """
+
+    output_keys = (
+        "short_period_damping_min", "phugoid_damping_min", "dutch_roll_damping_min", "roll_time_constant_max",
+        "spiral_time_to_double_min", "handling_quality_margin", "level_1",
+    )
+
+    def __init__(self, inputs: dict[str, float], hardware=None, n_speeds: int = 8) -> None:
+        self.inputs = inputs
+        self.hardware = hardware
+        self.outputs = inputs.copy()
+        self.n_speeds = n_speeds
+
+    # ~~~ Intermediate Functions ~~~
+
+    def derivatives(self) -> dict[str, float]:
+        """
+        Lateral derivatives [1/rad]. Cl_p and Cl_delta_a come from the aileron
+        sizing, Cn_beta and Cn_delta_r from the fin and rudder relations of
+        StabCon (sign flipped to the body-axis convention), the rest are
+        strip-theory and tail-volume estimates.
+        """
+        i = self.inputs
+        stabcon = StabCon(i)
+        _, _, Cl_delta_a, Cl_p = stabcon.size_ailerons()
+        if not CL_P_RANGE[0] <= Cl_p <= CL_P_RANGE[1]:
+            raise ValueError(f"Roll damping Cl_p = {Cl_p:.3f} /rad is outside the plausible range {CL_P_RANGE}.")
+
+        CL_alpha_v = np.pi * i["ARvt"] / (1 + np.sqrt(1 + (i["ARvt"] / 2) ** 2))
+        Sv_S = i["Vv"] * i["wing_span"] / i["lvt"]
+        cr_cv = i.get("cr_over_cv", i["cr_cv_init"])
+        CL = i["M_to"] * i["g"] / (0.5 * i["rho_0"] * i["V_cruise"] ** 2 * i["wing_area"])
+
+        return {
+            "CY_beta": -CL_alpha_v * Sv_S,
+            "CY_r": 2 * CL_alpha_v * i["Vv"],
+            "Cl_beta": i["Cl_beta"],
+            "Cl_p": Cl_p,
+            "Cl_r": CL / 4,
+            "Cn_beta": i["Cn_beta_fin_factor"] * CL_alpha_v * i["Vv"],
+            "Cn_p": -CL / 8,
+            "Cn_r": -2 * i["Vv"] * CL_alpha_v * i["lvt"] / i["wing_span"],
+            "Cl_delta_a": Cl_delta_a,
+            "Cn_delta_r": stabcon.tau(cr_cv) * CL_alpha_v * i["Vv"] * cr_cv * i["br_bv"],
+        }
+
+    def inertia(self, mass) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Moments of inertia [kg m^2] from nondimensional radii of gyration (Roskam)."""
+        i = self.inputs
+        mass = np.asarray(mass, dtype=float)
+        Ixx = mass * (i["wing_span"] * i["Rx_bar"] / 2) ** 2
+        Iyy = mass * (i["l_fus"] * i["Ry_bar"] / 2) ** 2
+        Izz = mass * ((i["wing_span"] + i["l_fus"]) / 2 * i["Rz_bar"] / 2) ** 2
+        return Ixx, Iyy, Izz
+
+    def envelope(self, V, altitude, mass, x_cg_bar, derivatives: dict[str, float] | None = None) -> dict[str, np.ndarray]:
+        """
+        Modes and handling-quality margins for all flight conditions at once.
+        V [m/s], altitude [m], mass [kg] and x_cg_bar are broadcast against
+        each other, e.g. V[:, None, None, None] and altitude[None, :, None, None]
+        for every combination, and all results have the broadcast shape.
+        """
+        i = self.inputs
+        derivatives = self.derivatives() if derivatives is None else derivatives
+        V, altitude, mass, x_cg_bar = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in (V, altitude, mass, x_cg_bar))
+        )
+        rho = isa_density(altitude)
+        Ixx, Iyy, Izz = self.inertia(mass)
+
+        A_long = longitudinal_matrix(
+            V, rho, mass, x_cg_bar, i["wing_area"], i["mac"], i["AR"], i["e"], i["CD_0"], i["CL_alpha_Ah"],
+            i["x_ac_bar_wing"], i["CL_alpha_h"], i["d_epsilon_d_alpha"], i["Sh_S"], i["lh"], i["Vh_V"], Iyy, i["g"],
+        )
+        A_lat, B_lat = lateral_matrices(
+            V, rho, mass, i["wing_area"], i["wing_span"], Ixx=Ixx, Izz=Izz, g=i["g"], **derivatives,
+        )
+
+        results = {"A_long": A_long, "A_lat": A_lat, "B_lat": B_lat}
+        results.update(longitudinal_modes(A_long))
+        results.update(lateral_modes(A_lat))
+        results.update(handling_quality_margins(results))
+        return results
+
+    def design_envelope(self) -> dict[str, np.ndarray]:
+        """
+        Speeds from 1.2 V_stall to V_cruise, sea level to the service ceiling,
+        with and without payload, at the most forward and most aft CG.
+        """
+        i = self.inputs
+        V = np.linspace(1.2 * i["V_stall"], i["V_cruise"], self.n_speeds)
+        altitude = np.array([0.0, i["h_cruise"], i["h_service"]])
+        mass = np.array([i["M_to"] - i["payload_mass"], i["M_to"]])
+        x_cg_bar = np.array([
+            i.get("cg_bar_fwd", i["x_ac_bar_wing"] - 0.1), i.get("cg_bar_aft", i["x_ac_bar_wing"])
+        ])
+        return self.envelope(V[:, None, None, None], altitude[:, None, None], mass[:, None], x_cg_bar)
+
+    # ~~~ Output functions ~~~
+
+    def get_all(self) -> dict[str, float]:
+        results = self.design_envelope()
+
+        # Worst case over the whole envelope
+        self.outputs["short_period_damping_min"] = float(np.min(results["short_period_damping"]))
+        self.outputs["phugoid_damping_min"] = float(np.min(results["phugoid_damping"]))
+        self.outputs["dutch_roll_damping_min"] = float(np.min(results["dutch_roll_damping"]))
+        self.outputs["roll_time_constant_max"] = float(np.max(results["roll_time_constant"]))
+        self.outputs["spiral_time_to_double_min"] = float(np.min(results["spiral_time_to_double"]))
+        self.outputs["handling_quality_margin"] = float(np.min(results["handling_quality_margin"]))
+        self.outputs["level_1"] = bool(np.all(results["level_1"]))
+
+        return self.outputs
+
+
+# ---------------------------------------------------------------------------#
+# Basic sanity check                                                         #
+# ---------------------------------------------------------------------------#
+if __name__ == "__main__":  # pragma: no cover
+    from DetailedDesign.inputs import initial_inputs
+
+    dynamic_stability = DynamicStability(initial_inputs)
+    results = dynamic_stability.design_envelope()
+    print(f"{results['A_long'].shape[:-2]} flight conditions")
+    for key in ("short_period_damping", "phugoid_damping", "dutch_roll_damping", "dutch_roll_frequency",
+                "roll_time_constant", "spiral_time_to_double", "handling_quality_margin"):
+        print(f"{key}: {np.min(results[key]):.3f} ... {np.max(results[key]):.3f}")
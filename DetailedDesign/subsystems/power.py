@@ -11,6 +11,16 @@ import numpy as np
 
 class Power:
 
+    input_keys = (
+        'M_to', 'DOD_fraction', 'eta_battery', 'time_cruise_max', 'time_cruise_min', 'time_ascent',
+        'time_descent', 'time_deploy', 'time_transition', 'time_scan', 'time_turnaround',
+        'power_required_VTOL', 'power_required_hover', 'power_deploy', 'power_transition', 'power_scan',
+        'power_idle', 'power_cruise_hardware', 'power_required_cruise'
+    )
+    output_keys = (
+        'required_capacity_wh', 'required_capacity_min_wh', 'battery_capacity'
+    )
+
     def __init__(self, inputs, hardware) -> None:
         self.inputs = inputs
         self.hardware = hardware
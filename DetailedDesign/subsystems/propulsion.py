@@ -14,6 +14,18 @@ from DetailedDesign.subsystems.constraints import Constraints
 
 class Propulsion:
 
+    input_keys = (
+        'wing_loading', 's_tot_sw', 'n_prop_vtol', 'rho_0', 'ROC_VTOL', 'MTOW', 'g', 'eff_prop', 'K_p',
+        'n_props_cruise', 'motor_mass_cruise', 'motor_mass_VTOL', 'propeller_mass_VTOL',
+        'propeller_mass_cruise', 'power_available_VTOL', 'power_available_cruise', 'power_required_cruise'
+    )
+    output_keys = (
+        'power_required_VTOL', 'power_required_cruise', 'power_required_hover', 'power_available_VTOL',
+        'power_available_cruise', 'propeller_diameter_VTOL', 'propeller_diameter_cruise', 'mass_propulsion',
+        'motor_mass_VTOL', 'motor_mass_cruise', 'propeller_mass_VTOL', 'propeller_mass_cruise',
+        'power_transition'
+    )
+
     def __init__(self, inputs: dict[str, float], hardware = None) -> None:
         self.inputs = inputs
         self.outputs = self.inputs.copy()
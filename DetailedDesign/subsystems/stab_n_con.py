@@ -13,13 +13,46 @@ from pathlib import Path
 from typing import Any
 
 import numpy as np
-from scipy.integrate import simpson
+from scipy.integrate import cumulative_simpson, simpson
+from scipy.interpolate import make_interp_spline
 from scipy.differentiate import derivative
 import matplotlib.pyplot as plt
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 sys.path.append(str(PROJECT_ROOT))
 
+from DetailedDesign.subsystems.cg_envelope import (
+    cg_tracks,
+    component_table,
+    scissor_coefficients,
+    scissor_lines,
+)
+
+
+def _bisect_increasing(function, target, lower: float, upper: float, tol: float):
+    """
+    Smallest x in [lower, upper] with function(x) ≥ target, for an increasing
+    function, found element-wise for an array of targets.
+
+    The bracket is bisected until it is narrower than tol and its upper end is
+    returned, so the target is always met. Returns lower where the target is
+    already met there and NaN where it is not met even at upper.
+    """
+    target = np.asarray(target, dtype=float)
+    lo = np.full(target.shape, float(lower))
+    hi = np.full(target.shape, float(upper))
+    met_at_lower = function(lo) >= target
+    feasible = function(hi) >= target
+
+    while np.any(hi - lo > tol):
+        mid = 0.5 * (lo + hi)
+        met = function(mid) >= target
+        hi = np.where(met, mid, hi)
+        lo = np.where(met, lo, mid)
+
+    x = np.where(met_at_lower, float(lower), np.where(feasible, hi, np.nan))
+    return x[()] if x.ndim == 0 else x
+
 
 class StabCon:
     """Stability & Control analysis helper for the AeroShield UAV.
@@ -34,6 +67,12 @@ class StabCon:
     DATA_DIR = PROJECT_ROOT / "DetailedDesign" / "data"
     EFFECTIVENESS_FILE = DATA_DIR / "elevator_effectiveness.csv"
 
+    # Elevator-effectiveness interpolant τ(cₐ/c), shared by all instances and
+    # built from EFFECTIVENESS_FILE the first time it is needed
+    _tau_spline = None
+    _tau_range: tuple[float, float] | None = None
+    _tau_cache = {"hits": 0, "misses": 0}
+
     # ---------------------------------------------------------------------#
     # Construction helpers                                                 #
     # ---------------------------------------------------------------------#
@@ -53,97 +92,91 @@ class StabCon:
 
     # ~~~ Aileron sizing ~~~
 
-    def size_ailerons(self, step_frac: float = 0.001) -> float:
+    def size_ailerons(self, tol_frac: float = 1e-6, roll_rate_req=None) -> tuple:
         """
         Return the achievable steady-state roll rate *p_achieved* [rad/s], by expanding
         the aileron's outer station bo until roll_rate_req is met or until bo reaches half-span.
 
+        The chord-weighted integral ∫ c·y dy is precomputed once as a cumulative
+        array, the smallest bo meeting the requirement is then found by bisection
+        on [bo, half-span].
+
         Args:
-            step_frac (float): Fraction of half-span to increment bo on each iteration.
-                               For instance, step_frac=0.01 means bo jumps by (0.01 * wing_span/2)
-                               each time.
+            tol_frac (float): Resolution of bo as a fraction of the half-span. The
+                              returned bo always meets the requirement.
+            roll_rate_req (float | array): Required roll rate(s) [rad/s], defaults to
+                              self.roll_rate_req. For an array, bo, p_achieved and
+                              Cl_delta_a are arrays of the same shape, NaN where the
+                              requirement cannot be met.
 
         Returns:
             p_achieved (float): The final roll rate achieved once sizing has converged.
             bo (float): The final outer aileron station after sizing.
+            Cl_delta_a (float): Roll control derivative at the final bo.
+            Cl_p (float): Roll damping derivative.
 
         Raises:
-            ValueError: If bo cannot be increased further (hits half-span) without meeting the requirement.
+            ValueError: If the (scalar) requirement cannot be met before bo reaches half-span.
         """
         half_span = self.wing_span / 2.0
+        requirement = self.roll_rate_req if roll_rate_req is None else roll_rate_req
 
         # Sanity check: ensure 0 ≤ bi < bo ≤ half_span
         if not (0.0 <= self.bi < self.bo <= half_span):
             raise ValueError(f"Invalid aileron stations: bi={self.bi}, bo={self.bo}")
 
-        # Precompute arrays that stay constant
-        spanwise_stations = np.linspace(0.0, half_span, 1000)
-        chord = (
-            self.wing_root_chord
-            - ((self.wing_root_chord - self.wing_tip_chord) / half_span)
-            * spanwise_stations
-        )
+        stations, cumulative, Cl_p = self._roll_integrals()
 
-        # Compute Cl_p once (unchanging with bo)
-        Cl_p = -(
-            (4.0 * (self.cl_alpha + self.cd_0))
+        # Cl_delta_a per unit of ∫ c·y dy and roll rate per unit of Cl_delta_a
+        Cl_delta_a_per_integral = (
+            2.0
+            * self.cl_alpha
+            * self._tau_from_ca_over_c(self.ca_c)
             / (self.wing_area * self.wing_span)
-            * simpson(chord * spanwise_stations**2, spanwise_stations)
         )
+        delta_a = 0.5 * self.delta_a_max * (1.0 + self.aileron_differential)
+        p_per_Cl_delta_a = -(1.0 / Cl_p) * delta_a * (2.0 * self.v_ref / self.wing_span)
 
-        # Fixed‐increment for bo (in meters)
-        delta_bo = step_frac * half_span
+        integral_bi = np.interp(self.bi, stations, cumulative)
 
-        while True:
-            # 1) Mask stations within [bi, bo] for the current bo
-            aileron_idx = (spanwise_stations >= self.bi) & (
-                spanwise_stations <= self.bo
-            )
+        def Cl_delta_a_at(bo):
+            return Cl_delta_a_per_integral * (np.interp(bo, stations, cumulative) - integral_bi)
 
-            # 2) Compute Cl_delta_a for this bo
-            Cl_delta_a = (
-                2.0
-                * self.cl_alpha
-                * self._tau_from_ca_over_c(self.ca_c)
-                / (self.wing_area * self.wing_span)
-                * simpson(
-                    chord[aileron_idx] * spanwise_stations[aileron_idx],
-                    spanwise_stations[aileron_idx],
-                )
-            )
-
-            # 3) Compute delta_a (max deflection × differential factor)
-            delta_a = 0.5 * self.delta_a_max * (1.0 + self.aileron_differential)
-
-            # 4) Compute p_achieved
-            p_achieved = (
-                -(Cl_delta_a / Cl_p) * delta_a * (2.0 * self.v_ref / self.wing_span)
-            )
-
-            # 5) Check if requirement is met
-            if p_achieved >= self.roll_rate_req:
-                return p_achieved, self.bo, Cl_delta_a, Cl_p
-
-            # 6) If not, increase bo by one step
-            new_bo = self.bo + delta_bo
+        bo = _bisect_increasing(
+            lambda bo: p_per_Cl_delta_a * Cl_delta_a_at(bo),
+            requirement, self.bo, half_span, tol_frac * half_span,
+        )
+        Cl_delta_a = Cl_delta_a_at(bo)
+        p_achieved = p_per_Cl_delta_a * Cl_delta_a
 
-            # 7) Safety: cannot exceed half-span
-            if new_bo >= half_span:
+        if np.ndim(requirement) == 0:
+            if np.isnan(bo):
+                p_max = p_per_Cl_delta_a * Cl_delta_a_at(half_span)
                 raise ValueError(
                     f"Cannot meet roll-rate requirement. "
-                    f"Reached bo={self.bo:.3f} m (max half-span={half_span:.3f} m) without achieving "
-                    f"{self.roll_rate_req:.3f} rad/s (max achieved: {p_achieved:.3f})."
+                    f"Reached bo={half_span:.3f} m (max half-span={half_span:.3f} m) without achieving "
+                    f"{requirement:.3f} rad/s (max achieved: {p_max:.3f})."
                 )
+            bo, Cl_delta_a, p_achieved = float(bo), float(Cl_delta_a), float(p_achieved)
+            self.bo = bo
 
-            # 8) Update bo and loop again
-
-            self.bo = new_bo
+        return p_achieved, bo, Cl_delta_a, Cl_p
 
     # ~~~ Rudder sizing (static-trim gust criterion, τr varies with cr/cv) ~~~
-    def size_rudder(self, step_frac: float = 0.001) -> tuple[float, float]:
+    def size_rudder(self, tol: float = 1e-6, gust_speed=None) -> tuple:
         """
-        Iterate the rudder-to-fin chord ratio (cr/cv) until the rudder can
-        *trim* the sideslip created by a design gust.
+        Find the smallest rudder-to-fin chord ratio (cr/cv) for which the rudder
+        can *trim* the sideslip created by a design gust, by bisection on
+        [cr_cv_init, 0.9].
+
+        Parameters
+        ----------
+        tol : float
+            Resolution of cr/cv, the returned ratio always meets the requirement.
+        gust_speed : float or array, optional
+            Design gust speed(s) [m/s], defaults to self.gust_speed. For an array
+            the chord ratios are arrays of the same shape, NaN where the gust
+            cannot be trimmed, and the instance is not updated.
 
         Returns
         -------
@@ -152,14 +185,16 @@ class StabCon:
         sr_over_sv : float
             Rudder-area / fin-area ratio for bookkeeping.
         """
+        gust = self.gust_speed if gust_speed is None else gust_speed
+
         # ── 1.  Gust-induced sideslip ────────────────────────────────────
-        beta_0 = self.gust_speed / self.v_ref  # [rad]
+        beta_0 = np.asarray(gust, dtype=float) / self.v_ref  # [rad]
 
-        # ── 2.  Directional stability derivative (fin only) ─────────────
+        # ── 2.  Directional stability derivative ─────────────────────────
         CL_alpha_v = (
             np.pi * self.ARvt / (1 + np.sqrt(1 + (self.ARvt / 2) ** 2))
         )  # [1/rad]
-        Cn_beta = -0.8 * CL_alpha_v * self.Vv  # < 0 (restoring)
+        Cn_beta = -self.Cn_beta_fin_factor * CL_alpha_v * self.Vv  # < 0 (restoring), fin less the fuselage
         print(f"Cl: {CL_alpha_v}")
 
         # Required control power, per rad of deflection
@@ -170,34 +205,34 @@ class StabCon:
         V_v = self.Vv  # alias for clarity
         br_bv = self.br_bv
 
-        # ── 4.  Iterate on cr/cv ────────────────────────────────────────
-        cr_cv = self.cr_cv_init
+        # ── 4.  Bisection on cr/cv (effectiveness grows with chord ratio) ─
         max_cr_cv = 0.9
-        dcr = step_frac * max_cr_cv
-
-        while True:
-            # ♦ Effectiveness grows with chord ratio ♦
-            tau_r = self._tau_from_ca_over_c(cr_cv)
 
+        def Cn_dr_at(cr_cv):
             S_r = cr_cv * br_bv * S_v
-            Cn_dr = tau_r * CL_alpha_v * V_v * (S_r / S_v)
-
-            if Cn_dr >= Cn_req:  # ✅ requirement met
-                self.cr_over_cv = cr_cv
-                self.rudder_area = S_r
-                self.Cn_delta_r = Cn_dr
-                self._outputs.update(
-                    {"cr_over_cv": cr_cv, "rudder_area": S_r, "Cn_delta_r": Cn_dr}
-                )
-                return cr_cv, S_r / S_v
+            return self._tau_from_ca_over_c(cr_cv) * CL_alpha_v * V_v * (S_r / S_v)
 
-            cr_cv += dcr  # ➜ try a larger chord
+        cr_cv = _bisect_increasing(Cn_dr_at, Cn_req, self.cr_cv_init, max_cr_cv, tol)
+        S_r = cr_cv * br_bv * S_v
+        Cn_dr = Cn_dr_at(cr_cv)
 
-            if cr_cv > max_cr_cv:
-                raise ValueError(
-                    f"Cannot meet gust-trim requirement: need Cnδr={Cn_req:.4f}, "
-                    f"achieved {Cn_dr:.4f} at cr/cv={max_cr_cv:.2f}."
-                )
+        if np.ndim(gust) > 0:
+            return cr_cv, S_r / S_v
+
+        if np.isnan(cr_cv):
+            raise ValueError(
+                f"Cannot meet gust-trim requirement: need Cnδr={Cn_req:.4f}, "
+                f"achieved {Cn_dr_at(max_cr_cv):.4f} at cr/cv={max_cr_cv:.2f}."
+            )
+
+        cr_cv, S_r, Cn_dr = float(cr_cv), float(S_r), float(Cn_dr)
+        self.cr_over_cv = cr_cv
+        self.rudder_area = S_r
+        self.Cn_delta_r = Cn_dr
+        self._outputs.update(
+            {"cr_over_cv": cr_cv, "rudder_area": S_r, "Cn_delta_r": Cn_dr}
+        )
+        return cr_cv, S_r / S_v
 
     def size_elevator_static(self, d_ce=0.002, tol=1e-4):
         """
@@ -378,93 +413,20 @@ class StabCon:
 
     def calculate_uav_cg_chat(self) -> dict[str, dict[str, float]]:
         """Return fuselage and wing longitudinal CG for each mission configuration."""
-        # ---------------------------------------------------------------------
-        # 1. Mission‑specific items (mass [kg], x‑coordinate [m])
-        # ---------------------------------------------------------------------
-        configs = {
-            "wildfire": dict(
-                sensor=(self.wildfire_sensor_mass, self.wildfire_sensor_x),
-                payload=(self.payload_mass, self.payload_x),
-                buoy=(0.0, 0.0),
-            ),
-            "oil_spill": dict(
-                sensor=(self.oil_spill_sensor_mass, self.oil_spill_sensor_x),
-                payload=(self.payload_mass, self.payload_x),
-                buoy=(self.buoy_mass, self.buoy_x),
-            ),
-            "no_payload_wildfire": dict(
-                sensor=(self.wildfire_sensor_mass, self.wildfire_sensor_x),
-                payload=(0.0, 0.0),
-                buoy=(0.0, 0.0),
-            ),
-            "no_payload_oil_spill": dict(
-                sensor=(self.oil_spill_sensor_mass, self.oil_spill_sensor_x),
-                payload=(0.0, 0.0),
-                buoy=(self.buoy_mass, self.buoy_x),
-            ),
-        }
-
-        # ---------------------------------------------------------------------
-        # 2. Fixed fuselage components (present in every configuration)
-        # ---------------------------------------------------------------------
-        fuselage_static = [
-            (self.gymbal_connection_mass, self.gymbal_connection_x),
-            (self.flight_controller_mass, self.flight_controller_x),
-            (self.OBC_mass, self.OBC_x),
-            (self.GPS_mass, self.GPS_x),
-            (self.Mesh_network_module_mass, self.Mesh_network_module_x),
-            (self.SATCOM_module_mass, self.SATCOM_module_x),
-            (self.Winch_motor_mass, self.Winch_motor_x),
-            (self.motor_mass_cruise + self.propeller_mass_cruise, self.motor_cruise_x),
-            (self.CUAV_airlink_mass, self.CUAV_airlink_x),
-            (self.fuselage_structural_mass, self.fuselage_structural_x_cg),
-            (self.tailplane_structural_mass, self.tailplane_structural_x_cg),
-            (self.motor_esc_cruise_mass, self.motor_esc_cruise_x),
-        ]
-
-        # ---------------------------------------------------------------------
-        # 3. Wing group (identical for all variants)
-        # ---------------------------------------------------------------------
-        lift_motor_mass = (
-            self.motor_mass_VTOL + self.propeller_mass_VTOL + self.motor_esc_VTOL_mass
+        # Component matrix & configuration mask (see cg_envelope.component_table),
+        # the LEMAC position does not matter for the group CGs
+        table = component_table(self.inputs)
+        tracks = cg_tracks(
+            table["mass"], table["x"], table["wing_group"], table["mask"], [0.0], self.mac
         )
-        wing_items = [
-            (2 * lift_motor_mass, self.motor_front_VTOL_x),
-            (2 * lift_motor_mass, self.motor_rear_VTOL_x),
-            (self.battery_mass, self.battery_x),
-            (self.PDB_mass, self.PDB_x),
-            (self.wing_structural_mass, self.wing_structural_x_cg),
-            (self.thermal_control_mass, self.thermal_control_x),
-        ]
-
-        # ---------------------------------------------------------------------
-        # 4. Helper functions
-        # ---------------------------------------------------------------------
-        mass_sum = lambda items: sum(m for m, _ in items)
-        moment_sum = lambda items: sum(m * x for m, x in items)
-
-        # ---------------------------------------------------------------------
-        # 5. Main loop
-        # ---------------------------------------------------------------------
-        results: dict[str, dict[str, float]] = {}
-        for name, cfg in configs.items():
-            fuselage_items = fuselage_static + [
-                cfg["sensor"],
-                cfg["payload"],
-                cfg["buoy"],
-            ]
-
-            fus_mass = mass_sum(fuselage_items)
-            fus_x_cg = moment_sum(fuselage_items) / fus_mass
-
-            wing_mass = mass_sum(wing_items)
-            wing_x_cg = moment_sum(wing_items) / wing_mass
 
+        results: dict[str, dict[str, float]] = {}
+        for i, name in enumerate(table["configurations"]):
             results[name] = {
-                "fuselage_mass": fus_mass,
-                "wing_mass": wing_mass,
-                "fuselage_x_cg": fus_x_cg,
-                "wing_x_cg": wing_x_cg,
+                "fuselage_mass": float(tracks["fuselage_mass"][i]),
+                "wing_mass": float(tracks["wing_mass"][i]),
+                "fuselage_x_cg": float(tracks["fuselage_x_cg"][i]),
+                "wing_x_cg": float(tracks["wing_x_cg"][i]),
             }
 
         return results
@@ -521,33 +483,28 @@ class StabCon:
             }
         Notes
         -----
-        ▸ Uses calculate_uav_cg_chat() internally, so any change in component
-        weights/locations is picked up automatically.
+        ▸ Uses the component matrix of cg_envelope (as calculate_uav_cg_chat()
+        does), so any change in component weights/locations is picked up
+        automatically. All configurations are evaluated in one array pass.
         ▸ The term (wing_x_cg + x_lemac) follows your original convention:
         wing-group CG is measured from the wing datum, whereas x_lemac is the
         leading-edge-of-MAC position along the fuselage.
         """
-        # 1. Get current masses & CGs
-        cg_results = self.calculate_uav_cg_chat()
-
-        # 2. Create the LE-MAC sweep
+        # 1. Current masses & CGs for all configurations, over the LE-MAC sweep
+        table = component_table(self.inputs)
         x_lemac = np.linspace(0.5, self.l_fus - 0.5, n_pts)
+        tracks = cg_tracks(
+            table["mass"], table["x"], table["wing_group"], table["mask"], x_lemac, self.mac
+        )
 
-        # 3. Loop over configurations
+        # 2. Split per configuration
         results: dict[str, dict[str, np.ndarray]] = {}
-        for config, data in cg_results.items():
-            fus_mass, fus_x = data["fuselage_mass"], data["fuselage_x_cg"]
-            wing_mass, wing_x = data["wing_mass"], data["wing_x_cg"]
-
-            # Aircraft CG for each LE-MAC position
-            x_cg = (fus_x * fus_mass + (wing_x + x_lemac) * wing_mass) / (
-                fus_mass + wing_mass
-            )
-
-            # CG expressed as fraction of MAC behind LE-MAC
-            x_cg_bar = ((x_cg - x_lemac) / self.mac)
-
-            results[config] = {"x_lemac": x_lemac, "x_cg": x_cg, "x_cg_bar": x_cg_bar}
+        for i, config in enumerate(table["configurations"]):
+            results[config] = {
+                "x_lemac": x_lemac,
+                "x_cg": tracks["x_cg"][i],
+                "x_cg_bar": tracks["x_cg_bar"][i],
+            }
 
         return results
 
@@ -616,43 +573,30 @@ class StabCon:
         # 1. Nondimensional CG axis (same span as previous hard-coded limits)
         x_cg_bar = np.linspace(-0.5, 1.5, n_pts)
 
-        # 2.   ——— Stability requirement ———
-        # S_h/S ≥ (x_cg_bar − x_ac_bar − SM) / [ (CLα_h / CLα_w) (1−dε/dα) (ℓ_h/ĉ) (Vh/V) ]
-        stab_den = (
-            (self.CL_alpha_h / self.CL_alpha_Ah)
-            * (1.0 - self.d_epsilon_d_alpha)
-            * (self.lh / self.mac)
-            * self.Vh_V  # already the squared velocity ratio
-        )
-        sh_s_stability = (x_cg_bar - self.x_ac_bar_wing + static_margin) / stab_den
-        sh_s_stability_no_margin = (x_cg_bar - self.x_ac_bar_wing) / stab_den
-
-        # 3.   ——— Control requirement ———
+        # 2.   ——— Stability & control requirements ———
+        # S_h/S ≥ (x_cg_bar − x_ac_bar + SM) / [ (CLα_h / CLα_w) (1−dε/dα) (ℓ_h/ĉ) (Vh/V) ]
+        # S_h/S ≥ (x_cg_bar + Cm_ac/CL_Ah − x_ac_bar) / [ (CL_h / CL_Ah) (ℓ_h/ĉ) (Vh/V) ]
         # Tail CL in a pull-up is approximated as −0.35 AR_h^(1/3)
-        CL_h = -0.35 * self.AR_h ** (1.0 / 3.0)
-        CL_Ah = self.CL_A_h  # aircraft lift coeff. (wing + body – tail)
-        Cm_ac = (
-            self.Cm_ac_wing
-        )  # aerodynamic-centre moment coefficient STILL ADD FUSELAGE contribution based on XFLR5
-
-        ctrl_den = (CL_h / CL_Ah) * (self.lh / self.mac) * self.Vh_V
-        sh_s_control = (x_cg_bar + (Cm_ac / CL_Ah - self.x_ac_bar_wing)) / ctrl_den
-        sh_s_control_with_margin = (x_cg_bar + (Cm_ac / CL_Ah - self.x_ac_bar_wing)- static_margin) / ctrl_den
+        coefficients = scissor_coefficients(
+            self.CL_alpha_h, self.CL_alpha_Ah, self.d_epsilon_d_alpha, self.lh, self.mac,
+            self.Vh_V, self.AR_h, self.CL_A_h, self.Cm_ac_wing, self.x_ac_bar_wing,
+        )
+        lines = scissor_lines(x_cg_bar, coefficients, static_margin)
 
-        # 4. Fetch the *actual* CG tracks so the user can plot them together
-        cg_tracks: dict[str, np.ndarray] = {}
+        # 3. Fetch the *actual* CG tracks so the user can plot them together
+        tracks: dict[str, np.ndarray] = {}
         ld_results = self.loading_diagram_chat(n_pts=n_pts)
         for cfg, data in ld_results.items():
-            cg_tracks[cfg] = data["x_cg_bar"]  # already nondimensional
+            tracks[cfg] = data["x_cg_bar"]  # already nondimensional
 
-        # 5. Return everything nicely packaged
+        # 4. Return everything nicely packaged
         return {
             "x_cg_bar": x_cg_bar,
-            "sh_s_stability": sh_s_stability,
-            "sh_s_stability_no_margin": sh_s_stability_no_margin,
-            "sh_s_control": sh_s_control,
-            "sh_s_control_with_margin": sh_s_control_with_margin,
-            "cg_tracks": cg_tracks,
+            "sh_s_stability": lines["sh_s_stability"],
+            "sh_s_stability_no_margin": lines["sh_s_stability_no_margin"],
+            "sh_s_control": lines["sh_s_control"],
+            "sh_s_control_with_margin": lines["sh_s_control_with_margin"],
+            "cg_tracks": tracks,
         }
 
     # ---------------------------------------------------------------------#
@@ -667,11 +611,66 @@ class StabCon:
     # Private helpers                                                      #
     # ---------------------------------------------------------------------#
 
-    def _tau_from_ca_over_c(self, ratio) -> float:
+    def _tau_from_ca_over_c(self, ratio) -> float | np.ndarray:
         """Interpolate elevator effectiveness τ for the configured cₐ/c ratio."""
-        data = np.loadtxt(self.EFFECTIVENESS_FILE, delimiter=",", skiprows=0)
-        ca_c, tau = data.T
-        return float(np.interp(ratio, ca_c, tau))
+        return self.tau(ratio)
+
+    def _roll_integrals(self, n_stations: int = 1000) -> tuple[np.ndarray, np.ndarray, float]:
+        """Spanwise stations, cumulative ∫ c·y dy from the root and Cl_p."""
+        half_span = self.wing_span / 2.0
+        spanwise_stations = np.linspace(0.0, half_span, n_stations)
+        chord = (
+            self.wing_root_chord
+            - ((self.wing_root_chord - self.wing_tip_chord) / half_span)
+            * spanwise_stations
+        )
+        cumulative = cumulative_simpson(
+            chord * spanwise_stations, x=spanwise_stations, initial=0.0
+        )
+        Cl_p = -(
+            (4.0 * (self.cl_alpha + self.cd_0))
+            / (self.wing_area * self.wing_span**2)
+            * simpson(chord * spanwise_stations**2, x=spanwise_stations)
+        )
+        return spanwise_stations, cumulative, Cl_p
+
+    @classmethod
+    def _tau_interpolant(cls):
+        """Return the τ(cₐ/c) spline, reading the effectiveness table on first use."""
+        if cls._tau_spline is None:
+            data = np.loadtxt(cls.EFFECTIVENESS_FILE, delimiter=",", skiprows=0)
+            ca_c, tau = data[np.argsort(data[:, 0])].T
+            # Piecewise-linear spline: identical to np.interp on the table
+            cls._tau_spline = make_interp_spline(ca_c, tau, k=1)
+            cls._tau_range = (float(ca_c[0]), float(ca_c[-1]))
+            cls._tau_cache["misses"] += 1
+        else:
+            cls._tau_cache["hits"] += 1
+        return cls._tau_spline
+
+    @classmethod
+    def tau(cls, ratio):
+        """
+        Control-surface effectiveness τ for one or many chord ratios cₐ/c.
+
+        Ratios outside the table are clamped to its end points. Returns a float
+        for a scalar ratio and an array of the same shape otherwise.
+        """
+        spline = cls._tau_interpolant()
+        tau = spline(np.clip(ratio, *cls._tau_range))
+        return float(tau) if np.ndim(ratio) == 0 else tau
+
+    @classmethod
+    def tau_cache_info(cls) -> dict[str, int]:
+        """Hits (served from the cached spline) and misses (table reads) of τ."""
+        return dict(cls._tau_cache)
+
+    @classmethod
+    def clear_tau_cache(cls) -> None:
+        """Drop the cached spline so the table is re-read, e.g. after editing it."""
+        cls._tau_spline = None
+        cls._tau_range = None
+        cls._tau_cache.update(hits=0, misses=0)
 
 
 # ---------------------------------------------------------------------------#
@@ -5,11 +5,12 @@ This is the file for the Structures subsystem. It contains a single class.
 import numpy as np
 import matplotlib.pyplot as plt
 import scipy as sp
-from scipy import integrate
+from scipy import integrate, optimize
 import pandas as pd
 
 
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -26,6 +27,146 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 
 import numpy as np
 
+AIRFOIL_FILE = Path(__file__).resolve().parents[1] / "data" / "e1212_Lednicer.DAT"
+
+
+@lru_cache(maxsize=None)
+def load_airfoil(path: Path = AIRFOIL_FILE) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Reads a Lednicer airfoil file once. Returns the upper and lower surface as read-only (n, 2) arrays of x/c and y/c.
+    '''
+    with open(path, 'r') as f:
+        lines = f.readlines()[2:]  # Skips the first two lines
+    # Process coordinates
+    coords = []
+    for line in lines:
+        line = line.strip()
+        if line == "":
+            coords.append("BREAK")  # Mark the break between upper and lower surfaces
+            continue
+        parts = line.split()
+        if len(parts) == 2:
+            coords.append((float(parts[0]), float(parts[1])))
+
+    # Split at "BREAK"
+    if "BREAK" in coords:
+        break_index = coords.index("BREAK")
+        upper = coords[:break_index]
+        lower = coords[break_index + 1:]
+    else:
+        # Fallback: Find second occurrence of (0.0, 0.0)
+        zero_index = [i for i, p in enumerate(coords) if p == (0.0, 0.0)]
+        if len(zero_index) > 1:
+            break_index = zero_index[1]
+            upper = coords[:break_index]
+            lower = coords[break_index:]
+        else:
+            raise ValueError("Could not split upper and lower surfaces.")
+
+    upper, lower = np.array(upper, dtype=float), np.array(lower, dtype=float)
+    upper.flags.writeable = False
+    lower.flags.writeable = False
+    return upper, lower
+
+
+@lru_cache(maxsize=128)
+def section_integrals(root_chord: float, first_spar_position: float, second_spar_position: float, path: Path = AIRFOIL_FILE) -> dict[str, float]:
+    '''
+    Thickness independent properties of the wing box section, the spar positions are in meters. The skin and spars
+    are thin walled with one thickness t, so I = t * I_per_t, Q = t * Q_per_t and the enclosed area does not depend on t.
+    '''
+    upper, lower = load_airfoil(path)
+    x_upper, y_upper = upper[:, 0] * root_chord, upper[:, 1] * root_chord
+    x_lower, y_lower = lower[:, 0] * root_chord, lower[:, 1] * root_chord
+
+    # Skin integral of y^2 ds for the upper and lower skin
+    I_upper = integrate.simpson(y_upper**2 * np.sqrt(1 + np.gradient(y_upper, x_upper)**2), x=x_upper)
+    I_lower = integrate.simpson(y_lower**2 * np.sqrt(1 + np.gradient(y_lower, x_lower)**2), x=x_lower)
+
+    # Spar heights
+    top_of_front_spar = np.interp(first_spar_position, x_upper, y_upper)
+    bottom_of_front_spar = np.interp(first_spar_position, x_lower, y_lower)
+    front_spar_length = top_of_front_spar - bottom_of_front_spar
+    top_of_end_spar = np.interp(second_spar_position, x_upper, y_upper)
+    bottom_of_end_spar = np.interp(second_spar_position, x_lower, y_lower)
+    end_spar_length = top_of_end_spar - bottom_of_end_spar
+
+    I_front_spar = front_spar_length**3 / 12 + front_spar_length * (bottom_of_front_spar + front_spar_length / 2)
+    I_end_spar = end_spar_length**3 / 12 + end_spar_length * (bottom_of_end_spar + end_spar_length / 2)
+
+    # Skin lengths between the spars
+    in_box_upper = (x_upper >= first_spar_position) & (x_upper <= second_spar_position)
+    in_box_lower = (x_lower >= first_spar_position) & (x_lower <= second_spar_position)
+    length_upper = np.sum(np.hypot(np.diff(x_upper[in_box_upper]), np.diff(y_upper[in_box_upper])))
+    length_lower = np.sum(np.hypot(np.diff(x_lower[in_box_lower]), np.diff(y_lower[in_box_lower])))
+
+    Q_front_spar = front_spar_length / 2 * (bottom_of_front_spar + front_spar_length / 2 + front_spar_length / 4)
+    Q_end_spar = end_spar_length / 2 * (bottom_of_end_spar + end_spar_length / 2 + end_spar_length / 4)
+    Q_upper = length_upper * (top_of_front_spar - top_of_end_spar)
+    Q_lower = length_lower * (bottom_of_front_spar - bottom_of_end_spar)
+
+    # Area enclosed by the wing box
+    x_interp = np.linspace(first_spar_position, second_spar_position, 300)
+    enclosed_area = integrate.trapezoid(np.interp(x_interp, x_upper, y_upper) - np.interp(x_interp, x_lower, y_lower), x_interp)
+
+    return {
+        'I_per_t': float(I_upper + I_lower + I_front_spar + I_end_spar),
+        'Q_per_t': float(Q_front_spar + Q_end_spar + Q_upper + Q_lower),
+        'enclosed_area': float(enclosed_area),
+        'top_of_front_spar': float(top_of_front_spar),
+        'front_spar_length': float(front_spar_length),
+        'end_spar_length': float(end_spar_length),
+    }
+
+
+def plot_NVM(loads: dict[str, np.ndarray], path: str | None = None, x_label: str = "Spanwise Position $y$ [m]", load_unit: str = "[N]") -> None:
+    '''
+    Plots the distributed load, shear force and bending moment of a single load case from Structures.wing_load_cases
+    or Structures.boom_load_cases, saves the figure if a path is given and shows it
+    '''
+    y = loads['y']
+    fig, axs = plt.subplots(3, 1, figsize=(10, 10), sharex=True)
+
+    axs[0].plot(y, loads['load'], color='tab:blue', linewidth=2, label="Distributed Load")
+    axs[0].fill_between(y, loads['load'], color='tab:blue', alpha=0.3)
+    axs[0].set_ylabel(f"Distributed Load {load_unit}")
+    axs[0].set_xlabel(x_label)
+    axs[0].grid(True)
+
+    axs[1].plot(y[:-1], loads['V'], color='tab:orange', linewidth=2, label="Shear Force")
+    axs[1].fill_between(y[:-1], loads['V'], color='tab:orange', alpha=0.3)
+    axs[1].set_ylabel("Shear [N]")
+    axs[1].set_xlabel(x_label)
+    axs[1].grid(True)
+
+    axs[2].plot(y[:-2], loads['M'], color='tab:green', linewidth=2, label="Bending Moment")
+    axs[2].fill_between(y[:-2], loads['M'], color='tab:green', alpha=0.3)
+    axs[2].set_ylabel("Moment [N·m]")
+    axs[2].set_xlabel(x_label)
+    axs[2].grid(True)
+
+    plt.tight_layout(rect=[0, 0, 1, 0.97])
+    if path is not None:
+        plt.savefig(path, dpi=300)
+    plt.show()
+
+
+def required_thickness(stress: callable, allowable: float, t_min: float = 1e-5, t_max: float = 0.1, xtol: float = 1e-12) -> float:
+    '''
+    Smallest thickness t in [t_min, t_max] with |stress(t)| <= allowable, where the stress decreases with t.
+    Thin walled section stresses scale with 1/t, then the thickness follows in closed form. Otherwise the root
+    is bracketed in [t_min, t_max] and found with Brent's method.
+    '''
+    stress_min, stress_max = abs(stress(t_min)), abs(stress(t_max))
+    if stress_min <= allowable:
+        return t_min
+    if stress_max > allowable:
+        return t_max
+    if np.isclose(stress_min * t_min, stress_max * t_max, rtol=1e-9):
+        return float(np.clip(stress_min * t_min / allowable, t_min, t_max))
+    return float(optimize.brentq(lambda t: abs(stress(t)) - allowable, t_min, t_max, xtol=xtol))
+
+
 class Structures:
 
     def __init__(self, inputs: dict[str, float], hardware: dict[str, float] = None, verbose=False) -> None:
@@ -37,14 +178,15 @@ class Structures:
         self.wing_span = inputs["wing_span"]
         self.mtow = self.inputs['MTOW']
         self.span = self.inputs['wing_span']
+        self.M_to = self.inputs['M_to']
         self.rho = self.inputs['rho_0']
         # self.V_max = self.inputs['V_cruise']
 
-        # self.mass_margin = inputs["mass_margin"]
+        self.mass_margin = inputs["mass_margin"]
 
         self.mass_payload = inputs["payload_mass"]
         # self.mass_hardware = inputs["mass_hardware"]
-        self.mass_battery = inputs["mass_battery"]
+        self.mass_battery = inputs["battery_mass"]  # the batteries sit in the wing
         self.battery_length = inputs['battery_length']
         self.mass_propulsion = inputs["mass_propulsion"]
         self.taper_ratio = inputs['taper_ratio']
@@ -76,6 +218,7 @@ class Structures:
         self.tensile_strength_alu = inputs['tensile_strength_alu']
         self.E_foam = inputs['E_foam']
         self.E_alu = inputs['E_alu']
+        self.poisson_alu = inputs['poisson_alu']
         self.density_alu = inputs['density_alu']
         self.boom_inner_diameter = inputs['boom_inner_diameter']
 
@@ -148,83 +291,117 @@ class Structures:
         # Update payload mass
         self.mass_payload = self.M_to * self.MF_payload
         
-    def NVM_cruise(self, return_root_values=False, return_max_values=False) -> None:
-        """
-        This function calculates the NVM (Normal, Shear, and Bending Moment) for the UAV wing during cruise flight.
-        It considers the distributed loads from the wing weight, battery weight and lift, and the point loads from the propellers.
-        It then plots the distributed load, shear force, and bending moment along the span of the wing.
+    def wing_load_cases(self, phase: str = 'cruise', load_factor=None, wind_speed=None, mtow=None, mass_battery=None,
+                        n_points: int = 500) -> dict[str, np.ndarray]:
+        '''
+        Distributed load, shear force and bending moment along the half span for a set of load cases at once.
+        Each of load_factor, wind_speed, mtow [N] and mass_battery [kg] may be an array, they default to the design
+        values and are broadcast against each other. The results have the shape (*cases, n_points), one fewer point
+        for the shear force and two fewer for the bending moment.
 
-        load factor is from the gust loads
+        In cruise the lift (elliptical, scaled with the load factor) carries the wing. In hover ('VTOL') the
+        propellers carry it and a gust from straight below acts on the wing. Down is positive.
+        '''
+        if phase not in ('cruise', 'VTOL'):
+            raise ValueError(f"Unknown flight phase: {phase}")
+        load_factor, wind_speed, mtow, mass_battery = (np.asarray(value, dtype=float)[..., None] for value in np.broadcast_arrays(
+            self.load_factor if load_factor is None else load_factor, self.wind_speed if wind_speed is None else wind_speed,
+            self.mtow if mtow is None else mtow, self.mass_battery if mass_battery is None else mass_battery))
 
-        Down is considered positive in this context, as per the provided reference and convention for aircraft coordinate systems.
+        half_span = self.span / 2.0
+        y = np.linspace(0, half_span, n_points)  # 0 (root) to b/2 (tip)
 
-        The load factor is 1
-        """
+        # Distributed load from the battery and the wing weight
+        W_batt = np.where(y < self.battery_length, mass_battery*9.81 / (self.battery_length), 0.)
+        x_0 = self.mass_wing*9.81 / (half_span*(self.taper_ratio + 0.5*(1-self.taper_ratio)))
+        W_wing = -(((1-self.taper_ratio)*x_0 / half_span)* y - x_0)
 
-        # https://uotechnology.edu.iq/dep-MechanicsandEquipment/Lectures%20and%20Syllabus/Lectures/Aircraft/Foruth%20Grade/Aircraft%20Design3.pdf
+        # Point load from the propellers
+        F_prop = 9.81*(2*(self.propeller_mass_VTOL + self.motor_mass_VTOL) + self.VTOL_boom_mass)
 
-        # DOWN IS POSITIVE
+        if phase == 'cruise':
+            # Distributed lift load from the lift assuming elliptical lift distribution
+            L_y = -load_factor*((4*mtow) / (np.pi*self.span)) * np.sqrt(1 - ((2*y)/self.span)**2)
+            total_forces = W_batt + L_y + W_wing
+        else:
+            F_gust = -0.5*self.rho_0* wind_speed**2 * (self.wing_area / 2)
+            total_forces = W_wing + W_batt + F_gust / self.span
+            F_prop = F_prop - 0.5*mtow
 
-        half_span = self.span / 2.0
-        y = np.linspace(0, half_span, 500)  # 0 (root) to b/2 (tip)
+        V_prop = np.where(y < self.y_prop, F_prop, 0.)
 
-        # Distributed load from the battery
+        V_rev = integrate.cumulative_simpson(total_forces[..., ::-1], x=y, axis=-1) + V_prop[..., ::-1][..., :-1]
+        M_rev = integrate.cumulative_simpson(V_rev, x=y[:-1], axis=-1)
 
-        W_batt = np.array([self.mass_battery*9.81 / (self.battery_length) if i < self.battery_length else 0 for i in y])
+        return {
+            'y': y,
+            'load': total_forces,
+            'V': V_rev[..., ::-1],
+            'M': -M_rev[..., ::-1],
+        }
 
-        # Distributed load from the wing weight
+    def boom_load_cases(self, thickness=None, wind_speed=None, mtow=None, n_points: int = 500) -> dict[str, np.ndarray]:
+        '''
+        Distributed load, shear force, bending moment and deflection along the VTOL propeller boom for a set of load
+        cases at once. thickness (of the boom wall), wind_speed and mtow [N] may be arrays, see wing_load_cases.
+        '''
+        thickness, wind_speed, mtow = (np.asarray(value, dtype=float)[..., None] for value in np.broadcast_arrays(
+            self.VTOL_boom_thickness if thickness is None else thickness, self.wind_speed if wind_speed is None else wind_speed,
+            self.mtow if mtow is None else mtow))
 
-        x_0 = self.mass_wing*9.81 / (half_span*(self.taper_ratio + 0.5*(1-self.taper_ratio)))
-        W_wing = [-(((1-self.taper_ratio)*x_0 / half_span)* i - x_0) for i in y]
+        y = np.linspace(-0.5*self.VTOL_boom_length, 0.5*self.VTOL_boom_length, n_points)
+        half = n_points // 2
 
-        # Point load from the propellers
+        # Distributed load from the boom weight and the gust
+        I_circle = (np.pi / 4)* ((self.boom_inner_diameter/2+thickness)**4 - (self.boom_inner_diameter/2)**4)
+        boom_weight = (0.5*thickness)**2 * np.pi * self.VTOL_boom_length * self.density_glass_fibre *9.81
+        W_boom = np.broadcast_to(boom_weight / self.VTOL_boom_length, np.broadcast_shapes(boom_weight.shape, y.shape))
+        F_gust = -0.5*self.rho_0* wind_speed**2 * (self.boom_inner_diameter + 2*thickness / 2)
+        total_forces = W_boom + F_gust / self.VTOL_boom_length
 
-        F_prop = 9.81*(2*(self.propeller_mass_VTOL + self.motor_mass_VTOL) + self.VTOL_boom_mass)
+        # Point load from the propeller
+        F_prop = 9.81*(self.propeller_mass_VTOL + self.motor_mass_VTOL) - 0.25*mtow
+        V_prop = np.where(y < 0, -F_prop, F_prop)
 
-        V_prop = [F_prop if i < self.y_prop else 0 for i in y]
+        V_left = integrate.cumulative_simpson(total_forces, x=y, axis=-1) - V_prop[..., :-1]
+        V_rev = integrate.cumulative_simpson(W_boom[..., ::-1], x=y, axis=-1) + V_prop[..., ::-1][..., :-1]
+        M_left = integrate.cumulative_simpson(V_left, x=y[:-1], axis=-1)
+        M_rev = integrate.cumulative_simpson(V_rev, x=y[:-1], axis=-1)
 
-        # Distributed lift load from the lift assuming elliptical lift distribution
-        L_y = -self.load_factor*((4*self.mtow) / (np.pi*self.span)) * np.sqrt(1 - ((2*y)/self.span)**2)
-        total_forces = W_batt +L_y + W_wing
-        forces_rev = total_forces[::-1]
+        deflection_left = -(1/(self.E_glass_fibre*I_circle))* integrate.cumulative_simpson(integrate.cumulative_simpson(M_left, x=y[:-2], axis=-1), x=y[:-3], axis=-1)
+        deflection_rev = -(1/(self.E_glass_fibre*I_circle))* integrate.cumulative_simpson(integrate.cumulative_simpson(M_rev, x=y[:-2], axis=-1), x=y[:-3], axis=-1)
 
-        V_rev = integrate.cumulative_simpson(forces_rev, x=y)  + V_prop[::-1][:-1]
-        M_rev = integrate.cumulative_simpson(V_rev, x=y[:-1])
+        return {
+            'y': y,
+            'load': total_forces,
+            'V': np.concatenate((-V_left[..., :half], V_rev[..., ::-1][..., half:]), axis=-1),
+            'M': np.concatenate((-M_left[..., :half], -M_rev[..., ::-1][..., half:]), axis=-1),
+            'deflection': np.concatenate((deflection_rev[..., ::-1][..., half:], deflection_left[..., :half]), axis=-1),
+        }
 
-        V = V_rev[::-1]
-        M = -M_rev[::-1]
-                
-        fig, axs = plt.subplots(3, 1, figsize=(10, 10), sharex=True)
+    def NVM_cruise(self, return_root_values=False, return_max_values=False) -> None:
+        """
+        This function calculates the NVM (Normal, Shear, and Bending Moment) for the UAV wing during cruise flight.
+        It considers the distributed loads from the wing weight, battery weight and lift, and the point loads from the propellers.
+        It then plots the distributed load, shear force, and bending moment along the span of the wing.
+
+        load factor is from the gust loads
+
+        Down is considered positive in this context, as per the provided reference and convention for aircraft coordinate systems.
+
+        The load factor is 1
+        """
+
+        # https://uotechnology.edu.iq/dep-MechanicsandEquipment/Lectures%20and%20Syllabus/Lectures/Aircraft/Foruth%20Grade/Aircraft%20Design3.pdf
+
+        loads = self.wing_load_cases('cruise')
 
         if return_root_values:
-            return total_forces[0], V[0], M[0]
+            return loads['load'][0], loads['V'][0], loads['M'][0]
         elif return_max_values:
-            return max(total_forces), max(V), max(M)
-
-        axs[0].plot(y, total_forces, color='tab:blue', linewidth=2, label="Distributed Load")
-        axs[0].fill_between(y, total_forces, color='tab:blue', alpha=0.3)
-        axs[0].set_ylabel("Distributed Load [N]")
-        axs[0].set_xlabel("Spanwise Position $y$ [m]")
-        axs[0].grid(True)
-
-        axs[1].plot(y[:-1], V, color='tab:orange', linewidth=2, label="Shear Force")
-        axs[1].fill_between(y[:-1], V, color='tab:orange', alpha=0.3)
-        axs[1].set_ylabel("Shear [N]")
-        axs[1].set_xlabel("Spanwise Position $y$ [m]")
-        axs[1].grid(True)
-
-        axs[2].plot(y[:-2], M, color='tab:green', linewidth=2, label="Bending Moment")
-        axs[2].fill_between(y[:-2], M, color='tab:green', alpha=0.3)
-        axs[2].set_ylabel("Moment [N·m]")
-        axs[2].set_xlabel("Spanwise Position $y$ [m]")
-        axs[2].grid(True)
-
-        plt.tight_layout(rect=[0, 0, 1, 0.97])
-        plt.savefig("DetailedDesign/subsystems/Plots/NVM_plot_cruise.png", dpi=300)
-        plt.show()
+            return np.max(loads['load']), np.max(loads['V']), np.max(loads['M'])
 
-        if return_root_values:
-            return total_forces[0], V[0], M[0]
+        plot_NVM(loads, "DetailedDesign/subsystems/Plots/NVM_plot_cruise.png")
     
     def NVM_VTOL(self, return_root_values=False, return_max_values=False) -> None:
         """
@@ -239,69 +416,14 @@ class Structures:
 
         # https://uotechnology.edu.iq/dep-MechanicsandEquipment/Lectures%20and%20Syllabus/Lectures/Aircraft/Foruth%20Grade/Aircraft%20Design3.pdf
 
-        # DOWN IS POSITIVE
-
-        half_span = self.span / 2.0
-        y = np.linspace(0, half_span, 500)  # 0 (root) to b/2 (tip)
-
-        W_batt = np.array([self.mass_battery*9.81 / (self.battery_length) if i < self.battery_length else 0 for i in y])
-
-        # Distributed load from the wing weight
-
-        x_0 = self.mass_wing*9.81 / (half_span*(self.taper_ratio + 0.5*(1-self.taper_ratio)))
-        W_wing = np.array([-(((1-self.taper_ratio)*x_0 / half_span)* i - x_0) for i in y])
-
-        F_gust = -0.5*self.rho_0* self.wind_speed**2 * (self.wing_area / 2)
-        W_gust = np.array([F_gust / self.span for _ in y])
-
-        # Point load from the propellers
-
-        F_prop = 9.81*(2*(self.propeller_mass_VTOL + self.motor_mass_VTOL) + self.VTOL_boom_mass) - 0.5*self.mtow
-
-
-        V_prop = [F_prop if i < self.y_prop else 0 for i in y]
-
-        total_forces = W_wing + W_batt + W_gust
-        forces_rev = total_forces[::-1]
-
-        # V = integrate.cumulative_simpson(total_forces, x=y)
-        # M = integrate.cumulative_simpson(V, x=y[:-1])
-
-        V_rev = integrate.cumulative_simpson(forces_rev, x=y)  + V_prop[::-1][:-1]
-        # V_rev = V_prop[::-1][:-1]
-        M_rev = integrate.cumulative_simpson(V_rev, x=y[:-1])
-
-        V = V_rev[::-1]
-        M = -M_rev[::-1]
-                
-        fig, axs = plt.subplots(3, 1, figsize=(10, 10), sharex=True)
+        loads = self.wing_load_cases('VTOL')
 
         if return_root_values:
-            return total_forces[0], V[0], M[0]
+            return loads['load'][0], loads['V'][0], loads['M'][0]
         elif return_max_values:
-            return max(total_forces), max(V), max(M)
-
-        axs[0].plot(y, total_forces, color='tab:blue', linewidth=2, label="Distributed Load")
-        axs[0].fill_between(y, total_forces, color='tab:blue', alpha=0.3)
-        axs[0].set_ylabel("Distributed Load [N]")
-        axs[0].set_xlabel("Spanwise Position $y$ [m]")
-        axs[0].grid(True)
-
-        axs[1].plot(y[:-1], V, color='tab:orange', linewidth=2, label="Shear Force")
-        axs[1].fill_between(y[:-1], V, color='tab:orange', alpha=0.3)
-        axs[1].set_ylabel("Shear [N]")
-        axs[1].set_xlabel("Spanwise Position $y$ [m]")
-        axs[1].grid(True)
-
-        axs[2].plot(y[:-2], M, color='tab:green', linewidth=2, label="Bending Moment")
-        axs[2].fill_between(y[:-2], M, color='tab:green', alpha=0.3)
-        axs[2].set_ylabel("Moment [N·m]")
-        axs[2].set_xlabel("Spanwise Position $y$ [m]")
-        axs[2].grid(True)
-
-        plt.tight_layout(rect=[0, 0, 1, 0.97])
-        plt.savefig("DetailedDesign/subsystems/Plots/NVM_plot_hover.png", dpi=300)
-        plt.show()
+            return np.max(loads['load']), np.max(loads['V']), np.max(loads['M'])
+
+        plot_NVM(loads, "DetailedDesign/subsystems/Plots/NVM_plot_hover.png")
 
     def NVM_propeller_boom(self, size_thickness = False) -> float | None:
         """
@@ -314,85 +436,30 @@ class Structures:
 
         # https://uotechnology.edu.iq/dep-MechanicsandEquipment/Lectures%20and%20Syllabus/Lectures/Aircraft/Foruth%20Grade/Aircraft%20Design3.pdf
 
-        # DOWN IS POSITIVE
-        y = np.linspace(-0.5*self.VTOL_boom_length, 0.5*self.VTOL_boom_length, 500)
-
-        # Distributed load from the boom weight
-
-        I_circle = (np.pi / 4)* ((self.boom_inner_diameter/2+self.VTOL_boom_thickness)**4 - (self.boom_inner_diameter/2)**4)
-        boom_weight = (0.5*self.VTOL_boom_thickness)**2 * np.pi * self.VTOL_boom_length * self.density_glass_fibre *9.81
-        #print('boom_mass', boom_weight / 9.81)
-        W_boom = np.array([boom_weight / self.VTOL_boom_length for _ in y])
-
-        F_gust = -0.5*self.rho_0* self.wind_speed**2 * (self.boom_inner_diameter + 2*self.VTOL_boom_thickness / 2)
-        W_gust = np.array([F_gust / self.VTOL_boom_length for _ in y])
-
-        # Point load from the propeller
-
-        F_prop = 9.81*(self.propeller_mass_VTOL + self.motor_mass_VTOL) - 0.25*self.mtow
-        V_prop = [-F_prop if i < 0 else F_prop for i in y]
-
-        total_forces = W_boom + W_gust
-        forces_rev = W_boom[::-1]
-
-        V_left = integrate.cumulative_simpson(total_forces, x=y) - V_prop[:-1]
-
-        V_rev = integrate.cumulative_simpson(forces_rev, x=y) + V_prop[::-1][:-1]
-        V = np.concatenate((-V_left[:len(y)//2], V_rev[::-1][len(y)//2:]))
-
-        M_left = integrate.cumulative_simpson(V_left, x=y[:-1])  
-        M_rev = integrate.cumulative_simpson(V_rev, x=y[:-1])
-
-        M = np.concatenate((-M_left[:len(y)//2], -M_rev[::-1][len(y)//2:]))
-
-        deflection_left = -(1/(self.E_glass_fibre*I_circle))* integrate.cumulative_simpson(integrate.cumulative_simpson(M_left, x=y[:-2]), x=y[:-3])
-        deflection_rev = -(1/(self.E_glass_fibre*I_circle))* integrate.cumulative_simpson(integrate.cumulative_simpson(M_rev, x=y[:-2]), x=y[:-3])
-
-        deflection = np.concatenate((deflection_rev[::-1][len(y)//2:], deflection_left[:len(y)//2]))
+        loads = self.boom_load_cases()
 
         if size_thickness:
-            return max(deflection)
-    
+            return np.max(loads['deflection'])
 
-        fig, axs = plt.subplots(3, 1, figsize=(10, 10), sharex=True)
-
-        axs[0].plot(y, total_forces, color='tab:blue', linewidth=2, label="Distributed Load")
-        axs[0].fill_between(y, total_forces, color='tab:blue', alpha=0.3)
-        axs[0].set_ylabel("Distributed Load [N/m]")
-        axs[0].set_xlabel("Spanwise Position $x$ [m]")
-        axs[0].grid(True)
-
-        axs[1].plot(y[:-1], V, color='tab:orange', linewidth=2, label="Shear Force")
-        axs[1].fill_between(y[:-1], V, color='tab:orange', alpha=0.3)
-        axs[1].set_ylabel("Shear [N]")
-        axs[1].set_xlabel("Spanwise Position $x$ [m]")
-        axs[1].grid(True)
-
-        axs[2].plot(y[:-2], M, color='tab:green', linewidth=2, label="Bending Moment")
-        axs[2].fill_between(y[:-2], M, color='tab:green', alpha=0.3)
-        axs[2].set_ylabel("Moment [N·m]")
-        axs[2].set_xlabel("Spanwise Position $x$ [m]")
-        axs[2].grid(True)
-
-        # axs[3].plot(y[:len(deflection)], deflection, color='tab:pink', linewidth=2, label="Bending Moment")
-        # axs[3].fill_between(y[:len(deflection)], deflection, color='tab:pink', alpha=0.3)
-        # axs[3].set_ylabel("deflection [m]")
-        # axs[3].set_xlabel("Spanwise Position $y$ (m)")
-        # axs[3].grid(True)
-
-        plt.tight_layout(rect=[0, 0, 1, 0.97])
-        plt.savefig("DetailedDesign/subsystems/Plots/NVM_plot_propeller_boom.png", dpi=300)
-        plt.show()
+        plot_NVM(loads, "DetailedDesign/subsystems/Plots/NVM_plot_propeller_boom.png", x_label="Spanwise Position $x$ [m]", load_unit="[N/m]")
 
         return None
     
-    def determine_VTOL_boom_thickness(self) -> float:
+    def determine_VTOL_boom_thickness(self, chunk_size: int = 32) -> float:
+        '''
+        Thinnest boom wall (of 1000 candidates) whose maximum deflection stays within the allowed deflection. The
+        candidates are evaluated as batches of load cases, thinnest first, until one of them is feasible.
+        '''
         t_range = np.linspace(0.0001, 0.05, 1000)
-        for t in t_range:
-            self.VTOL_boom_thickness = t
-            deflection = self.NVM_propeller_boom(size_thickness=True)
-            if deflection <= self.max_deflection_VTOL_boom:
+        for start in range(0, len(t_range), chunk_size):
+            t_chunk = t_range[start:start + chunk_size]
+            deflection = np.max(self.boom_load_cases(thickness=t_chunk)['deflection'], axis=-1)
+            feasible = np.flatnonzero(deflection <= self.max_deflection_VTOL_boom)
+            if feasible.size:
+                t = t_chunk[feasible[0]]
+                self.VTOL_boom_thickness = t
                 return round(t, 5)*1.5 #rounded to half a mm, 1.5 safety factor
+        self.VTOL_boom_thickness = t_range[-1]
         return None
     
     def determine_fuselage_thickness(self) -> float:
@@ -437,33 +504,7 @@ class Structures:
         return 
 
     def get_airfoil_coordinates(self): 
-        with open("DetailedDesign\data\e1212_Lednicer.DAT", 'r') as f:
-            lines = f.readlines()[2:]  # Skips the first two lines
-        # Process coordinates
-        coords = []
-        for line in lines:
-            line = line.strip()
-            if line == "":
-                coords.append("BREAK")  # Mark the break between upper and lower surfaces
-                continue
-            parts = line.split()
-            if len(parts) == 2:
-                coords.append((float(parts[0]), float(parts[1])))
-
-        # Split at "BREAK"
-        if "BREAK" in coords:
-            break_index = coords.index("BREAK")
-            upper = coords[:break_index]
-            lower = coords[break_index + 1:]
-        else:
-            # Fallback: Find second occurrence of (0.0, 0.0)
-            zero_index = [i for i, p in enumerate(coords) if p == (0.0, 0.0)]
-            if len(zero_index) > 1:
-                break_index = zero_index[1]
-                upper = coords[:break_index]
-                lower = coords[break_index:]
-            else:
-                raise ValueError("Could not split upper and lower surfaces.")
+        upper, lower = load_airfoil()
 
         # Convert to DataFrames
         upper_df = pd.DataFrame(upper, columns=["x", "y"])
@@ -471,73 +512,21 @@ class Structures:
 
         return upper_df, lower_df 
 
-    def moment_intertia(self,t): 
-        upper_df, lower_df = self.get_airfoil_coordinates() 
-        upper_df = upper_df.multiply(self.root_chord)
-        lower_df = lower_df.multiply(self.root_chord)
-
-        #moment of intertia for upper boom 
-        x_upper = upper_df['x'].values
-        y_upper = upper_df['y'].values
-
-        dy_dx_upper = np.gradient(y_upper, x_upper)  # Central differences
-        integrand_upper = y_upper **2 * np.sqrt(1 + dy_dx_upper**2)
-        I_upper = t* sp.integrate.simps(integrand_upper, x_upper)
-
-        #moment of intertia for lower boom 
-        x_lower = lower_df['x'].values
-        y_lower = lower_df['y'].values
-
-        dy_dx_lower = np.gradient(y_lower, x_lower)  # Central differences
-        integrand_lower = y_lower **2 * np.sqrt(1 + dy_dx_lower**2)
-        I_lower = t* sp.integrate.simps(integrand_lower, x_lower)
-
-        #moment of intertia for front spar 
-        top_of_front_spar = np.interp(self.first_spar_position, upper_df["x"], upper_df["y"] ) 
-        bottom_of_front_spar = np.interp(self.first_spar_position, lower_df["x"], lower_df["y"] )
-        front_spar_length = top_of_front_spar - bottom_of_front_spar
-        I_front_spar = t * front_spar_length **3/12 + t * front_spar_length * (bottom_of_front_spar + front_spar_length/2)
-
-        #moment of intertia for end spar 
-        top_of_end_spar = np.interp(self.second_spar_position, upper_df["x"], upper_df["y"] ) 
-        bottom_of_end_spar = np.interp(self.second_spar_position, lower_df["x"], lower_df["y"] )
-        end_spar_length = top_of_end_spar - bottom_of_end_spar
-        I_end_spar = t * end_spar_length **3/12 + t * end_spar_length * (bottom_of_end_spar + end_spar_length/2)
+    @property
+    def section(self) -> dict[str, float]:
+        '''
+        Thickness independent section properties of the wing box, computed once per chord and spar positions
+        '''
+        return section_integrals(self.root_chord, self.first_spar_position, self.second_spar_position)
 
-        I = I_upper + I_lower + I_front_spar + I_end_spar
+    def moment_intertia(self,t): 
+        section = self.section
+        I = t * section['I_per_t']
 
-        return I, top_of_front_spar
+        return I, section['top_of_front_spar']
 
     def first_moment_of_intertia(self,t): 
-        upper_df, lower_df = self.get_airfoil_coordinates() 
-        upper_df = upper_df.multiply(self.root_chord)
-        lower_df = lower_df.multiply(self.root_chord)
-
-        # cutting the skin at the spar positions for the length
-
-        upper_df_skin = upper_df.query('x >= @first_spar_position and x <= @second_spar_position ')
-        lower_df_skin = lower_df.query('x >= @first_spar_position and x <= @second_spar_position ')
-
-        #moment of intertia for front spar 
-        top_of_front_spar = np.interp(self.first_spar_position, upper_df["x"], upper_df["y"] ) 
-        bottom_of_front_spar = np.interp(self.first_spar_position, lower_df["x"], lower_df["y"] )
-        front_spar_length = top_of_front_spar - bottom_of_front_spar
-
-        #moment of intertia for end spar 
-        top_of_end_spar = np.interp(self.second_spar_position, upper_df["x"], upper_df["y"] ) 
-        bottom_of_end_spar = np.interp(self.second_spar_position, lower_df["x"], lower_df["y"] )
-        end_spar_length = top_of_end_spar - bottom_of_end_spar
-
-        #length of upper and lower 
-        length_upper = np.sum(np.sqrt(np.diff(upper_df_skin['x'])**2 + np.diff(upper_df_skin['y'])**2))
-        length_lower = np.sum(np.sqrt(np.diff(lower_df_skin['x'])**2 + np.diff(lower_df_skin['y'])**2))
-
-        Q_front_spar = t * front_spar_length/2 * ( bottom_of_front_spar + front_spar_length/2 + front_spar_length/4)
-        Q_end_spar = t * end_spar_length/2 * ( bottom_of_end_spar + end_spar_length/2 + end_spar_length/4)
-        Q_upper = t * length_upper * (top_of_front_spar - top_of_end_spar)
-        Q_lower = t * length_lower * (bottom_of_front_spar - bottom_of_end_spar)
-
-        Q = Q_front_spar + Q_end_spar + Q_upper + Q_lower
+        Q = t * self.section['Q_per_t']
 
         return Q
 
@@ -561,72 +550,50 @@ class Structures:
         motor_mass = 0.825
         l_boom_placement = 0.0380
         torsion = 9.81 * (prop_mass+motor_mass) * l_boom_placement
-        upper_df, lower_df = self.get_airfoil_coordinates() 
-        upper_df = upper_df.multiply(self.root_chord)
-        lower_df = lower_df.multiply(self.root_chord)
-
-        #calculating the area 
-        x_interp = np.linspace(self.first_spar_position,self.second_spar_position, 300)
-        y_upper_interp = np.interp(x_interp, upper_df["x"], upper_df["y"])
-        y_lower_interp = np.interp(x_interp, lower_df["x"], lower_df["y"])
 
-        total_area = np.trapz(y_upper_interp - y_lower_interp,x_interp)
-
-        torsion_stress = torsion / (2*t*total_area)
+        torsion_stress = torsion / (2*t*self.section['enclosed_area'])
                             
         return torsion_stress
 
-    def skin_buckling(self,b): 
-        t_ribs = 0.001
-        k_c = 0.5 
-        D = 70 * 10**9
+    def skin_buckling(self, b, t):
+        '''
+        Compressive buckling stress of the aluminium skin panel of thickness t between two ribs a distance b apart
+        (flat plate, sigma_cr = k_c * pi^2 * E / (12 (1 - nu^2)) * (t / b)^2)
+        '''
+        k_c = 0.5
 
-        buckling_stress = k_c * np.pi **2 * D * (t_ribs)/ b**2 
+        buckling_stress = k_c * np.pi**2 * self.E_alu / (12 * (1 - self.poisson_alu**2)) * (t / b)**2
         return buckling_stress
 
     def thickness(self): 
-        bending_stress = 1200000
+        '''
+        Smallest skin thickness for which the bending, shear and torsion stresses stay below the allowable stress
+        divided by the safety factor, within [t_min, t_max]
+        '''
         safety_factor = 2 
         yield_strength = 10**6 #[pa]
-        t = np.linspace(0.00001,0.100, 100000)
-        #while bending_stress > yield_strength * 1/safety_factor : 
-        for i in t : 
-            t_final_bending = i 
-            bending_stress = self.normal_stress(i)
-            if abs(bending_stress) < abs(yield_strength) * 1/safety_factor: 
-                break 
-
-        shear_stress = 1200000
         max_shear_stress = 10**6 
-        for i in t: 
-            t_final_shear = i 
-            shear_stress = self.shear_stress_calc(i)
-            #print("shear stress:", shear_stress)
-            if abs(shear_stress)< abs(max_shear_stress) * 1/safety_factor: 
-                break 
-
-        torsion_stress = 1200000
         max_torsion_stress = 10**6 
-        for i in t: 
-            t_final_torsion = i 
-            torsion_stress = self.torsion_stress_calc(i)
-            if abs(torsion_stress)< abs(max_torsion_stress) * 1/safety_factor: 
-                break 
+
+        t_final_bending = required_thickness(self.normal_stress, yield_strength / safety_factor)
+        t_final_shear = required_thickness(self.shear_stress_calc, max_shear_stress / safety_factor)
+        t_final_torsion = required_thickness(self.torsion_stress_calc, max_torsion_stress / safety_factor)
 
         return t_final_bending, t_final_shear, t_final_torsion
 
-    def rib_placement_calc(self): 
-        buckling_stress = 12000
+    def rib_placement_calc(self, t=None):
+        '''
+        Largest rib spacing for which the buckling stress of the skin (thickness t, by default the thickness that
+        meets all stress limits) stays above the yield strength times the safety factor. The buckling stress scales
+        with 1/b^2, so the spacing follows directly, limited to 2 m.
+        '''
         yield_strength = 10**6 #[pa]
         safety_factor = 2
-        b = np.linspace(0,2, 100) #[m]
-        #while bending_stress > yield_strength * 1/safety_factor : 
-        for i in b : 
-            rib_placement = i 
-            buckling_stress = self.skin_buckling(i)
-            if abs(buckling_stress) > abs(yield_strength) * safety_factor: 
-                break 
-        return rib_placement
+        b_max = 2 #[m]
+
+        t = max(self.thickness()) if t is None else t
+        rib_placement = np.sqrt(self.skin_buckling(1., t) / (abs(yield_strength) * safety_factor))
+        return float(min(rib_placement, b_max))
     
 
     def FEM_sensitivity_plots(self):
@@ -678,7 +645,7 @@ class Structures:
         self.mass_fractions()
         self.calc_structure_mass()
         t_final_bending, t_final_shear, t_final_torsion= self.thickness()
-        rib_placement = self.rib_placement_calc()
+        rib_placement = self.rib_placement_calc(max(t_final_bending, t_final_shear, t_final_torsion))
 
         self.outputs["payload_mass"] = self.mass_payload   # updated mass of the payload (with an added margin to avoid exceeding the MTOW requirement)
         self.outputs['mass_structure'] = self.mass_structure # kg
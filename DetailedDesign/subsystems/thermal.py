@@ -10,9 +10,9 @@ from scipy.optimize import minimize
 from DetailedDesign.funny_inputs import funny_inputs
 from DetailedDesign.inputs import inputs
 from DetailedDesign.hardware_inputs import components
-from power import Power
-from propulsion import Propulsion
-from constraints import Constraints
+from DetailedDesign.subsystems.power import Power
+from DetailedDesign.subsystems.propulsion import Propulsion
+from DetailedDesign.subsystems.constraints import Constraints
 from DetailedDesign.mission import Mission
 from DetailedDesign.deployment import Deployment 
 from DetailedDesign.hardware import Hardware
@@ -92,6 +92,13 @@ class Thermal:
         self.T_amb_enroute = inputs["T_amb_enroute"]
         self.T_int = inputs["T_int"]
 
+        # Caches: the phase heat budget per design state and the last evaluated design vector
+        self._heat_budget_key = None
+        self._heat_budget = None
+        self._last_x = None
+        self._last_evaluation = None
+        self.n_simulations = 0
+
     # ~~~ Intermediate Functions ~~~
 
     def create_R_value(self, insulation_thickness: float) -> float:
@@ -101,7 +108,6 @@ class Thermal:
         R_total_wing = (1 * (self.thickness_alu_wing / self.conductivity_alu)) + (insulation_thickness / self.conductivity_insulation) + R_convection # + (self.thickness_foam_wing / self.conductivity_foam) # K/W
         R_total_fuselage = (1 * self.thickness_alu_fuselage / self.conductivity_alu) + (insulation_thickness / self.conductivity_insulation) + R_convection # (self.thickness_foam_fuselage / self.conductivity_foam) # K/W
         
-        print('R_total_wing:',R_total_wing,'\n R_total_fuselage:', R_total_fuselage)
         return R_total_fuselage, R_total_wing
 
     def Q_env_leak(self, time: float, T_amb: float, insulation_thickness: float) -> float:
@@ -235,7 +241,6 @@ class Thermal:
         V_air_over_sink = self.V_cruise - self.wind_speed
         Re = (V_air_over_sink * sink_length) / self.nu # Reynold number
         Nusselt = 0.0296 * Re**0.8 * self.Prandtl**(1/3) # Nusselt number for turbulent air over flat plate
-        print('Nuss:', Nusselt)
         # Convection coefficient per area 
         # convection_coeff1 = 1.42 * ((self.T_equi_pcm - self.T_amb_enroute) / sink_length)**0.25 # W/(m^2 K), for area1 
         # convection_coeff2 = 1.31 * (self.k_air / fin_spacing_opt) # W/(m^2 K), for area2
@@ -265,10 +270,29 @@ class Thermal:
 
         return fin_spacing_opt, n_fin, total_heat_dissipated_sink
     
-    def simulate(self, x) -> float:
+    def heat_budget(self) -> dict[str, float]:
+        '''
+        The internal heat energy on site and on the return, from create_heat_dissipated. It does not depend on the
+        design vector, so it is computed once and only recomputed when one of the phase powers or times changes.
+        '''
+        key = (self.power_required_VTOL, self.power_required_cruise, self.power_required_hover, self.power_deployment,
+               self.power_required_winch, self.time_ascent, self.time_descent, self.time_cruise_max, self.time_cruise_min,
+               self.time_scan, self.time_deploy, self.n_battery, self.battery_potential, self.battery_resistance,
+               self.winch_eff, self.processor_heat_diss)
+        if key != self._heat_budget_key:
+            all_heat = self.create_heat_dissipated()
+            self._heat_budget = {
+                'Q_int_onsite': sum([all_heat[ph]['phase_Q'] for ph in ['scan', 'descend', 'deploy', 'ascend']]),
+                'Q_int_return': sum([all_heat[ph]['phase_Q'] for ph in ['cruise_min', 'descend']]),
+            }
+            self._heat_budget_key = key
+        return self._heat_budget
+
+    def simulate(self, x, verbose: bool = False) -> float:
         
         sink_length, sink_width, insulation_thickness = x
-        all_heat = self.create_heat_dissipated()
+        budget = self.heat_budget()
+        self.n_simulations += 1
         
         # Times
         time_onsite = self.time_scan + self.time_descent + self.time_deploy + self.time_ascent
@@ -280,18 +304,13 @@ class Thermal:
         # heat_env_approach, Q_env_approach = self.Q_env_leak(time_approach, self.T_amb_enroute, insulation_thickness) # W, J, same as return if time_ascent = time_descent
         heat_env_return, Q_env_return = self.Q_env_leak(time_return, self.T_amb_enroute, insulation_thickness=insulation_thickness) # W, J 
 
-        # Heat and heat energy entering due to internal components 
-        # heat_int_approach = sum([all_heat[ph]['phase_heat'] for ph in ['ascend', 'cruise_min']])
-        # heat_int_return = sum([all_heat[ph]['phase_heat'] for ph in ['cruise_min', 'descend']])
-
-        Q_int_onsite = sum([all_heat[ph]['phase_Q'] for ph in ['scan', 'descend', 'deploy', 'ascend']])
-        # Q_int_approach = sum([all_heat[ph]['phase_Q'] for ph in ['ascend', 'cruise_min']])
-        Q_int_return = sum([all_heat[ph]['phase_Q'] for ph in ['cruise_min', 'descend']])
+        # Heat energy entering due to internal components 
+        Q_int_onsite = budget['Q_int_onsite']
+        Q_int_return = budget['Q_int_return']
 
         # Total heat and heat energy produced 
         total_Q_onsite = Q_int_onsite + Q_env_onsite
         total_Q_return = Q_int_return + Q_env_return + total_Q_onsite # Total heat produced on the return 
-        # total_heat_return = heat_int_return + heat_env_return + (total_Q_onsite / time_return)
         heat_dissipated_req_sink = total_Q_return / (time_return + self.time_turnaround_min + self.sink_time_margin)
 
         # Return time margin
@@ -312,23 +331,91 @@ class Thermal:
         total_mass = insulation_mass + pcm_mass + sink_mass
 
         # Test prints
-        print('battery_deploy_heat:', self.battery_heat_dissipated(self.power_required_cruise, self.time_cruise_max))
-        print('pcm_mass:', pcm_mass, '\n sink_mass:', sink_mass, '\n insulation_mass:', insulation_mass)
-        # print('sink_width:', sink_width, '\n sink_length:', sink_length, '\n sink_height:', self.sink_height, '\n: sink_base', self.sink_base, '\n n_fin:', n_fin, '\n: fin_spacing_opt', fin_spacing_opt)
-        # print('time_onsite:', time_onsite, '\ntime_return:', time_return, '\ntime_turnaround_min:', self.time_turnaround_min,'\nQ_int_onsite:' , Q_int_onsite, '\nQ_env_onsite:', Q_env_onsite, '\nQ_int_return:', Q_int_return, '\nQ_env_return:', Q_env_return, '\ntotal_heat_dissipated_sink:', total_heat_dissipated_sink, '\nheat_env_onsite:', heat_env_onsite )
+        if verbose:
+            print('battery_deploy_heat:', self.battery_heat_dissipated(self.power_required_cruise, self.time_cruise_max))
+            print('pcm_mass:', pcm_mass, '\n sink_mass:', sink_mass, '\n insulation_mass:', insulation_mass)
+            print('total_heat_dissipated_sink:', total_heat_dissipated_sink, '\nheat_dissipated_req_sink:', heat_dissipated_req_sink)
 
         return total_mass, total_heat_dissipated_sink, heat_dissipated_req_sink
-    
+
+    def gradients(self, x) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Analytic gradients of the total mass and of the heat sink margin (the constraint) w.r.t. x = (sink_length,
+        sink_width, insulation_thickness), the derivatives of the expressions in simulate and heat_dissipated_sink.
+        '''
+        sink_length, sink_width, insulation_thickness = x
+        H, b, th = self.sink_height, self.sink_base, self.sink_thickness
+        dT, dT4 = self.T_equi_pcm - self.T_amb_enroute, self.T_equi_pcm**4 - self.T_amb_enroute**4
+        time_onsite = self.time_scan + self.time_descent + self.time_deploy + self.time_ascent
+        time_return = self.time_cruise_min + self.time_descent
+
+        # Insulation: d(1/R)/dt = -1 / (k R^2) for both shells
+        R_total_fuselage, R_total_wing = self.create_R_value(insulation_thickness)
+        d_leak = -(self.wing_eff_area / R_total_wing**2 + self.fuselage_eff_area / R_total_fuselage**2) / self.conductivity_insulation
+        dQ_env_onsite = (self.T_amb_onsite - self.T_int) * time_onsite * d_leak
+        dQ_env_return = (self.T_amb_enroute - self.T_int) * time_return * d_leak
+        dmass_dt = (self.wing_eff_area + self.fuselage_eff_area) * self.insulation_density + dQ_env_onsite / self.pcm_latent_heat
+        dreq_dt = (dQ_env_return + dQ_env_onsite) / (time_return + self.time_turnaround_min + self.sink_time_margin)
+
+        # Fin spacing and number of fins: s ~ L^(1/4), n = (W + s) / (th + s)
+        fin_spacing_opt, n_fin, _ = self.heat_dissipated_sink(sink_length, sink_width)
+        ds = fin_spacing_opt / (4 * sink_length)
+        dn_dW = 1 / (th + fin_spacing_opt)
+        dn_dL = (th - sink_width) / (th + fin_spacing_opt)**2 * ds
+
+        # Heat sink mass
+        dsink_dL = (sink_width * H - (H - b) * (dn_dL * fin_spacing_opt * sink_length + (n_fin - 1) * (ds * sink_length + fin_spacing_opt))) * self.sink_density
+        dsink_dW = (sink_length * H - dn_dW * fin_spacing_opt * sink_length * (H - b)) * self.sink_density
+
+        # Heat sink dissipation: h ~ Re^0.8 / L ~ L^(-0.2)
+        Re = ((self.V_cruise - self.wind_speed) * sink_length) / self.nu
+        h = 0.0296 * Re**0.8 * self.Prandtl**(1/3) * self.k_air / sink_length
+        dh = -0.2 * h / sink_length
+        sink_area1 = H * sink_length + th * (2 * H + sink_length)
+        sink_area2 = sink_length * (2 * (H - b) + fin_spacing_opt) + 2 * (th * H + fin_spacing_opt * b) + th * sink_length
+        sink_area3 = sink_length * (th * fin_spacing_opt) + 2 * (th * H + fin_spacing_opt * b)
+        d_area1 = H + th
+        d_area2 = 2 * (H - b) + fin_spacing_opt + sink_length * ds + 2 * b * ds + th
+        d_area3 = th * fin_spacing_opt + sink_length * th * ds + 2 * b * ds
+        per_fin_gap = h * sink_area2 * dT + self.epsilon * self.sigma * sink_area3 * dT4
+        d_fixed = 2 * dT * (dh * sink_area1 + h * d_area1) + 2 * self.epsilon * self.sigma * dT4 * d_area1
+        d_per_fin_gap = dT * (dh * sink_area2 + h * d_area2) + self.epsilon * self.sigma * dT4 * d_area3
+        dsink_heat_dL = d_fixed + d_per_fin_gap * n_fin + per_fin_gap * dn_dL
+        dsink_heat_dW = per_fin_gap * dn_dW
+
+        mass_gradient = np.array([dsink_dL, dsink_dW, dmass_dt])
+        constraint_gradient = np.array([dsink_heat_dL, dsink_heat_dW, -dreq_dt])
+        return mass_gradient, constraint_gradient
+
+    def evaluate(self, x) -> dict[str, float | np.ndarray]:
+        '''
+        Fused, silent evaluation of the objective, the constraint and their gradients. SLSQP asks for these at the
+        same design vector one after the other, so the last result is reused until x changes.
+        '''
+        x = np.asarray(x, dtype=float)
+        if self._last_x is None or not np.array_equal(x, self._last_x):
+            total_mass, total_heat_dissipated_sink, heat_dissipated_req_sink = self.simulate(x)
+            mass_gradient, constraint_gradient = self.gradients(x)
+            self._last_evaluation = {
+                'total_mass': total_mass,
+                'constraint': total_heat_dissipated_sink - heat_dissipated_req_sink,
+                'mass_gradient': mass_gradient,
+                'constraint_gradient': constraint_gradient,
+            }
+            self._last_x = x.copy()
+        return self._last_evaluation
+
     def objective(self, x) -> float:
-        total_mass, _, _ = self.simulate(x)
-        
-        return total_mass
+        return self.evaluate(x)['total_mass']
+
+    def objective_jac(self, x) -> np.ndarray:
+        return self.evaluate(x)['mass_gradient']
 
     def constraint(self, x) -> float:
-        _, total_heat_dissipated_sink, heat_dissipated_req_sink = self.simulate(x)
-        
-        print('total_heat_dissipated_sink:', total_heat_dissipated_sink, '\nheat_dissipated_req_sink:', heat_dissipated_req_sink)
-        return total_heat_dissipated_sink - heat_dissipated_req_sink
+        return self.evaluate(x)['constraint']
+
+    def constraint_jac(self, x) -> np.ndarray:
+        return self.evaluate(x)['constraint_gradient']
 
     def optimize(self):
         '''
@@ -336,9 +423,9 @@ class Thermal:
         '''
         x0 = [0.100, 0.500, 0.0500] # initial: sink_length (m), sink_width (m), insulation_thickness (m)
         bounds = [(0.1, 0.45), (0.01, 1.), (0.001, 0.03)]  # sink_length (m), sink_width (m)), insulation_thickness (m)
-        constraints = {'type': 'ineq', 'fun': self.constraint}
+        constraints = {'type': 'ineq', 'fun': self.constraint, 'jac': self.constraint_jac}
         
-        total_mass_result =  minimize(self.objective, x0=x0, bounds=bounds, constraints=constraints, method="SLSQP")
+        total_mass_result =  minimize(self.objective, x0=x0, jac=self.objective_jac, bounds=bounds, constraints=constraints, method="SLSQP")
         
         return total_mass_result
     
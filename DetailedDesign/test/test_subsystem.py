@@ -5,8 +5,14 @@ import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import math
+import numpy as np
 from DetailedDesign.deployment import Deployment
+from DetailedDesign.mission import Mission, MissionBatch
+from DetailedDesign.simulation import MissionSimulation
+from DetailedDesign.inputs import initial_inputs
 
 from test_inputs import test_inputs, deployment_test_inputs
 
@@ -27,7 +33,7 @@ def test_Deployment():
 
     assert {'aerogel_mass': 3., 
             'aerogel_length': 4., 
-            'aerogel_diameter': 0.15959254850813723, 
+            'aerogel_diameter': 0.15957383356102933, 
             'total_deployment_power': 180.0, 
             'total_deployment_energy': 13640.0, 
             'deployment_system_mass': 7.26, 
@@ -36,6 +42,64 @@ def test_Deployment():
 def test_Operations():
     assert 1==1
 
+def test_Operations_batch():
+    # Every grid point of the batch should match a separately constructed Mission
+    ranges = np.array([10000., 20000.])
+    workers = np.array([2, 4, 6])
+    uavs = np.array([10, 20, 47])
+    containers = np.array([1, 3, 5])
+
+    for mission_type in ['wildfire', 'oil_spill']:
+        inputs = dict(initial_inputs, mission_type=mission_type)
+        res = MissionBatch(inputs, R_max=ranges[:, None, None], number_of_workers=workers[None, :, None],
+                           number_of_UAVs=uavs[None, None, :], number_of_containers=containers[None, None, :]).get_all()
+        assert res['total_mission_time'].shape == (2, 3, 3)
+
+        for i, r in enumerate(ranges):
+            for j, w in enumerate(workers):
+                for k, (u, c) in enumerate(zip(uavs, containers)):
+                    mis = Mission(dict(inputs, R_max=r, number_of_workers=w, number_of_UAVs=u, number_of_containers=c))
+                    mis.calc_total_mission_time()
+                    assert math.isclose(mis.time_preparation, res['time_preparation'][i, j, k])
+                    assert math.isclose(mis.time_operation, res['time_operation'][i, j, k])
+                    assert math.isclose(mis.total_mission_time, res['total_mission_time'][i, j, k])
+
+    # The sortie time can be asked for on its own, without the preparation time first
+    batch = MissionBatch(initial_inputs, R_max=ranges, number_of_workers=4)
+    batch.uav_mission_time()
+    for i, r in enumerate(ranges):
+        mis = Mission(dict(initial_inputs, R_max=r, number_of_workers=4))
+        mis.uav_mission_time()
+        assert math.isclose(mis.time_uav, batch.time_uav[i])
+
+def test_Operations_simulation():
+    # A single UAV flying 3 sorties: nest setup, UAV setup, 3 sorties and 2 turnarounds in series
+    inputs = dict(initial_inputs, mission_type='oil_spill', oil_mass=3 * 14 * 3., number_of_UAVs=1, number_of_workers=2)
+    sim = MissionSimulation(inputs)
+    res = sim.get_all()
+
+    assert res['sim_sorties'] == sim.num_trips == 3
+    expected = (sim.time_nest_setup + sim.time_uav_setup + 3 * sim.time_sortie_max
+                + 2 * (sim.time_service + sim.time_replace_battery))
+    assert math.isclose(res['sim_makespan'], expected)
+    assert res['sim_turnaround_wait_max'] == 0.
+
+    # Full size mission: all aerogels are deployed, limited batteries can only slow the mission down
+    inputs = dict(initial_inputs, number_of_workers=4)
+    unlimited = MissionSimulation(inputs).simulate()
+    limited = MissionSimulation(inputs, spare_batteries=5, time_battery_charge=1800.).simulate()
+    staggered = MissionSimulation(inputs, staggered_returns=True, seed=1).simulate()
+
+    mission = Mission(inputs)
+    mission.calc_total_mission_time()
+    assert unlimited['sim_sorties'] == limited['sim_sorties'] == mission.num_trips
+    assert math.isclose(unlimited['sim_makespan'], mission.total_mission_time, rel_tol=0.1)
+    assert limited['sim_makespan'] >= unlimited['sim_makespan']
+    assert limited['sim_battery_wait_max'] > 0
+    assert staggered['sim_makespan'] <= unlimited['sim_makespan']
+    assert 0 < unlimited['sim_worker_utilisation'] <= 1
+    assert 0 < unlimited['sim_uav_utilisation'] <= 1
+
 def test_PropnPow():
     assert 1==1
 
@@ -5,12 +5,24 @@ This is the unit test file, these only test small parts of the code, like indivi
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import math 
-from DetailedDesign.deployment import Deployment
+import pytest
+import numpy as np
+from DetailedDesign.deployment import Deployment, compute_outer_diameter, aerogel_sizing
+from DetailedDesign.mission import launch_time
+from DetailedDesign.UAV import UAV
+from DetailedDesign.design_state import DesignState
+from DetailedDesign.inputs import initial_inputs
 from DetailedDesign.subsystems.propulsion import Propulsion
 from DetailedDesign.subsystems.constraints import Constraints
-from DetailedDesign.subsystems.structures import Structures
+from DetailedDesign.subsystems.stab_n_con import StabCon
+from DetailedDesign.subsystems.dynamic_stability import DynamicStability, longitudinal_modes, lateral_modes, handling_quality_margins
+from DetailedDesign.subsystems.cg_envelope import CGEnvelope, cg_tracks, scissor_coefficients, wing_position_window
+from DetailedDesign.subsystems.thermal import Thermal
+from DetailedDesign.subsystems.structures import Structures, load_airfoil, section_integrals, required_thickness
+from DetailedDesign.funny_inputs import funny_inputs
 
 
 from test_inputs import test_inputs, deployment_test_inputs
@@ -31,6 +43,58 @@ def test_Deployment_perimeter_creation():
     assert dep.perimeter_creation('nr_aerogels', 5, test = True) == ('l', 6)
     assert dep.perimeter_creation('perimeter', 6, test = True) == ('l', 3)
 
+def test_compute_outer_diameter():
+    # Compare the analytic spiral inversion against a fine numerical integration of the arc length
+    length, thickness, internal_diameter = 4., 0.005, 0.003
+    b = thickness / (2 * np.pi)
+    theta = np.linspace(0, 400, 2_000_001)
+    ds = np.sqrt((internal_diameter / 2 + b * theta)**2 + b**2) * (theta[1] - theta[0])
+    theta_end = theta[np.searchsorted(np.cumsum(ds), length)]
+    numerical = 2 * (internal_diameter / 2 + b * theta_end)
+
+    assert math.isclose(compute_outer_diameter(length, thickness, internal_diameter), numerical, rel_tol=1e-5)
+
+    lengths = np.array([0., 1., 4., 20.])
+    diameters = compute_outer_diameter(lengths, thickness, internal_diameter)
+    assert diameters.shape == lengths.shape
+    assert diameters[0] == internal_diameter
+    assert np.all(np.diff(diameters) > 0)
+    for length, diameter in zip(lengths, diameters):
+        assert math.isclose(compute_outer_diameter(length, thickness, internal_diameter), diameter)
+
+def test_aerogel_sizing_cache():
+    aerogel_sizing.cache_clear()
+
+    dep = Deployment(deployment_test_inputs, 'perimeter', 100.)
+    first = dep.aerogel_size()
+    dep.get_all()
+    Deployment(deployment_test_inputs, 'nr_aerogels', 5).aerogel_size()
+
+    info = aerogel_sizing.cache_info()
+    assert info.misses == 1
+    assert info.hits >= 3
+    assert Deployment(deployment_test_inputs, 'perimeter', 100.).aerogel_size() == first
+
+    dep.payload_mass = 6.
+    assert dep.aerogel_size()[0] == first[0] + 1.
+    assert aerogel_sizing.cache_info().misses == 2
+
+def test_perimeter_creation_batch():
+    perimeters = np.array([100., 500., 5000.])
+    payload_masses = np.array([4., 5., 8.])
+    dep = Deployment(deployment_test_inputs, 'perimeter', 500.)
+    res = dep.perimeter_creation_batch(amt=perimeters[:, None], payload_mass=payload_masses[None, :])
+
+    assert res['nr_aerogels'].shape == (3, 3)
+    for i, perimeter in enumerate(perimeters):
+        for j, payload_mass in enumerate(payload_masses):
+            single = Deployment(dict(deployment_test_inputs, payload_mass=payload_mass), 'perimeter', perimeter)
+            assert single.perimeter_creation(test=True) == (res['method'][i, j], res['nr_aerogels'][i, j])
+
+    res = dep.perimeter_creation_batch(amt=np.array([5, 10, 20]), strategy='nr_aerogels')
+    single = Deployment(deployment_test_inputs, 'nr_aerogels', 10)
+    assert single.perimeter_creation() == res['per_length'][1]
+
 def test_deployment_get_functions():
     dep = Deployment(test_inputs)
 
@@ -39,12 +103,105 @@ def test_deployment_get_functions():
     assert isinstance(dep.get_deployment_power(), dict)
     assert isinstance(dep.get_deployment_system_mass(), dict)
 
+def test_launch_time():
+    # Hand calculation: 2 pairs of workers, setup 150 s, 45 s between launches, 60 s walk, nests of 6 and 10 UAVs
+    # 20 UAVs: 3 + 5 + 2 full batches of 195 s and 2 walks
+    assert math.isclose(launch_time(20, 4, 3, 6, 10, 150., 45., 60.), 10 * 195 + 2 * 60)
+    # 30 UAVs do not fit in 2 containers: 3 + 5 full batches and a walk after both nests
+    assert math.isclose(launch_time(30, 4, 2, 6, 10, 150., 45., 60.), 8 * 195 + 2 * 60)
+    # 7 UAVs with 3 pairs: 2 full batches in the generator nest, 1 partial batch in the next
+    assert math.isclose(launch_time(7, 6, 3, 6, 10, 150., 30., 60.), 2 * (150 + 2 * 30) + 150 + 60)
+
+    times = launch_time(np.arange(1, 41)[None, :], np.array([2, 4, 6])[:, None], 3, 6, 10, 150., 45., 60.)
+    assert times.shape == (3, 40)
+    assert np.all(np.diff(times, axis=1) >= 0)
+
+def test_UAV_fixed_point():
+    # Linear coupled contraction with fixed point x = 2, y = 1
+    def sizing_pass(outputs):
+        x, y = outputs['x'], outputs['y']
+        return dict(outputs, x=0.9 * x - 0.3 * y + 0.5, y=0.2 * x + 0.7 * y - 0.1)
+
+    passes = {}
+    for acceleration in [None, 'aitken', 'anderson']:
+        uav = UAV({'x': 0., 'y': 0., 'n': 3}, None, iterations=500, rel_tol=1e-8, acceleration=acceleration)
+        uav.sizing_pass = sizing_pass
+        outputs = uav.get_all()
+
+        assert uav.converged
+        assert math.isclose(outputs['x'], 2., rel_tol=1e-6)
+        assert math.isclose(outputs['y'], 1., rel_tol=1e-6)
+        assert outputs['n'] == 3
+        assert len(uav.convergence_history) == uav.n_iterations
+        passes[acceleration] = uav.n_iterations
+
+    assert passes['anderson'] < passes['aitken'] < passes[None]
+
+def test_design_state():
+    state = DesignState({'a': 1., 'b': 2.})
+    copy = state.copy()
+    copy['a'] = 10.
+    copy['c'] = 3.
+    del copy['b']
+
+    assert dict(state) == {'a': 1., 'b': 2.}
+    assert dict(copy) == {'a': 10., 'c': 3.}
+    assert len(copy) == 2 and 'b' not in copy and copy.get('b', 0.) == 0.
+
+    # Copies share the stored entries until they are modified
+    other = copy.copy()
+    assert other._base is copy._base and other._changes is copy._changes
+    other.update({'a': 5.})
+    assert copy['a'] == 10. and other['a'] == 5.
+    assert other == {'a': 5., 'c': 3.}
+
+    # Deployment works on a DesignState exactly as on a dictionary
+    res_dict = Deployment(deployment_test_inputs, 'perimeter', 100.).get_all()
+    res_state = Deployment(DesignState(deployment_test_inputs), 'perimeter', 100.).get_all()
+    assert isinstance(res_state, DesignState)
+    assert res_state.to_dict() == res_dict
+
 def test_constraints_get_function():
     con = Constraints(test_inputs)
 
     assert isinstance(con.get_all(), dict)
 
 
+def test_constraints_design_point():
+    con = Constraints(initial_inputs)
+    W_S, P_W_cruise, P_W_climb, P_W_service, W_S_stall, optimal_cruise_power = con.form_variable_lists()
+
+    # The broadcast curves match the scalar formulas
+    i = 150
+    V_roc = con.Vroc(W_S[i])
+    assert np.isclose(P_W_climb[i], con.thrustLoadingClimb(V_roc, W_S[i], con.r_c, con.q_climb(V_roc)) * V_roc / con.eff_prop)
+    assert np.isclose(P_W_cruise[i], con.thrustLoadingCruise(W_S[i]) * con.V_max / con.eff_prop)
+
+    # The design point lies exactly on the stall constraint and does not depend on the resolution
+    outputs = con.get_all()
+    assert outputs['wing_loading'] == con.WingLoading_Vstall()
+    assert np.isclose(outputs['power_required_cruise'], optimal_cruise_power)
+    fine = Constraints(initial_inputs, W_S_max=1000., W_S_step=0.01)
+    assert len(fine.form_variable_lists()[0]) == 100000
+    assert fine.get_all()['P_W_climb'] == outputs['P_W_climb']
+
+
+def test_constraint_variants():
+    con = Constraints(initial_inputs)
+    variants = con.variants(grid=True, AR=[8., 10., 12.], e=[0.7, 0.8], CD_0=[0.03, 0.05], V_stall=[12., 14.])
+    assert variants['P_W_climb'].shape == (3, 2, 2, 2, len(con.wing_loading_grid()))
+    assert variants['design_P_W_climb'].shape == (3, 2, 2, 2)
+
+    # Every variant matches a separate Constraints object with the same parameters
+    single = Constraints(dict(initial_inputs, AR=12., e=0.7, CD_0=0.05, V_stall=14.))
+    W_S, P_W_cruise, P_W_climb, P_W_service, W_S_stall, _ = single.form_variable_lists()
+    assert np.allclose(variants['P_W_cruise'][2, 0, 1, 1, 1:], P_W_cruise[1:])
+    assert np.allclose(variants['P_W_service'][2, 0, 1, 1, 1:], P_W_service[1:])
+    assert np.isclose(variants['W_S_stall'][2, 0, 1, 1], W_S_stall[0])
+    assert np.isclose(variants['design_P_W_climb'][2, 0, 1, 1], single.get_all()['P_W_climb'])
+    assert np.all(variants['design_P_W_max'] >= variants['design_P_W_climb'])
+
+
 def test_thrust_to_weight_vtol(): 
     prop = Propulsion(test_inputs)
     T_W = prop.thrust_to_weight_vtol()
@@ -76,6 +233,223 @@ def test_get_all_prop():
     res = Propulsion(test_inputs).get_all()
     assert isinstance(res, dict)
 
+def test_structures_section_properties():
+    s = Structures(funny_inputs)
+    upper, lower = load_airfoil()
+    assert load_airfoil() is load_airfoil()           # parsed once
+    assert upper[0, 0] == lower[0, 0] == 0.
+
+    section = s.section
+    assert section is Structures(funny_inputs).section
+    assert section['enclosed_area'] > 0 and section['front_spar_length'] > 0
+
+    # Thin walled section, I and Q are linear in t so the stresses scale with 1/t
+    I, top_of_front_spar = s.moment_intertia(1e-3)
+    assert math.isclose(I, 1e-3 * section['I_per_t'])
+    assert top_of_front_spar == section['top_of_front_spar']
+    t = np.array([1e-3, 2e-3])
+    assert np.allclose(s.normal_stress(t), s.normal_stress(1e-3) * 1e-3 / t)
+    assert np.allclose(s.shear_stress_calc(t), s.shear_stress_calc(1e-3) * 1e-3 / t)
+    assert np.allclose(s.torsion_stress_calc(t), s.torsion_stress_calc(1e-3) * 1e-3 / t)
+
+def test_structures_thickness():
+    # Closed form for 1/t stresses, bracketed root otherwise, clipped to the thickness range
+    assert math.isclose(required_thickness(lambda t: 2e3 / t, 1e6), 2e-3)
+    assert math.isclose(required_thickness(lambda t: 4e3 / t**2, 1e9), 2e-3)
+    assert required_thickness(lambda t: 1. / t, 1e6) == 1e-5
+    assert required_thickness(lambda t: 1e6 / t, 1e6) == 0.1
+
+    s = Structures(funny_inputs)
+    t_final_bending, t_final_shear, t_final_torsion = s.thickness()
+    for t_final, stress in [(t_final_bending, s.normal_stress), (t_final_shear, s.shear_stress_calc), (t_final_torsion, s.torsion_stress_calc)]:
+        assert math.isclose(abs(stress(t_final)), 0.5e6)
+
+    outputs = s.get_all()
+    assert outputs['final_t'] == t_final_bending
+    # At the rib spacing the skin buckles exactly at the required stress, a thicker skin allows wider spacing
+    t_skin = max(t_final_bending, t_final_shear, t_final_torsion)
+    rib_placement = outputs['rib_placement']
+    assert 0. < rib_placement < 2.
+    assert math.isclose(s.skin_buckling(rib_placement, t_skin), 2e6)
+    assert math.isclose(s.rib_placement_calc(2 * t_skin), 2 * rib_placement)
+    assert s.rib_placement_calc(0.1) == 2.
+
+def test_structures_load_cases():
+    s = Structures(funny_inputs)
+
+    # Load cases are broadcast against each other, every case matches a single evaluation
+    loads = s.wing_load_cases('cruise', load_factor=[1., 2., 3.5], mass_battery=[[0.], [s.mass_battery]])
+    assert loads['load'].shape == (2, 3, 500) and loads['V'].shape == (2, 3, 499) and loads['M'].shape == (2, 3, 498)
+    single = s.wing_load_cases('cruise', load_factor=2., mass_battery=0.)
+    assert np.allclose(loads['M'][0, 1], single['M'])
+    assert np.allclose(loads['V'][1, 2], s.wing_load_cases('cruise')['V'])
+
+    # The numeric queries do not plot
+    _, V_root, M_root = s.NVM_VTOL(return_root_values=True)
+    hover = s.wing_load_cases('VTOL', wind_speed=[0., s.wind_speed])
+    assert V_root == hover['V'][1, 0] and M_root == hover['M'][1, 0]
+
+    boom = s.boom_load_cases(thickness=np.linspace(0.0001, 0.05, 1000))
+    deflection = np.max(boom['deflection'], axis=-1)
+    t = np.linspace(0.0001, 0.05, 1000)[np.argmax(deflection <= s.max_deflection_VTOL_boom)]
+    assert s.determine_VTOL_boom_thickness() == round(t, 5) * 1.5
+    assert s.NVM_propeller_boom(size_thickness=True) == np.max(s.boom_load_cases(thickness=t)['deflection'])
+
+def test_stabcon_tau_cache():
+    StabCon.clear_tau_cache()
+    assert StabCon.tau_cache_info() == {'hits': 0, 'misses': 0}
+
+    # The table is read once, on first use, and matches linear interpolation of it
+    ca_c, tau = np.loadtxt(StabCon.EFFECTIVENESS_FILE, delimiter=",").T
+    ratios = np.linspace(0., 1., 101)
+    assert np.allclose(StabCon.tau(ratios), np.interp(ratios, ca_c, tau))
+    assert isinstance(StabCon(initial_inputs)._tau_from_ca_over_c(0.3), float)
+    StabCon(initial_inputs).size_ailerons()
+    info = StabCon.tau_cache_info()
+    assert info == {'hits': 2, 'misses': 1}
+
+def test_stabcon_control_surface_sizing():
+    # The smallest bo meeting the requirement, also for an array of requirements
+    p_achieved, bo, Cl_delta_a, Cl_p = StabCon(initial_inputs).size_ailerons()
+    assert p_achieved >= initial_inputs['roll_rate_req']
+    assert math.isclose(p_achieved, initial_inputs['roll_rate_req'], rel_tol=1e-5)
+    assert initial_inputs['bo'] <= bo <= initial_inputs['wing_span'] / 2
+
+    requirements = np.array([0.001, initial_inputs['roll_rate_req'], 5.])
+    p_map, bo_map, _, _ = StabCon(initial_inputs).size_ailerons(roll_rate_req=requirements)
+    assert bo_map[0] == initial_inputs['bo'] and math.isclose(bo_map[1], bo) and np.isnan(bo_map[2])
+
+    # Rudder: chord ratio grows with the gust, infeasible gusts raise for scalars and give NaN for arrays
+    stabcon = StabCon(dict(initial_inputs, gust_speed=3.))
+    cr_cv, _ = stabcon.size_rudder()
+    assert stabcon.get_all()['cr_over_cv'] == cr_cv
+    cr_cv_map, _ = StabCon(initial_inputs).size_rudder(gust_speed=np.array([2., 3., 100.]))
+    assert cr_cv_map[0] < cr_cv_map[1] and math.isclose(cr_cv_map[1], cr_cv) and np.isnan(cr_cv_map[2])
+    with pytest.raises(ValueError):
+        StabCon(dict(initial_inputs, gust_speed=100.)).size_rudder()
+
+def test_cg_envelope():
+    # Two fuselage components (the second one optional) and one wing group component, in two configurations
+    x_lemac = np.array([0.5, 1.0])
+    tracks = cg_tracks([2., 1., 1.], [0.3, 0.9, 0.1], [False, False, True], [[1, 1, 1], [1, 0, 1]], x_lemac, mac=0.5)
+    assert np.allclose(tracks['x_cg'][0], (2. * 0.3 + 1. * 0.9 + 1. * (0.1 + x_lemac)) / 4.)
+    assert np.allclose(tracks['x_cg'][1], (2. * 0.3 + 1. * (0.1 + x_lemac)) / 3.)
+    assert np.allclose(tracks['fuselage_x_cg'], [0.5, 0.3]) and np.allclose(tracks['wing_x_cg'], 0.1)
+
+    # The window is where the most forward CG is controllable and the most aft CG stable
+    envelope = CGEnvelope(initial_inputs, n_lemac=200)
+    window = envelope.window()
+    feasible = window['feasible']
+    assert feasible.any() and window['Sh_S_min'] <= initial_inputs['Sh_S']
+    x_feasible = envelope.tracks()['x_lemac'][feasible]
+    assert window['x_lemac_min'] == x_feasible.min() and window['x_lemac_max'] == x_feasible.max()
+
+    # A longer tail arm needs a smaller tail, all tail arms in one call
+    lh = np.array([0.6, initial_inputs['lh'], 1.2])
+    keys = ('CL_alpha_h', 'CL_alpha_Ah', 'd_epsilon_d_alpha', 'lh', 'mac', 'Vh_V', 'AR_h', 'CL_A_h', 'Cm_ac_wing', 'x_ac_bar_wing')
+    coefficients = scissor_coefficients(*(lh if key == 'lh' else initial_inputs[key] for key in keys))
+    tracks = envelope.tracks()
+    windows = wing_position_window(tracks['x_cg_bar'], tracks['x_lemac'], coefficients, initial_inputs['Sh_S'])
+    assert windows['Sh_S_required'].shape == (3, 200)
+    assert np.all(np.diff(windows['Sh_S_min']) < 0) and math.isclose(windows['Sh_S_min'][1], window['Sh_S_min'])
+
+    outputs = envelope.get_all()
+    assert all(key in outputs for key in CGEnvelope.output_keys)
+    assert outputs['cg_bar_fwd'] <= outputs['cg_bar_aft']
+
+def test_dynamic_stability():
+    dynamic_stability = DynamicStability(initial_inputs)
+    V = np.array([25., 30., 35.])
+    results = dynamic_stability.envelope(V[:, None], np.array([0., 3000.]), initial_inputs['M_to'], 0.2)
+    assert results['A_long'].shape == (3, 2, 4, 4) and results['B_lat'].shape == (3, 2, 4, 2)
+
+    # The batched eigenvalues are those of every matrix on its own
+    for index in np.ndindex(3, 2):
+        eigenvalues = np.linalg.eigvals(results['A_long'][index])
+        assert np.allclose(np.sort_complex(eigenvalues), np.sort_complex(results['eigenvalues_long'][index]))
+    assert np.all(results['short_period_frequency'] > results['phugoid_frequency'])
+    assert np.all(results['roll_time_constant'] > 0)
+
+    # Moving the CG aft reduces the short period frequency, behind the neutral point it diverges
+    cg = dynamic_stability.envelope(30., 0., initial_inputs['M_to'], np.array([0.1, 0.3, 2.]))
+    assert cg['short_period_frequency'][0] > cg['short_period_frequency'][1]
+    assert np.max(np.real(cg['eigenvalues_long'][2])) > 0
+
+    # Two known pairs: -0.5 ± 1j is the short period and -0.01 ± 0.1j the phugoid
+    A = np.zeros((1, 4, 4))
+    A[0, :2, :2] = [[-0.5, -1.], [1., -0.5]]
+    A[0, 2:, 2:] = [[-0.01, -0.1], [0.1, -0.01]]
+    modes = longitudinal_modes(A)
+    assert math.isclose(modes['short_period_frequency'][0], math.sqrt(1.25))
+    assert math.isclose(modes['short_period_damping'][0], 0.5 / math.sqrt(1.25))
+    assert math.isclose(modes['phugoid_damping'][0], 0.01 / math.sqrt(0.0101))
+
+    # Overdamped Dutch roll, all roots real: roll is the fastest, spiral the slowest, the middle two the Dutch roll
+    modes = lateral_modes(np.diag([-10., -1., -3., -0.05])[None])
+    assert math.isclose(modes['roll_time_constant'][0], 0.1) and math.isclose(modes['spiral_root'][0], -0.05)
+    assert math.isclose(modes['dutch_roll_frequency'][0], math.sqrt(3.))
+    assert math.isclose(modes['dutch_roll_damping'][0], 4. / (2 * math.sqrt(3.)))
+    # Oscillatory Dutch roll faster than the roll mode
+    A = np.diag([0., 0., -2., -0.01])[None]
+    A[0, :2, :2] = [[-1., -5.], [5., -1.]]
+    modes = lateral_modes(A)
+    assert math.isclose(modes['dutch_roll_frequency'][0], math.sqrt(26.))
+    assert math.isclose(modes['roll_time_constant'][0], 0.5) and math.isclose(modes['spiral_root'][0], -0.01)
+    # Over the envelope the spiral is always the slowest and the roll the fastest real root
+    eigenvalues = results['eigenvalues_lat']
+    assert np.allclose(np.abs(results['spiral_root']), np.min(np.abs(eigenvalues), axis=-1))
+
+    # Roll damping normalised by S b^2: -cl_alpha / 6 for a rectangular wing (strip theory)
+    chord = initial_inputs['wing_root_chord']
+    rectangular = dict(initial_inputs, wing_tip_chord=chord, wing_area=chord * initial_inputs['wing_span'])
+    Cl_p = DynamicStability(rectangular).derivatives()['Cl_p']
+    assert math.isclose(Cl_p, -(initial_inputs['cl_alpha'] + initial_inputs['cd_0']) / 6, rel_tol=1e-6)
+    with pytest.raises(ValueError):
+        DynamicStability(dict(rectangular, cl_alpha=20.)).derivatives()
+
+    outputs = dynamic_stability.get_all()
+    assert all(key in outputs for key in DynamicStability.output_keys)
+    margins = handling_quality_margins(results)
+    assert np.all(margins['handling_quality_margin'] <= margins['phugoid_damping_margin'])
+
+    # Margins are fractions of their limits, so damping ratios, frequencies and times compare
+    modes = {'short_period_damping': 0.6, 'phugoid_damping': 0.05, 'dutch_roll_damping': 0.16, 'dutch_roll_frequency': 2.,
+             'roll_time_constant': 0.7, 'spiral_time_to_double': 15.}
+    margins = handling_quality_margins(modes)
+    assert math.isclose(margins['short_period_damping_margin'], 0.7) and math.isclose(margins['phugoid_damping_margin'], 0.25)
+    assert math.isclose(margins['dutch_roll_damping_margin'], 1.) and math.isclose(margins['roll_time_constant_margin'], 0.5)
+    assert math.isclose(margins['handling_quality_margin'], -0.25) and not margins['level_1']
+
+def test_thermal_optimization():
+    phases = {'power_required_VTOL': 4000., 'power_required_cruise': 600., 'power_required_hover': 3500., 'time_ascent': 30.,
+              'time_descent': 30., 'time_cruise_max': 900., 'time_cruise_min': 300., 'time_uav_max': 1800., 'time_turnaround': 600.}
+    thermal = Thermal(dict(initial_inputs, **phases), {'battery_capacity': 34, 'battery_voltage': 52})
+
+    # The heat budget is computed once per design state
+    budget = thermal.heat_budget()
+    assert thermal.heat_budget() is budget
+    thermal.power_required_cruise *= 2
+    assert thermal.heat_budget()['Q_int_return'] > budget['Q_int_return']
+    thermal.power_required_cruise /= 2
+
+    # Analytic gradients against central differences
+    x = np.array([0.2, 0.3, 0.01])
+    mass_gradient, constraint_gradient = thermal.gradients(x)
+    for j, step in enumerate([1e-6, 1e-6, 1e-8]):
+        dx = np.zeros(3)
+        dx[j] = step
+        plus, minus = thermal.simulate(x + dx), thermal.simulate(x - dx)
+        assert math.isclose(mass_gradient[j], (plus[0] - minus[0]) / (2 * step), rel_tol=1e-5)
+        assert math.isclose(constraint_gradient[j], ((plus[1] - plus[2]) - (minus[1] - minus[2])) / (2 * step), rel_tol=1e-5)
+
+    # Objective and constraint at the same x share one simulation
+    thermal.n_simulations = 0
+    thermal.objective(x), thermal.constraint(x), thermal.objective_jac(x), thermal.constraint_jac(x)
+    assert thermal.n_simulations == 1
+
+    result = thermal.optimize()
+    assert result.success and thermal.constraint(result.x) > -1e-6
+
 def test_NVM_diagrams():
     s = Structures(test_inputs)
 
@@ -1,6 +1,12 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
 import matplotlib.pyplot as plt
 import numpy as np
 
+from DetailedDesign.subsystems.constraints import constraint_variants
+
 r_c = 3  # [m/s] rate of climb
 rho = 0.9013  # density at 3000m
 
@@ -49,44 +55,24 @@ class Constraints:
         W_S_stall = 0.5 * self.Vstall**2 * rho * self.CLmax
         return W_S_stall
 
+    def variants(self, W_S=np.arange(0, 600, 1), **parameters):
+        '''
+        Constraint diagrams for arrays of e.g. AR, e, CD0 or Vstall, see constraint_variants
+        '''
+        values = dict(V_stall=self.Vstall, V_cruise=self.Vmax, e=self.e, AR=self.AR, CL_max=self.CLmax, CD_0=self.CD0, eff_prop=self.n_p)
+        names = {'Vstall': 'V_stall', 'Vmax': 'V_cruise', 'CLmax': 'CL_max', 'CD0': 'CD_0', 'n_p': 'eff_prop'}
+        values.update({names.get(key, key): value for key, value in parameters.items()})
+        return constraint_variants(W_S, rho=rho, ROC_cruise=r_c, ROC_service=self.R_C_service, **values)
+
     def plot(self, opt = False, save=False):
 
         W_S = np.arange(0, 600, 1)  # [N/m^2] variable
 
-        T_W_cruise = []
-        T_W_climb = []
-        P_W_cruise = []
-        P_W_climb = []
-        P_W_service = []
-        W_S_stall = []
-        T_W_service = []
-
-        for i in W_S:
-            # calculating thrust to weight ratios
-            T_W_cruise.append(self.thrustLoadingCruise(i))
-            T_W_climb.append(
-                self.thrustLoadingClimb(
-                    self.Vroc(i), i, r_c, self.q_climb(self.Vroc(i))
-                )
-            )
-            T_W_service.append(
-                self.thrustLoadingClimb(
-                    self.Vroc(i), i, self.R_C_service, self.q_climb(self.Vroc(i))
-                )
-            )
-            # calculating wing loading stall
-            W_S_stall_value = self.WingLoading_Vstall()
-            W_S_stall.append(W_S_stall_value)
-
-        # Calculating Power loading
-        for i in range(len(W_S)):
-            P_W_cruise.append(powerLoading(T_W_cruise[i], self.Vmax, self.n_p))
-            P_W_climb.append(
-                powerLoading(T_W_climb[i], self.Vroc(W_S[i]), self.n_p)
-            )  # self.Vroc(self.W_S[i])
-            P_W_service.append(
-                powerLoading(T_W_service[i], self.Vroc(W_S[i]), self.n_p)
-            )
+        curves = self.variants(W_S)
+        P_W_cruise = curves['P_W_cruise']
+        P_W_climb = curves['P_W_climb']
+        P_W_service = curves['P_W_service']
+        W_S_stall = np.full(len(W_S), curves['W_S_stall'])
 
         if opt: 
             return W_S, P_W_cruise, P_W_climb, P_W_service, W_S_stall
@@ -0,0 +1,158 @@
+import contextlib
+import io
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from integration import integration_optimization
+
+
+def canonical(value) -> str:
+    '''
+    Representation of an input value for the cache key, numbers compare by value (7, 7.0 and np.int64(7) are equal)
+    '''
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_)):
+        return repr(float(value))
+    return repr(value)
+
+
+def evaluate_row(task: tuple) -> list[dict]:
+    '''
+    Evaluates one row of the grid (the points along the last axis) in order. With warm starting every point starts
+    from the converged outputs of the previous point instead of the base inputs, which saves most of the iterations.
+    The iteration stops within its tolerance, so a warm-started result depends on the point it started from.
+    '''
+    function, tolerance, max_iterations, base_inputs, points, start, warm_start = task
+    results = []
+    for point in points:
+        current_inputs = dict(start if warm_start and start is not None else base_inputs)
+        current_inputs.update(point)
+        with contextlib.redirect_stdout(io.StringIO()):
+            outputs = function(tolerance, max_iterations, current_inputs)
+        results.append(outputs)
+        start = outputs
+    return results
+
+
+class GridEvaluation:
+    '''
+    Evaluates the preliminary sizing (integration_optimization by default) on a grid of input values, e.g. for the
+    AR-range and payload-range diagrams.
+
+        -> The rows of the grid (all points along the last axis) are run in parallel in a process pool, the
+           results are returned in the order of itertools.product of the axes, independent of the scheduling.
+        -> Results are cached by their inputs, so repeated points and repeated diagrams are not recomputed. Every
+           point is run from the base inputs, so its result is the same in any grid, alone or from the cache.
+        -> With warm_start=True every point in a row starts from the converged outputs of its neighbour instead,
+           which saves iterations but settles within the tolerance at a slightly different result. These results
+           are cached under their start point as well, so they are only reused for the same row.
+    '''
+
+    def __init__(self, inputs: dict[str, float | int], function: callable = integration_optimization, tolerance: float = 1,
+                 max_iterations: int = 100, n_workers: int | None = None, warm_start: bool = False, verbose: bool = False) -> None:
+        self.inputs = dict(inputs)
+        self.function = function
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.warm_start = warm_start
+        self.verbose = verbose
+
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, point: dict, start: tuple | None = None) -> tuple:
+        '''
+        Cache key of a grid point: the function and all of its inputs, and for a warm-started point the key of the
+        point it started from
+        '''
+        current_inputs = dict(self.inputs, **point)
+        key = (self.function.__module__, self.function.__qualname__, self.tolerance, self.max_iterations,
+               tuple(sorted((key, canonical(value)) for key, value in current_inputs.items())))
+        return key if start is None else key + (start,)
+
+    def row_keys(self, row: list[dict]) -> list[tuple]:
+        '''
+        Cache keys of the points of a row, chained along the row when warm starting
+        '''
+        keys = []
+        for point in row:
+            keys.append(self.key(point, keys[-1] if self.warm_start and keys else None))
+        return keys
+
+    def tasks(self, rows: list[list[dict]], keys: list[list[tuple]]) -> list[tuple[list[tuple], tuple]]:
+        '''
+        The uncached points of every row as one task. The first point of a task is warm-started from the cached
+        result of the point before it, if there is one.
+        '''
+        tasks = []
+        for row, row_keys in zip(rows, keys):
+            start = None
+            pending, points = [], []
+            for point, key in zip(row, row_keys):
+                result = self.cache.get(key)
+                if result is None:
+                    pending.append(key)
+                    points.append(point)
+                elif not points:
+                    start = result
+            if points:
+                tasks.append((pending, (self.function, self.tolerance, self.max_iterations, self.inputs, points,
+                                        start, self.warm_start)))
+        return tasks
+
+    def evaluate(self, axes: dict[str, list]) -> list[dict]:
+        '''
+        Outputs for every combination of the axis values, e.g. evaluate({'AR': AR_range, 'R_max': range_range}),
+        in the order of itertools.product
+        '''
+        names = list(axes)
+        *outer, last = [list(values) for values in axes.values()]
+        return self.evaluate_rows([[dict(zip(names, (*values, value))) for value in last] for values in itertools.product(*outer)])
+
+    def evaluate_rows(self, rows: list[list[dict]]) -> list[dict]:
+        '''
+        Outputs for rows of points (dictionaries of changed inputs), flattened in row order. The rows are evaluated
+        in parallel, the points within a row in order (warm-started from each other if warm_start is set).
+        '''
+        keys = [self.row_keys(row) for row in rows]
+        tasks = self.tasks(rows, keys)
+        n_points = sum(len(row) for row in rows)
+        n_computed = sum(len(pending) for pending, _ in tasks)
+        self.hits += n_points - n_computed
+        self.misses += n_computed
+
+        if tasks:
+            if self.n_workers == 1 or len(tasks) == 1:
+                results = map(evaluate_row, [task for _, task in tasks])
+                self.store(tasks, results)
+            else:
+                with ProcessPoolExecutor(max_workers=min(self.n_workers, len(tasks))) as executor:
+                    self.store(tasks, executor.map(evaluate_row, [task for _, task in tasks]))
+
+        results = [self.cache[key] for row_keys in keys for key in row_keys]
+        if self.verbose:
+            for point, result in zip((point for row in rows for point in row), results):
+                print(point, result['M_to'])
+        return results
+
+    def store(self, tasks: list, results) -> None:
+        '''
+        Puts the results of the tasks in the cache
+        '''
+        for (keys, _), row_results in zip(tasks, results):
+            for key, result in zip(keys, row_results):
+                self.cache[key] = result
+
+    def evaluate_array(self, axes: dict[str, list], key: str) -> np.ndarray:
+        '''
+        One output on the grid, with one array axis per input axis
+        '''
+        results = self.evaluate(axes)
+        return np.array([result[key] for result in results]).reshape([len(values) for values in axes.values()])
+
+    def get_statistics(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'cached_points': len(self.cache)}
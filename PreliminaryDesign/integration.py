@@ -3,6 +3,8 @@ from Nest_Sizing import Nest
 from mass_estimation import mass_sizing
 from Classes.Contraints_for_mass_calculations import Constraints
 from Battery_mass_estimation_v2 import calculate_battery_mass
+import time
+
 import numpy as np
 
 
@@ -226,72 +228,161 @@ relevant = [
     "P_r_FW",
 ]
 
-doesnt_converge = set()
+STAGES = ("swarm_profile", "uav_profile", "battery_mass", "mass_sizing", "nest")
 
 
-def integration_optimization(
-    tolerance: float, max_iterations: int, inputs: dict[str, float | int]
-) -> tuple[dict[str, float | int], dict[str, list[float]]]:
+def float_keys(outputs: dict) -> list[str]:
     """
-    Combines the mass estimation, battery calculation and mission profile calculations and iterates until convergence or max iterations.
-
-    Parameters:
-    tolerance (float): The tolerance for convergence.
-    max_iterations (int): The maximum number of iterations to perform.
-    inputs (dict): A dictionary containing the input parameters for the calculations.
+    Keys of the float entries, these are the ones checked for convergence and accelerated.
     """
-    for i in range(max_iterations):
+    return [key for key, value in outputs.items() if isinstance(value, (float, np.floating)) and not isinstance(value, bool)]
 
-        current_inputs = inputs.copy()
 
-        swarm_sizing = SwarmProfile(current_inputs)
-        outputs = swarm_sizing.size_swarm_profile()
+def integration_pass(inputs: dict[str, float | int], stage_times: dict[str, float]) -> dict[str, float | int]:
+    """
+    One pass of the swarm profile, UAV profile, battery mass, mass sizing and nest sizing.
+    The time spent in every stage is added to stage_times.
+    """
+    start = time.perf_counter()
+    swarm_sizing = SwarmProfile(inputs.copy())
+    outputs = swarm_sizing.size_swarm_profile()
+    stage_times["swarm_profile"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    uav_profile = UAVProfile(outputs)
+    outputs = uav_profile.size_uav_profile()
+    stage_times["uav_profile"] += time.perf_counter() - start
+
+    # Calculate the mass of the battery
+    start = time.perf_counter()
+    outputs["M_battery"] = calculate_battery_mass(
+        E_required_Wh=inputs["total_mission_energy"],
+        DOD_fraction=inputs["DOD_fraction"],
+        eta_battery=inputs["eta_battery"],
+        M_to=inputs["M_to"],
+    )
+    stage_times["battery_mass"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    outputs = mass_sizing(outputs)
+    stage_times["mass_sizing"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    nest_sizing = Nest(outputs, verbose=False)
+    outputs = nest_sizing.size_nest()
+    stage_times["nest"] += time.perf_counter() - start
 
-        uav_profile = UAVProfile(outputs)
-        outputs = uav_profile.size_uav_profile()
+    return outputs
 
-        # Calculate the mass of the battery
-        battery_mass = calculate_battery_mass(
-            E_required_Wh=inputs["total_mission_energy"],
-            DOD_fraction=inputs["DOD_fraction"],
-            eta_battery=inputs["eta_battery"],
-            M_to=inputs["M_to"],
-        )
 
-        outputs["M_battery"] = battery_mass
+def scaled_residuals(inputs: dict, outputs: dict, keys: list[str], rel_tol: float, key_tolerances: dict[str, float], tolerance: float) -> np.ndarray:
+    """
+    Change of every key divided by its allowed change, a key has converged when this is at most one.
+    The allowed change is the relative tolerance of the key times its magnitude, values smaller than tolerance
+    are compared against rel_tol * tolerance instead.
+    """
+    old = np.array([float(inputs[key]) for key in keys])
+    new = np.array([float(outputs[key]) for key in keys])
+    tolerances = np.array([key_tolerances.get(key, rel_tol) for key in keys])
+    return np.abs(new - old) / (tolerances * np.maximum(np.abs(new), tolerance))
 
-        outputs = mass_sizing(outputs)
 
-        print(
-            f'span: {outputs["b_wing"]}, wing area: {outputs["S_wing"]}, battery mass: {battery_mass}, MTOW: {inputs["MTOW"]}, M_battery: {inputs["M_battery"]}'
-        )
+def anderson_step(x: np.ndarray, g: np.ndarray, dx: list[np.ndarray], dg: list[np.ndarray], relaxation: float) -> np.ndarray:
+    """
+    Anderson mixing of the last passes, x are the inputs and g the outputs of the current pass, dx and dg hold the
+    differences between consecutive passes. Without history this is a relaxed fixed-point step.
+    """
+    if not dx:
+        return x + relaxation * (g - x)
+    f = g - x
+    dF = np.column_stack([dgi - dxi for dxi, dgi in zip(dx, dg)])
+    scale = np.maximum(np.abs(g), 1e-12)  # Work in relative terms, the keys differ by orders of magnitude
+    gamma, *_ = np.linalg.lstsq(dF / scale[:, None], f / scale, rcond=None)
+    x_new = x + relaxation * f - (np.column_stack(dx) + relaxation * dF) @ gamma
+    return x_new if np.all(np.isfinite(x_new)) else x + relaxation * f
+
 
-        nest_sizing = Nest(outputs, verbose=False)
-        outputs = nest_sizing.size_nest()
+def integration_optimization(
+    tolerance: float, max_iterations: int, inputs: dict[str, float | int], rel_tol: float = 1e-3,
+    key_tolerances: dict[str, float] | None = None, acceleration: str | None = "anderson", relaxation: float = 1.0,
+    anderson_depth: int = 3, verbose: bool = True, return_report: bool = False,
+) -> dict[str, float | int] | tuple[dict[str, float | int], dict]:
+    """
+    Combines the mass estimation, battery calculation and mission profile calculations and iterates until convergence or max iterations.
 
-        if all(
-            abs(outputs[key] - inputs[key]) < tolerance
-            for key in outputs
-            if isinstance(outputs[key], float) or isinstance(outputs[key], np.float64)
-        ):
-            print("Converged")
-            return outputs
+    Parameters:
+    tolerance (float): Values smaller than this are checked with an absolute instead of a relative tolerance.
+    max_iterations (int): The maximum number of iterations to perform.
+    inputs (dict): A dictionary containing the input parameters for the calculations.
+    rel_tol (float): Relative tolerance on the change of every float output between two passes.
+    key_tolerances (dict): Relative tolerances of specific keys, overriding rel_tol.
+    acceleration (str): "anderson" for Anderson mixing of the last anderson_depth passes, "relaxation" for a
+        relaxed fixed-point step only, None for plain fixed-point iteration.
+    relaxation (float): Fraction of the change of a pass that is applied, 1 is a full step.
+    return_report (bool): Also return the convergence report.
+
+    The convergence report contains whether it converged, the number of iterations, the residual norm and the
+    largest scaled residual of every pass, the keys that did not converge and the time spent in every stage.
+    """
+    key_tolerances = key_tolerances or {}
+    stage_times = {stage: 0.0 for stage in STAGES}
+    report = {"converged": False, "iterations": 0, "residual_norms": [], "max_scaled_residuals": [],
+              "non_converged_keys": [], "stage_times": stage_times}
+    dx, dg = [], []
+    x_prev = g_prev = None
 
-        if i > max_iterations - 3:
-            for key in outputs:
-                if isinstance(outputs[key], float) or isinstance(
-                    outputs[key], np.float64
-                ):
-                    if abs(outputs[key] - inputs[key]) > tolerance:
-                        doesnt_converge.add(key)
+    for i in range(max_iterations):
 
-        inputs = outputs
-    # print('result did not stabilize at max iteration')
+        outputs = integration_pass(inputs, stage_times)
+
+        keys = [key for key in float_keys(outputs) if key in inputs and np.isfinite(float(inputs[key]))]
+        scaled = scaled_residuals(inputs, outputs, keys, rel_tol, key_tolerances, tolerance)
+        residual = np.array([float(outputs[key]) - float(inputs[key]) for key in keys])
+
+        report["iterations"] = i + 1
+        report["residual_norms"].append(float(np.linalg.norm(residual)))
+        report["max_scaled_residuals"].append(float(scaled.max(initial=0.0)))
+        report["non_converged_keys"] = [key for key, value in zip(keys, scaled) if not value <= 1.0]
+
+        if verbose:
+            print(
+                f'span: {outputs["b_wing"]}, wing area: {outputs["S_wing"]}, battery mass: {outputs["M_battery"]}, MTOW: {inputs["MTOW"]}, M_battery: {inputs["M_battery"]}'
+            )
+
+        if not report["non_converged_keys"]:
+            report["converged"] = True
+            if verbose:
+                print(f"Converged after {i + 1} iterations")
+            break
+
+        if acceleration is not None and keys:
+            x = np.array([float(inputs[key]) for key in keys])
+            g = np.array([float(outputs[key]) for key in keys])
+            if acceleration == "anderson" and x_prev is not None and len(x_prev) == len(x):
+                dx.append(x - x_prev)
+                dg.append(g - g_prev)
+                dx, dg = dx[-anderson_depth:], dg[-anderson_depth:]
+            else:
+                dx, dg = [], []
+            x_prev, g_prev = x, g
+            inputs = outputs.copy()
+            for key, value in zip(keys, anderson_step(x, g, dx, dg, relaxation)):
+                inputs[key] = value
+        else:
+            inputs = outputs
+
+    if verbose and not report["converged"]:
+        print(f'Did not converge after {max_iterations} iterations: {report["non_converged_keys"]}')
+
+    if return_report:
+        return outputs, report
     return outputs
 
 
 if __name__ == "__main__":
-    result = integration_optimization(1, 100, inputs)
+    result, report = integration_optimization(1, 100, inputs, return_report=True)
+    print(f'Iterations: {report["iterations"]}, residual norms: {report["residual_norms"]}')
+    print(f'Stage times [s]: {report["stage_times"]}')
 
     for i in result:
         if i in relevant:
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 from scipy.optimize import minimize
 
@@ -7,7 +9,7 @@ from Classes.vtol_propulsion_sizing import VTOLProp
 from Classes.Battery_Mass_Calculations import BattMass
 
 # ~~~ Iteration Loop ~~~
-def iteration(M_TO: float, w_s: float, p_w: float, VTOL_prop_mod: VTOLProp, prop_mass: PropMass, M_batt: float, M_payload: float, MF_struct: float, MF_Subsyst: float, MF_avion: float) -> tuple[int, float, float, float, float, float, float, float]:
+def iteration(M_TO: float, w_s: float, p_w: float, VTOL_prop_mod: VTOLProp, prop_mass: PropMass, M_batt: float, M_payload: float, MF_struct: float, MF_Subsyst: float, MF_avion: float, rel_tol: float = 0.001) -> tuple[int, float, float, float, float, float, float, float]:
     '''
     Given a set w_s and p_w, iterate until the MTOW stabilizes
     '''
@@ -33,12 +35,107 @@ def iteration(M_TO: float, w_s: float, p_w: float, VTOL_prop_mod: VTOLProp, prop
         )
         #print(f"M_Vtol_Prop: {M_Vtol_Prop}, M_FW_Prop: {M_FW_Prop}, M_batt: {M_batt}, M_payload: {M_payload}, M_TO: {new_M_TO}")
 
-        if abs(new_M_TO - M_TO) / M_TO < 0.001:
+        if abs(new_M_TO - M_TO) / M_TO < rel_tol:
             return count, M_TO, M_batt, p_req_VTOL, P_max_cruise, T / MTOW, D_prop_VTOL, s
         else:
             M_TO = new_M_TO
             MTOW = M_TO * 9.81
 
+# Inputs of the mass loop when _mass_loop is called without inputs (e.g. from plots.py), same values as integration.py
+MASS_LOOP_INPUTS = {
+    "M_to": 30, "M_payload": 5, "M_battery": 0, "MF_struct": 0.35, "MF_Subsyst": 0.07, "MF_avion": 0.05,
+    "stot_s_w": 1.35, "U_max": 25.5, "F1": 0.889, "E1": -0.288, "E2": 0.1588, "f_install_cruise": 1,
+    "f_install_vtol": 1, "n_mot_cruise": 1, "n_mot_vtol": 4, "K_material": 0.6, "n_propellers_cruise": 1,
+    "n_propellers_vtol": 4, "n_blades_cruise": 4, "n_blades_vtol": 4, "K_p": 0.0938,
+}
+MASS_LOOP_KEYS = tuple(MASS_LOOP_INPUTS)
+
+# Relative tolerance of the MTOW iteration in mass_sizing. The mass varies by less than 0.1 % over a wide range of
+# wing loadings, so a looser tolerance makes the choice of the lightest design (and integration.py) noisy.
+MASS_SIZING_REL_TOL = 1e-6
+
+
+def mass_loop_array(w_s, p_w, inputs: dict[str, float | int], rel_tol: float = 0.001, max_iterations: int = 200) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Array version of iteration(): the MTOW iteration for all (w_s, p_w) pairs at once, both are broadcast against
+    each other. Like in mass_sizing the loop starts from inputs['M_to'] and the cruise power is based on that mass.
+    Converged entries are frozen, entries that do not converge within max_iterations are NaN.
+    Returns the take-off mass [kg] and the number of iterations of every entry.
+    '''
+    w_s, p_w = np.broadcast_arrays(np.asarray(w_s, dtype=float), np.asarray(p_w, dtype=float))
+    M_TO = np.full(w_s.shape, float(inputs['M_to']))
+    P_max_cruise = inputs['M_to'] * 9.81 * p_w
+    count = np.zeros(w_s.shape, dtype=int)
+    active = np.ones(w_s.shape, dtype=bool)
+    mass_fractions = inputs['MF_struct'] + inputs['MF_Subsyst'] + inputs['MF_avion']
+
+    for _ in range(max_iterations):
+        index = active.copy()
+        if not index.any():
+            break
+        count[index] += 1
+        M = M_TO[index]
+
+        VTOL_prop_mod = VTOLProp(w_s[index], inputs["stot_s_w"], M * 9.81, inputs["n_propellers_vtol"])
+        p_req_VTOL, S_prop, DL, T = VTOL_prop_mod.power_required_vtol()
+        D_prop_VTOL = 2 * (S_prop / np.pi) ** 0.5
+
+        prop_mass = PropMass(P_max_cruise[index], p_req_VTOL, inputs["U_max"], inputs["F1"], inputs["E1"], inputs["E2"],
+                             inputs["f_install_cruise"], inputs["f_install_vtol"], inputs["n_mot_cruise"], inputs["n_mot_vtol"],
+                             inputs["K_material"], inputs["n_propellers_cruise"], inputs["n_propellers_vtol"],
+                             inputs["n_blades_cruise"], inputs["n_blades_vtol"], D_prop_VTOL, inputs["K_p"])
+        M_FW_Prop, M_Vtol_Prop = prop_mass.calculate_propulsion_mass()
+
+        new_M_TO = (M_Vtol_Prop + M_FW_Prop + inputs['M_payload'] + inputs['M_battery']) / (1 - mass_fractions)
+
+        # Like iteration(), a converged entry keeps the mass of the previous iteration
+        converged = np.abs(new_M_TO - M) / M < rel_tol
+        M_TO[index] = np.where(converged, M, new_M_TO)
+        active[index] = ~converged
+
+    M_TO[active] = np.nan
+    return M_TO, count
+
+
+@lru_cache(maxsize=64)
+def _mass_loop_cached(shape: tuple[int, ...], w_s: bytes, p_w: bytes, inputs: tuple) -> np.ndarray:
+    M_TO, _ = mass_loop_array(np.frombuffer(w_s).reshape(shape), np.frombuffer(p_w).reshape(shape), dict(inputs))
+    M_TO.flags.writeable = False
+    return M_TO
+
+
+def _mass_loop(WS, PW, inputs: dict[str, float | int] | None = None):
+    '''
+    Converged take-off mass [kg] for wing loading(s) WS and power loading(s) PW, scalars or arrays.
+    Results are memoized, so constraint functions evaluated on the same (grid of) design points share one
+    mass iteration. Uses MASS_LOOP_INPUTS unless other inputs are given.
+    '''
+    inputs = MASS_LOOP_INPUTS if inputs is None else inputs
+    WS, PW = np.broadcast_arrays(np.asarray(WS, dtype=float), np.asarray(PW, dtype=float))
+    M_TO = _mass_loop_cached(WS.shape, np.ascontiguousarray(WS).tobytes(), np.ascontiguousarray(PW).tobytes(),
+                             tuple((key, inputs[key]) for key in MASS_LOOP_KEYS))
+    return float(M_TO) if M_TO.ndim == 0 else M_TO
+
+
+def mass_surface(inputs: dict[str, float | int], w_s, p_w, rel_tol: float = 0.001) -> dict[str, float | np.ndarray]:
+    '''
+    Converged take-off mass for all (w_s, p_w) design points in one vectorized iteration, e.g. w_s[:, None] and
+    p_w[None, :] for a full surface. Returns the mass surface, the iterations per point and the lightest design.
+    '''
+    w_s, p_w = np.broadcast_arrays(np.asarray(w_s, dtype=float), np.asarray(p_w, dtype=float))
+    M_TO, count = mass_loop_array(w_s, p_w, inputs, rel_tol)
+    if np.isnan(M_TO).all():
+        raise ValueError("The mass iteration did not converge for any design point.")
+    best = np.unravel_index(np.nanargmin(M_TO), M_TO.shape)
+    return {
+        "M_TO": M_TO,
+        "iterations": count,
+        "w_s": float(w_s[best]),
+        "p_w": float(p_w[best]),
+        "M_TO_min": float(M_TO[best]),
+    }
+
+
 def mass_sizing(inputs: dict[str, float | int]) -> dict[str, float | int]:
 
     '''
@@ -60,46 +157,15 @@ def mass_sizing(inputs: dict[str, float | int]) -> dict[str, float | int]:
     )
 
     W_S, P_W_cruise, P_W_climb, P_W_service, W_S_stall = constraint_plot.plot(True)
-    all_masses = []
-
-    for i in range(len(W_S)):
-        w_s = W_S[i]
-        if w_s < W_S_stall[0] and w_s > 10:
-            p_w = max([P_W_cruise[i], P_W_climb[i], P_W_service[i]])
-            s = inputs['M_to'] * 9.81 / w_s
-            P_max_cruise = inputs['M_to'] * 9.81 * p_w
-
-            VTOL_prop_mod = VTOLProp(w_s, inputs["stot_s_w"], inputs['M_to'] * 9.81, inputs["n_propellers_vtol"])
-            p_req_VTOL, S_prop, DL, T = VTOL_prop_mod.power_required_vtol()
-            D_prop_VTOL = 2 * (S_prop / np.pi) ** 0.5
-
-            prop_mass = PropMass(
-                P_max_cruise,
-                p_req_VTOL,
-                inputs["U_max"],
-                inputs["F1"],
-                inputs["E1"],
-                inputs["E2"],
-                inputs["f_install_cruise"],
-                inputs["f_install_vtol"],
-                inputs["n_mot_cruise"],
-                inputs["n_mot_vtol"],
-                inputs["K_material"],
-                inputs["n_propellers_cruise"],
-                inputs["n_propellers_vtol"],
-                inputs["n_blades_cruise"],
-                inputs["n_blades_vtol"],
-                D_prop_VTOL,
-                inputs["K_p"]
-            )
-
-            _, M_TO, _, _, _, _, _, _ = iteration(inputs['M_to'], w_s, p_w, VTOL_prop_mod, prop_mass, inputs["M_battery"], inputs['M_payload'], inputs['MF_struct'], inputs['MF_Subsyst'], inputs['MF_avion'])
-            all_masses.append([M_TO, w_s, p_w])
+
+    # Every wing loading below stall with the power loading that meets all constraints
+    candidates = (W_S < W_S_stall[0]) & (W_S > 10)
+    P_W = np.maximum(np.maximum(P_W_cruise, P_W_climb), P_W_service)
 
     # ~~~ Get final parameters ~~~
-    best_config = min(all_masses, key=lambda x: x[0])
-    w_s = best_config[1]
-    p_w = best_config[2]
+    best_config = mass_surface(inputs, W_S[candidates], P_W[candidates], MASS_SIZING_REL_TOL)
+    w_s = best_config["w_s"]
+    p_w = best_config["p_w"]
     s = inputs["MTOW"] / w_s
     P_max_cruise = inputs["MTOW"] * p_w
     VTOL_prop_mod = VTOLProp(w_s, inputs["stot_s_w"], inputs["MTOW"], inputs["n_propellers_vtol"])
@@ -147,7 +213,7 @@ def mass_sizing(inputs: dict[str, float | int]) -> dict[str, float | int]:
         inputs["n_propellers_vtol"]
     )
 
-    count, M_TO, M_Batt, p_req_VTOL, P_max_cruise, t_w, D_prop_VTOL, s = iteration(inputs['MTOW'], w_s, p_w, VTOL_prop_mod, prop_mass, inputs['M_battery'], inputs['M_payload'], inputs['MF_struct'], inputs['MF_Subsyst'], inputs['MF_avion'])
+    count, M_TO, M_Batt, p_req_VTOL, P_max_cruise, t_w, D_prop_VTOL, s = iteration(inputs['MTOW'], w_s, p_w, VTOL_prop_mod, prop_mass, inputs['M_battery'], inputs['M_payload'], inputs['MF_struct'], inputs['MF_Subsyst'], inputs['MF_avion'], MASS_SIZING_REL_TOL)
 
     b = (s*inputs['AR'])**0.5
 
@@ -1,27 +1,26 @@
+import itertools
+
 from integration import inputs, integration_optimization
 import matplotlib.pyplot as plt
 import numpy as np
 from Classes.Contraints_for_mass_calculations import Constraints
 from mission_profile import SwarmProfile, UAVProfile
 from Nest_Sizing import Nest 
+from grid_evaluation import GridEvaluation
 # ~~~ AR, Range diagram ~~~
 
-def AR_range_diagram(AR_range: list, range_range: list, mass_calculation: callable, inputs: dict):
+def AR_range_diagram(AR_range: list, range_range: list, mass_calculation: callable, inputs: dict, grid_evaluation: GridEvaluation | None = None):
     '''
     Creates a contour plot with the aspect ratio and the range on the axes and the take-off mass as a result
     '''
+    grid_evaluation = grid_evaluation or GridEvaluation(inputs, mass_calculation)
+    results = grid_evaluation.evaluate({'AR': AR_range, 'R_max': range_range})
     mass_range = []
     grid = []
-    for AR in AR_range:
-        for r in range_range:
-            current_inputs = inputs.copy()
-            current_inputs['R_max'] = r
-            current_inputs['AR'] = AR
-
-            res = mass_calculation(1, 100, current_inputs)
-            mass_range.append(res['M_to'])
-            grid.append((AR, r))
-            print((AR, r, res['M_to']))
+    for (AR, r), res in zip(itertools.product(AR_range, range_range), results):
+        mass_range.append(res['M_to'])
+        grid.append((AR, r))
+        print((AR, r, res['M_to']))
 
 
     AR_vals = sorted(set([pt[0] for pt in grid]))
@@ -42,17 +41,14 @@ def AR_range_diagram(AR_range: list, range_range: list, mass_calculation: callab
     plt.savefig('PreliminaryDesign\Plots\AR_range.png')
     #plt.show()
 
-def cruise_speed_mass_diagram(V_range, inputs, mass_function):
+def cruise_speed_mass_diagram(V_range, inputs, mass_function, grid_evaluation: GridEvaluation | None = None):
     '''
     Plots the take-off mass as a function of cruise speed
     '''
+    grid_evaluation = grid_evaluation or GridEvaluation(inputs, mass_function)
+    results = grid_evaluation.evaluate_rows([[{'V_cruise': V, 'V_stall': 0.5 * V} for V in V_range]])
     mass_results = []
-    for V in V_range:
-        current_inputs = inputs.copy()
-        current_inputs['V_cruise'] = V
-        current_inputs['V_stall'] = 0.5 * V
-
-        res = mass_function(1, 100, current_inputs)
+    for V, res in zip(V_range, results):
         mass_results.append(res['M_to'])
         print(V, res['M_to'])
 
@@ -66,22 +62,18 @@ def cruise_speed_mass_diagram(V_range, inputs, mass_function):
     plt.savefig('PreliminaryDesign\Plots\cruise_mass.png')
     #plt.show()
 
-def payload_range_diagram(payload_range: list, range_range: list, mass_calculation: callable, inputs: dict):
+def payload_range_diagram(payload_range: list, range_range: list, mass_calculation: callable, inputs: dict, grid_evaluation: GridEvaluation | None = None):
     '''
     Creates a contour plot with the payload mass and the range on the axes and the take-off mass as a result  
     '''
+    grid_evaluation = grid_evaluation or GridEvaluation(inputs, mass_calculation)
+    results = grid_evaluation.evaluate({'M_payload': payload_range, 'R_max': range_range})
     mass_range = []
     grid = []
-    for p in payload_range:
-        for r in range_range:
-            current_inputs = inputs.copy()
-            current_inputs['R_max'] = r
-            current_inputs['M_payload'] = p
-
-            res = mass_calculation(1, 100, current_inputs)
-            mass_range.append(res['M_to'])
-            grid.append((p, r))
-            print((p, r, res['M_to']))
+    for (p, r), res in zip(itertools.product(payload_range, range_range), results):
+        mass_range.append(res['M_to'])
+        grid.append((p, r))
+        print((p, r, res['M_to']))
 
 
     p_vals = sorted(set([pt[0] for pt in grid]))
@@ -197,22 +189,18 @@ def deployment_rate_n_UAVS_plot(inputs, n_uav_range):
     plt.savefig('PreliminaryDesign\Plots\deployment_n_UAVs.png')
     #plt.show()
 
-def cruise_speed_range_deployment_rate(V_range, range_range, inputs):
+def cruise_speed_range_deployment_rate(V_range, range_range, inputs, grid_evaluation: GridEvaluation | None = None):
     '''
     Creates a contour plot with the cruise_speed and the range on the axes and the take-off mass as a result  
     '''
+    grid_evaluation = grid_evaluation or GridEvaluation(inputs, integration_optimization)
+    results = grid_evaluation.evaluate({'V_cruise': V_range, 'R_max': range_range})
     deployment_speed_range = []
     grid = []
-    for V in V_range:
-        for r in range_range:
-            current_inputs = inputs.copy()
-            current_inputs['R_max'] = r
-            current_inputs['V_cruise'] = V
-
-            res = integration_optimization(1, 100, current_inputs)
-            deployment_speed_range.append(res['swarm_deployment_rate']*60*60)
-            grid.append((V, r))
-            print((V, r, res['swarm_deployment_rate']))
+    for (V, r), res in zip(itertools.product(V_range, range_range), results):
+        deployment_speed_range.append(res['swarm_deployment_rate']*60*60)
+        grid.append((V, r))
+        print((V, r, res['swarm_deployment_rate']))
 
 
     V_vals = sorted(set([pt[0] for pt in grid]))
@@ -231,9 +219,12 @@ def cruise_speed_range_deployment_rate(V_range, range_range, inputs):
     #plt.show()
 
 if __name__ == '__main__':
-    AR_range_diagram(np.arange(6, 13),np.arange(5000, 25001, 1000), integration_optimization, inputs)
-    # # cruise_speed_mass_diagram(np.arange(int(50/3.6), int(150/3.6), 2), inputs, integration_optimization)
-    payload_range_diagram(np.arange(0, 6.5, 0.5), np.arange(5000, 25001, 1000), integration_optimization, inputs)
+    # One engine for all diagrams, so points shared between the diagrams are only computed once
+    grid_evaluation = GridEvaluation(inputs, integration_optimization)
+    AR_range_diagram(np.arange(6, 13),np.arange(5000, 25001, 1000), integration_optimization, inputs, grid_evaluation)
+    # # cruise_speed_mass_diagram(np.arange(int(50/3.6), int(150/3.6), 2), inputs, integration_optimization, grid_evaluation)
+    payload_range_diagram(np.arange(0, 6.5, 0.5), np.arange(5000, 25001, 1000), integration_optimization, inputs, grid_evaluation)
+    print(f"Grid evaluation: {grid_evaluation.get_statistics()}")
     
     # swarm_deployment_plot(np.arange(int(60/3.6), int(150/3.6), 5), np.arange(0, 6, 0.5), inputs)
     # deployment_rate_n_UAVS_plot(inputs, np.arange(0, 41))
@@ -1,3 +1,8 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -5,7 +10,7 @@ from PreliminaryDesign.Classes.Contraints_for_mass_calculations import Constrain
 from PreliminaryDesign.Classes.vtol_propulsion_sizing import VTOLProp
 from PreliminaryDesign.Classes.electric_propulsion_mass_sizing import PropMass
 from PreliminaryDesign.Classes.Battery_Mass_Calculations import BattMass
-from PreliminaryDesign.mass_estimation import _mass_loop  # your cached sizing loop
+from PreliminaryDesign.mass_estimation import _mass_loop  # memoized, array-vectorized MTOW iteration
 
 # ─── Constants ─────────────────────────────────────────────────────────
 g = 9.81
@@ -27,6 +32,7 @@ _cons = Constraints(V_STALL, V_CRUISE, e, AR, CL_MAX, CD0, N_PROP_EFF, R_C_servi
 
 
 # ─── Constraint-functions ───────────────────────────────────────────────
+# All functions work on scalars and on arrays of design points, the mass based ones share the cached mass loop
 def c_stall_margin(WS, PW):
     Vs_allow = V_CRUISE / M_STALL
     WS_allow = 0.5 * rho * Vs_allow**2 * CL_MAX
@@ -76,13 +82,14 @@ all_constraints = [
 ]
 
 # ─── Build grid & mask feasibility ─────────────────────────────────────
-WS_vals = np.linspace(20, 200, 60)
-PW_vals = np.linspace(2, 25, 60)
+N_GRID = 200  # Number of points along each axis
+WS_vals = np.linspace(20, 200, N_GRID)
+PW_vals = np.linspace(2, 25, N_GRID)
 WSg, PWg = np.meshgrid(WS_vals, PW_vals, indexing="xy")
 
 feasible = np.ones_like(WSg, dtype=bool)
 for fn in all_constraints:
-    mask = np.vectorize(fn)(WSg, PWg) >= 0
+    mask = fn(WSg, PWg) >= 0  # NaN (no converged mass) counts as infeasible
     feasible &= mask
 
 # ─── Plot ────────────────────────────────────────────────────────────────
@@ -0,0 +1,28 @@
+'''
+This is the test file for the grid evaluation of the preliminary sizing.
+'''
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grid_evaluation import GridEvaluation
+from integration import inputs
+
+
+def test_grid_evaluation_path_independent():
+    # A point gives the same result in a row, alone and from the cache
+    grid = GridEvaluation(inputs, n_workers=1)
+    row = grid.evaluate({'AR': [8], 'R_max': [13000, 14000, 15000]})
+    alone = GridEvaluation(inputs, n_workers=1).evaluate({'AR': [8], 'R_max': [15000]})
+    cached = grid.evaluate({'AR': [8], 'R_max': [15000]})
+    assert row[-1]['M_to'] == alone[0]['M_to'] == cached[0]['M_to']
+    assert grid.get_statistics() == {'hits': 1, 'misses': 3, 'cached_points': 3}
+
+    # Warm starting settles elsewhere within the tolerance, those results are never served for a cold point
+    warm = GridEvaluation(inputs, n_workers=1, warm_start=True)
+    warm_row = warm.evaluate({'AR': [8], 'R_max': [13000, 14000, 15000]})
+    assert warm_row[0]['M_to'] == row[0]['M_to']
+    assert warm.evaluate({'AR': [8], 'R_max': [15000]})[0]['M_to'] == alone[0]['M_to']
+    assert warm.evaluate({'AR': [8], 'R_max': [13000, 14000, 15000]})[-1]['M_to'] == warm_row[-1]['M_to']
+    assert warm.get_statistics() == {'hits': 3, 'misses': 4, 'cached_points': 4}